@@ -0,0 +1,61 @@
+"""
+    对比两次 benchmarks/run.py 的结果，延迟或内存退化超过阈值时以非 0 状态码退出
+
+    用法：
+        python benchmarks/compare.py baseline.json current.json --threshold 10
+"""
+import argparse
+import json
+import sys
+
+# 指标 -> 数值越大越差（True）还是越好（False）
+METRICS = {
+    "p50_seconds": True,
+    "p95_seconds": True,
+    "throughput_rps": False,
+    "peak_rss_mb": True,
+}
+
+
+def _change(before, after):
+    if not before:
+        return 0.0
+    return (after - before) / before * 100
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比两次基准测试结果")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=10.0, help="允许的退化百分比")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    with open(args.current) as f:
+        current = json.load(f)["results"]
+
+    regressions = []
+    print(f"{'case':<32}{'metric':<18}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name in sorted(set(baseline) & set(current)):
+        before, after = baseline[name], current[name]
+        if "error" in before or "error" in after:
+            print(f"{name:<32}{'error':<18}{str('error' in before):>12}{str('error' in after):>12}")
+            if "error" in after and "error" not in before:
+                regressions.append((name, "error"))
+            continue
+        for metric, higher_is_worse in METRICS.items():
+            change = _change(before[metric], after[metric])
+            worse = change if higher_is_worse else -change
+            flag = " !" if worse > args.threshold else ""
+            print(f"{name:<32}{metric:<18}{before[metric]:>12.4f}{after[metric]:>12.4f}{change:>9.1f}%{flag}")
+            if worse > args.threshold:
+                regressions.append((name, metric))
+
+    if regressions:
+        print(f"\n{len(regressions)} 项指标退化超过 {args.threshold}%", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
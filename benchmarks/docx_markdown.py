@@ -0,0 +1,116 @@
+"""
+    DOCX -> Markdown 转换基准：对比 python-docx 对象模型（旧实现）和流式 XML 解析（src/utils/docx_markdown.py）
+
+    两种实现分别在独立子进程中运行，统计耗时、吞吐（段落数 / 秒）和峰值内存（RSS）。
+
+    用法（在项目根目录执行，需要安装 python-docx 用于生成样例文件和运行旧实现）：
+        python benchmarks/docx_markdown.py --paragraphs 20000 --repeat 3
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def convert_python_docx(docx_file, md_file):
+    # 旧实现：加载完整的 python-docx 对象模型，只输出段落文本
+    from docx import Document
+    document = Document(docx_file)
+    with open(md_file, "w", encoding="utf-8") as md:
+        for para in document.paragraphs:
+            md.write(para.text + "\n\n")
+
+
+def convert_streaming(docx_file, md_file):
+    sys.path.insert(0, ROOT)
+    from src.utils.docx_markdown import docx_to_markdown
+    docx_to_markdown(docx_file, md_file)
+
+
+IMPLEMENTATIONS = {
+    "python_docx": convert_python_docx,
+    "streaming": convert_streaming,
+}
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 下单位为 KB，macOS 下为字节
+    if sys.platform == "darwin":
+        return peak / 1024 / 1024
+    return peak / 1024
+
+
+def run_single(name, docx_file, repeat):
+    md_file = f"{docx_file}.{name}.md"
+    baseline_rss = _peak_rss_mb()
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        IMPLEMENTATIONS[name](docx_file, md_file)
+        seconds.append(time.perf_counter() - start)
+    return {
+        "median_seconds": statistics.median(seconds),
+        "min_seconds": min(seconds),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "rss_growth_mb": round(_peak_rss_mb() - baseline_rss, 1),
+        "output_bytes": os.path.getsize(md_file),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DOCX -> Markdown 转换基准")
+    parser.add_argument("--paragraphs", type=int, default=20000, help="样例文档的段落数")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=None, help="结果 JSON 输出路径")
+    parser.add_argument("--single", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--docx", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(run_single(args.single, args.docx, args.repeat)))
+        return
+
+    sys.path.insert(0, BENCHMARK_DIR)
+    from fixtures import make_docx
+
+    workdir = tempfile.mkdtemp(prefix="monkeys-tools-text-docx-")
+    docx_file = make_docx(os.path.join(workdir, "document.docx"), paragraphs=args.paragraphs)
+    results = {}
+    for name in IMPLEMENTATIONS:
+        cmd = [sys.executable, os.path.abspath(__file__), "--single", name, "--docx", docx_file,
+               "--repeat", str(args.repeat)]
+        print(f"运行 {name} ...", file=sys.stderr)
+        completed = subprocess.run(cmd, capture_output=True, text=True, cwd=ROOT)
+        if completed.returncode != 0:
+            results[name] = {"error": completed.stderr.strip().splitlines()[-1] if completed.stderr else "unknown"}
+            continue
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        result["paragraphs_per_second"] = round(args.paragraphs / result["median_seconds"], 1)
+        results[name] = result
+
+    report = {
+        "benchmark": "docx_markdown",
+        "paragraphs": args.paragraphs,
+        "docx_bytes": os.path.getsize(docx_file),
+        "results": results,
+    }
+    if "error" not in results.get("python_docx", {"error": 1}) and "error" not in results.get("streaming", {"error": 1}):
+        report["speedup"] = round(results["python_docx"]["median_seconds"] / results["streaming"]["median_seconds"], 2)
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+"""
+    生成基准测试使用的本地样例文件，内容由固定随机种子生成，保证每次运行一致
+"""
+import json
+import os
+import random
+import shutil
+
+WORDS = (
+    "the of and to in is that for it as was with be by on not he this are or his from at which but have an they "
+    "you were her she there been one all we their has would when if so no will more can out up about into who "
+    "document segment chunk model image table page text layout workflow monkey tool service result convert"
+).split()
+
+SAMPLE_LINES = [
+    "Monkeys Tools Text Benchmark",
+    "Invoice No. 2024-0815  Total: 1,234.56",
+    "The quick brown fox jumps over the lazy dog",
+    "Optical character recognition sample line",
+    "Reading order and paragraph reconstruction",
+    "Table extraction and layout recovery",
+]
+
+
+def _sentence(rng, min_words=6, max_words=18):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))]
+    return " ".join(words).capitalize() + "."
+
+
+def _paragraph(rng, sentences=5):
+    return " ".join(_sentence(rng) for _ in range(sentences))
+
+
+def make_text(path, size_mb, seed=0):
+    rng = random.Random(seed)
+    target = int(size_mb * 1024 * 1024)
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        while written < target:
+            paragraph = _paragraph(rng) + "\n\n"
+            f.write(paragraph)
+            written += len(paragraph)
+    return path
+
+
+def make_markdown(path, sections, seed=0):
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(sections):
+            f.write(f"# Chapter {i}\n\n{_paragraph(rng)}\n\n")
+            for j in range(3):
+                f.write(f"## Section {i}.{j}\n\n{_paragraph(rng, 8)}\n\n")
+                f.write("```python\nfor i in range(10):\n    print(i)\n```\n\n")
+                f.write("| name | value |\n| --- | --- |\n| a | 1 |\n| b | 2 |\n\n")
+    return path
+
+
+def make_jsonl(path, records, seed=0, duplicate_ratio=0.2):
+    rng = random.Random(seed)
+    emitted = []
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(records):
+            if emitted and rng.random() < duplicate_ratio:
+                record = rng.choice(emitted)
+            else:
+                record = {"id": i, "text": _paragraph(rng, 3)}
+                emitted.append(record)
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return path
+
+
+def make_image(path, lines=24, width=1654, height=2339):
+    from PIL import Image, ImageDraw, ImageFont
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    try:
+        font = ImageFont.truetype("DejaVuSans.ttf", 36)
+    except OSError:
+        font = ImageFont.load_default()
+    y = 80
+    for i in range(lines):
+        # 左右两栏，便于观察阅读顺序
+        draw.text((80, y), SAMPLE_LINES[i % len(SAMPLE_LINES)], fill="black", font=font)
+        draw.text((width // 2 + 40, y), SAMPLE_LINES[(i + 3) % len(SAMPLE_LINES)], fill="black", font=font)
+        y += 80
+    image.save(path)
+    return path
+
+
+def make_pdf(path, pages, seed=0):
+    import fitz
+    rng = random.Random(seed)
+    with fitz.open() as document:
+        for i in range(pages):
+            page = document.new_page()
+            page.insert_text((72, 72), f"Page {i + 1}", fontsize=20)
+            y = 110
+            for _ in range(30):
+                page.insert_text((72, y), _sentence(rng, 6, 10), fontsize=11)
+                y += 20
+        document.save(path)
+    return path
+
+
+def make_docx(path, paragraphs, seed=0):
+    from docx import Document
+    rng = random.Random(seed)
+    document = Document()
+    for i in range(paragraphs):
+        if i % 20 == 0:
+            document.add_heading(f"Heading {i // 20}", level=1 + (i // 20) % 3)
+        if i % 7 == 0:
+            document.add_paragraph(_sentence(rng), style="List Bullet")
+        else:
+            document.add_paragraph(_paragraph(rng, 3))
+        if i % 50 == 49:
+            table = document.add_table(rows=4, cols=3)
+            for row in table.rows:
+                for cell in row.cells:
+                    cell.text = rng.choice(WORDS)
+    document.save(path)
+    return path
+
+
+def make_csv(path, rows, seed=0):
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("id,name,score,comment\n")
+        for i in range(rows):
+            f.write(f"{i},{rng.choice(WORDS)},{rng.random():.6f},{_sentence(rng, 3, 8)}\n")
+    return path
+
+
+def make_xlsx(path, rows, seed=0):
+    import pandas as pd
+    rng = random.Random(seed)
+    pd.DataFrame({
+        "id": list(range(rows)),
+        "name": [rng.choice(WORDS) for _ in range(rows)],
+        "score": [rng.random() for _ in range(rows)],
+    }).to_excel(path, index=False)
+    return path
+
+
+def make_html(path, seed=0):
+    rng = random.Random(seed)
+    body = "".join(f"<p>{_paragraph(rng)}</p>" for _ in range(40))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(
+            "<html><head><title>Benchmark page</title></head><body>"
+            "<nav><a href='/'>Home</a></nav>"
+            f"<article><h1>Benchmark page</h1>{body}</article>"
+            "<footer>footer</footer></body></html>"
+        )
+    return path
+
+
+def make_site(folder, pages, seed=0):
+    """
+        生成用于抓取的样例站点：首页 -> 分类页 -> 文档页，包含 sitemap.xml、robots.txt（禁止 /private/）、
+        内容重复的页面和指向外部域名的链接，返回首页路径
+    """
+    rng = random.Random(seed)
+    os.makedirs(os.path.join(folder, "docs"), exist_ok=True)
+    os.makedirs(os.path.join(folder, "private"), exist_ok=True)
+
+    def write(name, title, body, links):
+        anchors = "".join(f"<li><a href='{link}'>{link}</a></li>" for link in links)
+        with open(os.path.join(folder, name), "w", encoding="utf-8") as f:
+            f.write(
+                f"<html><head><title>{title}</title></head><body>"
+                f"<nav><ul>{anchors}</ul></nav>"
+                f"<article><h1>{title}</h1>{body}</article>"
+                "<footer><a href='https://external.invalid/'>external</a></footer></body></html>"
+            )
+
+    sections = max(1, pages // 10)
+    docs = [f"docs/page_{i}.html" for i in range(pages)]
+    for index, doc in enumerate(docs):
+        body = "".join(f"<p>{_paragraph(rng)}</p>" for _ in range(5))
+        write(doc, f"Page {index}", body, ["../index.html", f"../section_{index % sections}.html#top"])
+    for section in range(sections):
+        links = [doc for i, doc in enumerate(docs) if i % sections == section]
+        write(f"section_{section}.html", f"Section {section}", f"<p>{_paragraph(rng)}</p>", links)
+    # 内容与 docs/page_0.html 完全相同的页面，以及 robots.txt 禁止抓取的页面
+    shutil.copy(os.path.join(folder, docs[0]), os.path.join(folder, "docs", "page_0_copy.html"))
+    write("private/secret.html", "Secret", f"<p>{_paragraph(rng)}</p>", [])
+    write("index.html", "Home", f"<p>{_paragraph(rng)}</p>",
+          [f"section_{i}.html" for i in range(sections)] + ["docs/page_0_copy.html", "private/secret.html"])
+
+    site = os.path.basename(folder)
+    # 本地 HTTP 服务的端口不固定，sitemap 使用相对地址（抓取时按 sitemap 自身的地址解析）
+    with open(os.path.join(folder, "sitemap.xml"), "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>'
+                '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">')
+        for name in ["index.html"] + [f"section_{i}.html" for i in range(sections)]:
+            f.write(f"<url><loc>{name}</loc></url>")
+        f.write("</urlset>")
+    # robots.txt 需要位于域名根目录，即样例文件目录
+    with open(os.path.join(os.path.dirname(folder), "robots.txt"), "w", encoding="utf-8") as f:
+        f.write(f"User-agent: *\nDisallow: /{site}/private/\n")
+    return os.path.join(folder, "index.html")
+
+
+def generate_fixtures(folder, scale=1.0):
+    """
+        在 folder 下生成全部样例文件，scale 控制文件大小
+    """
+    os.makedirs(folder, exist_ok=True)
+
+    def target(name):
+        return os.path.join(folder, name)
+
+    return {
+        "image": make_image(target("scan.png")),
+        "pdf": make_pdf(target("document.pdf"), pages=max(1, int(10 * scale))),
+        "docx": make_docx(target("document.docx"), paragraphs=max(1, int(2000 * scale))),
+        "csv": make_csv(target("table.csv"), rows=max(1, int(200000 * scale))),
+        "xlsx": make_xlsx(target("table.xlsx"), rows=max(1, int(50000 * scale))),
+        "txt": make_text(target("corpus.txt"), size_mb=5 * scale),
+        "markdown": make_markdown(target("corpus.md"), sections=max(1, int(200 * scale))),
+        "jsonl_a": make_jsonl(target("part-a.jsonl"), records=max(1, int(20000 * scale)), seed=1),
+        "jsonl_b": make_jsonl(target("part-b.jsonl"), records=max(1, int(20000 * scale)), seed=2),
+        "html": make_html(target("page.html")),
+        "site": make_site(target("site"), pages=max(10, int(100 * scale))),
+    }
@@ -0,0 +1,85 @@
+"""
+    导入耗时基准：在干净的子进程中导入 src.server，统计耗时并检查重量级依赖是否被提前加载
+
+    用法（在项目根目录、存在 config.yaml 的情况下执行）：
+        python benchmarks/import_time.py --repeat 5 --max-seconds 3
+    任一检查不通过时以非 0 状态码退出，可直接用于 CI。
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 这些模块只应在对应接口被调用（或配置了预加载）时才导入
+HEAVY_MODULES = [
+    "paddleocr",
+    "paddle",
+    "langchain",
+    "langchain_community",
+    "selenium",
+    "unstructured",
+    "pandas",
+    "fitz",
+    "docx",
+]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import src.server
+elapsed = time.perf_counter() - start
+heavy = [m for m in %r if m in sys.modules]
+print(json.dumps({"seconds": elapsed, "heavy_modules": heavy}))
+""" % (HEAVY_MODULES,)
+
+
+def measure_once():
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="src.server 导入耗时基准")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=None, help="导入耗时中位数上限，超出即失败")
+    parser.add_argument("--output", default=None, help="结果 JSON 输出路径")
+    args = parser.parse_args()
+
+    runs = [measure_once() for _ in range(args.repeat)]
+    seconds = [run["seconds"] for run in runs]
+    heavy = sorted({m for run in runs for m in run["heavy_modules"]})
+    result = {
+        "benchmark": "import_time",
+        "repeat": args.repeat,
+        "median_seconds": statistics.median(seconds),
+        "min_seconds": min(seconds),
+        "max_seconds": max(seconds),
+        "heavy_modules": heavy,
+    }
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+    failed = False
+    if heavy:
+        print(f"导入 src.server 时加载了重量级依赖: {', '.join(heavy)}", file=sys.stderr)
+        failed = True
+    if args.max_seconds is not None and result["median_seconds"] > args.max_seconds:
+        print(f"导入耗时 {result['median_seconds']:.2f}s 超过上限 {args.max_seconds}s", file=sys.stderr)
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
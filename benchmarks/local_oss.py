@@ -0,0 +1,78 @@
+"""
+    基准测试使用的本地 OSS 替身，以及提供样例文件的本地 HTTP 服务，运行时不访问外部网络
+"""
+import functools
+import os
+import shutil
+import threading
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from urllib.parse import urlparse, unquote
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalFileServer:
+    """
+        在后台线程中以 HTTP 方式提供 root 目录下的文件
+    """
+
+    def __init__(self, root):
+        self.root = root
+        handler = functools.partial(_QuietHandler, directory=root)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def url_for(self, path):
+        return f"{self.base_url}/{os.path.relpath(path, self.root)}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class LocalOSSClient:
+    """
+        与 vines_worker_sdk.oss.OSSClient 的 download_file / upload_file_tos / download_file_tos / upload_bytes
+        接口一致：按 URL 下载时直接从本地目录复制，上传时写入 root/artifact 目录并返回本地 HTTP 地址，
+        按 key 读写的对象同样保存在 root/artifact 目录
+    """
+
+    def __init__(self, file_server):
+        self.file_server = file_server
+        self.root = file_server.root
+
+    def download_file(self, file_url, target_path):
+        path = unquote(urlparse(file_url).path).lstrip("/")
+        source = os.path.join(self.root, path)
+        if not os.path.isfile(source):
+            return False
+        os.makedirs(target_path, exist_ok=True)
+        final_path = f"{target_path}/{os.path.basename(source)}"
+        shutil.copyfile(source, final_path)
+        return final_path
+
+    def upload_file_tos(self, file_path, key):
+        target = os.path.join(self.root, "artifact", key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(file_path, target)
+        return self.file_server.url_for(target)
+
+    def download_file_tos(self, target_filename, key):
+        shutil.copyfile(os.path.join(self.root, "artifact", key), target_filename)
+
+    def upload_bytes(self, key, bytes):
+        target = os.path.join(self.root, "artifact", key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as f:
+            f.write(bytes)
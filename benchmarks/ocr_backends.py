@@ -0,0 +1,211 @@
+"""
+    OCR 推理后端的准确率 / 耗时基准
+
+    在固定的图片集（固定随机种子生成，已知原文）上分别运行各个后端配置，统计字符错误率（CER）、
+    单张图片 p50/p95 耗时、模型加载耗时和峰值内存（RSS），用于为不同部署选择后端。
+    每个配置在独立子进程中运行。
+
+    用法（在项目根目录执行）：
+        python benchmarks/ocr_backends.py --images 10 --output ocr_backends.json
+        python benchmarks/ocr_backends.py --variants variants.json
+
+    variants.json 的格式与 config.yaml 中的 ocr.backend 一致，例如：
+        {
+            "paddle": {"type": "paddle", "enable_mkldnn": false},
+            "paddle_mkldnn": {"type": "paddle", "enable_mkldnn": true, "cpu_threads": 4},
+            "onnx": {"type": "onnx", "cpu_threads": 4, "models": {"ch": {
+                "det_model_dir": "/models/det.onnx", "rec_model_dir": "/models/rec.onnx",
+                "cls_model_dir": "/models/cls.onnx"}}},
+            "paddle_slim": {"type": "paddle", "enable_mkldnn": true, "models": {"ch": {
+                "det_model_dir": "/models/ch_PP-OCRv3_det_slim_infer",
+                "rec_model_dir": "/models/ch_PP-OCRv3_rec_slim_infer"}}}
+        }
+"""
+import argparse
+import json
+import math
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CONFIG_YAML = """
+s3:
+  accessKeyId: benchmark
+  secretAccessKey: benchmark
+  endpoint: http://127.0.0.1:9
+  region: local
+  bucket: benchmark
+  publicUrl: http://127.0.0.1:9
+"""
+
+DEFAULT_VARIANTS = {
+    "paddle": {"type": "paddle", "enable_mkldnn": False},
+    "paddle_mkldnn": {"type": "paddle", "enable_mkldnn": True, "cpu_threads": os.cpu_count() or 1},
+}
+
+
+def make_image_set(folder, count, seed=0):
+    """
+        生成 count 张已知原文的图片，返回 [{"path", "text"}, ...]
+    """
+    from PIL import Image, ImageDraw, ImageFont
+    sys.path.insert(0, BENCHMARK_DIR)
+    from fixtures import SAMPLE_LINES, _sentence
+
+    rng = random.Random(seed)
+    try:
+        font = ImageFont.truetype("DejaVuSans.ttf", 32)
+    except OSError:
+        font = ImageFont.load_default()
+    os.makedirs(folder, exist_ok=True)
+    images = []
+    for index in range(count):
+        lines = [rng.choice(SAMPLE_LINES)] + [_sentence(rng, 4, 8) for _ in range(11)]
+        image = Image.new("RGB", (1240, 80 + 70 * len(lines)), "white")
+        draw = ImageDraw.Draw(image)
+        for i, line in enumerate(lines):
+            draw.text((60, 50 + 70 * i), line, fill="black", font=font)
+        path = os.path.join(folder, f"image_{index}.png")
+        image.save(path)
+        images.append({"path": path, "text": "\n".join(lines)})
+    return images
+
+
+def _edit_distance(a, b):
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def _normalize(text):
+    return "".join(text.split()).lower()
+
+
+def _percentile(values, percent):
+    # nearest-rank 百分位
+    ordered = sorted(values)
+    index = max(0, math.ceil(percent / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 下单位为 KB，macOS 下为字节
+    if sys.platform == "darwin":
+        return peak / 1024 / 1024
+    return peak / 1024
+
+
+def run_variant(backend, images, language, warmup):
+    sys.path.insert(0, ROOT)
+    from src.utils.image_preprocess import decode_image
+    from src.utils.ocr_helper import create_ocr_engine
+
+    start = time.perf_counter()
+    engine = create_ocr_engine(language, backend)
+    load_seconds = time.perf_counter() - start
+
+    decoded = [(decode_image(image["path"]), image["text"]) for image in images]
+    for img, _ in decoded[:warmup]:
+        engine.ocr(img, cls=backend.get("use_angle_cls", True))
+
+    latencies = []
+    errors = characters = 0
+    for img, expected in decoded:
+        start = time.perf_counter()
+        result = engine.ocr(img, cls=backend.get("use_angle_cls", True))
+        latencies.append(time.perf_counter() - start)
+        lines = [line for page in (result or []) if page for line in page]
+        # 按文本框的 y 坐标排序后拼接，与原文逐字符比较
+        lines.sort(key=lambda line: (line[0][0][1], line[0][0][0]))
+        recognized = _normalize("".join(line[1][0] for line in lines))
+        expected = _normalize(expected)
+        errors += _edit_distance(recognized, expected)
+        characters += len(expected)
+
+    return {
+        "load_seconds": round(load_seconds, 3),
+        "p50_seconds": round(statistics.median(latencies), 4),
+        "p95_seconds": round(_percentile(latencies, 95), 4),
+        "images_per_second": round(len(latencies) / sum(latencies), 2),
+        "cer": round(errors / max(1, characters), 4),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR 推理后端准确率 / 耗时基准")
+    parser.add_argument("--variants", default=None, help="后端配置 JSON 文件，默认对比 paddle 与 paddle + MKLDNN")
+    parser.add_argument("--images", type=int, default=10, help="图片数量")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--output", default=None, help="结果 JSON 输出路径")
+    parser.add_argument("--single", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variants:
+        with open(args.variants, "r", encoding="utf-8") as f:
+            variants = json.load(f)
+    else:
+        variants = DEFAULT_VARIANTS
+
+    if args.single:
+        with open(os.path.join(args.workdir, "images.json"), "r", encoding="utf-8") as f:
+            images = json.load(f)
+        print(json.dumps(run_variant(variants[args.single], images, args.language, args.warmup)))
+        return
+
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="monkeys-tools-text-ocr-"))
+    os.makedirs(workdir, exist_ok=True)
+    with open(os.path.join(workdir, "config.yaml"), "w") as f:
+        f.write(CONFIG_YAML)
+    images = make_image_set(os.path.join(workdir, "images"), args.images)
+    with open(os.path.join(workdir, "images.json"), "w", encoding="utf-8") as f:
+        json.dump(images, f)
+
+    env = {**os.environ, "CUDA_VISIBLE_DEVICES": ""}
+    results = {}
+    for name in variants:
+        cmd = [sys.executable, os.path.abspath(__file__), "--single", name, "--workdir", workdir,
+               "--language", args.language, "--warmup", str(args.warmup)]
+        if args.variants:
+            cmd += ["--variants", os.path.abspath(args.variants)]
+        print(f"运行后端 {name} ...", file=sys.stderr)
+        # 在 workdir 中运行，使用基准专用的 config.yaml
+        completed = subprocess.run(cmd, capture_output=True, text=True, env=env, cwd=workdir)
+        if completed.returncode != 0:
+            results[name] = {"error": completed.stderr.strip().splitlines()[-1] if completed.stderr else "unknown"}
+        else:
+            results[name] = json.loads(completed.stdout.strip().splitlines()[-1])
+        print(json.dumps({name: results[name]}, ensure_ascii=False), file=sys.stderr)
+
+    report = {
+        "benchmark": "ocr_backends",
+        "images": args.images,
+        "language": args.language,
+        "cpu_count": os.cpu_count(),
+        "variants": variants,
+        "results": results,
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""
+    /text/* 接口基准测试
+
+    在本地生成样例文件，用本地 OSS 替身和本地 HTTP 服务代替真实存储，完全离线、只使用 CPU。
+    每个用例在独立子进程中运行，分别统计吞吐、p50/p95 延迟和峰值内存（RSS），结果写入 JSON，
+    可以用 benchmarks/compare.py 对比两次结果。
+
+    用法（在项目根目录执行）：
+        python benchmarks/run.py --output bench.json
+        python benchmarks/run.py --case text_segment_recursive --case ocr --iterations 10
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CONFIG_YAML = """
+s3:
+  accessKeyId: benchmark
+  secretAccessKey: benchmark
+  endpoint: http://127.0.0.1:9
+  region: local
+  bucket: benchmark
+  publicUrl: http://127.0.0.1:9
+"""
+
+
+def _cases(urls):
+    """
+        用例名 -> (接口路径, 请求参数, 默认迭代次数)
+    """
+    return {
+        "extract_url_content": ("/text/extract-url-content", {"url": urls["html"], "headless": True}, 5),
+        "crawl_site": ("/text/crawl-site", {
+            "urls": [urls["site"]], "sitemapUrl": urls["site"].replace("index.html", "sitemap.xml"),
+            "maxDepth": 3, "maxPages": 500,
+        }, 3),
+        "file_convert_png_to_jpg": ("/text/file-convert", {
+            "url": urls["image"], "input_format": "png", "output_format": "jpg",
+        }, 10),
+        "file_convert_pdf_to_md": ("/text/file-convert", {
+            "url": urls["pdf"], "input_format": "pdf", "output_format": "md",
+        }, 10),
+        "file_convert_pdf_to_docx": ("/text/file-convert", {
+            "url": urls["pdf"], "input_format": "pdf", "output_format": "docx",
+        }, 10),
+        "file_convert_docx_to_md": ("/text/file-convert", {
+            "url": urls["docx"], "input_format": "docx", "output_format": "md",
+        }, 5),
+        "file_convert_xlsx_to_csv": ("/text/file-convert", {
+            "url": urls["xlsx"], "input_format": "xlsx", "output_format": "csv",
+        }, 3),
+        "file_convert_csv_to_xlsx": ("/text/file-convert", {
+            "url": urls["csv"], "input_format": "csv", "output_format": "xlsx",
+        }, 3),
+        "ocr": ("/text/ocr", {"url": urls["image"]}, 5),
+        "pdf_to_text": ("/text/pdf-to-text", {"pdfUrl": urls["pdf"]}, 1),
+        "pdf_to_text_raster_ocr": ("/text/pdf-to-text", {"pdfUrl": urls["pdf"], "mode": "ocr", "dpi": 150}, 2),
+        "pp_structure": ("/text/pp-structure", {"url": urls["image"]}, 2),
+        "table_extract_pdf": ("/text/table-extract", {"url": urls["pdf"]}, 2),
+        "text_combination_jsonl": ("/text/text-combination", {
+            "textOrUrl": "url", "documents": ['{"id": -1, "text": "seed"}'], "documentType": "jsonl",
+            "documentsUrl": [urls["jsonl_a"], urls["jsonl_b"]],
+        }, 5),
+        "text_replace": ("/text/text-replace", {
+            "documentType": "documentUrl", "document": "", "documentUrl": urls["txt"],
+            "searchText": "the", "replaceText": "THE",
+        }, 5),
+        "text_segment_character": ("/text/text-segment", {
+            "txtUrl": urls["txt"], "splitType": "splitByCharacter", "chunkSize": 2000, "chunkOverlap": 10,
+            "separator": "\n\n",
+        }, 5),
+        "text_segment_recursive": ("/text/text-segment", {
+            "txtUrl": urls["txt"], "splitType": "recursivelySplitByCharacter", "chunkSize": 2000,
+            "chunkOverlap": 10,
+        }, 5),
+        "text_segment_markdown": ("/text/text-segment", {
+            "txtUrl": urls["markdown"], "splitType": "markdown", "chunkSize": 2000, "chunkOverlap": 10,
+        }, 5),
+    }
+
+
+def _peak_rss_mb(who):
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux 下单位为 KB，macOS 下为字节
+    if sys.platform == "darwin":
+        return peak / 1024 / 1024
+    return peak / 1024
+
+
+def _percentile(values, percent):
+    # nearest-rank 百分位
+    ordered = sorted(values)
+    index = max(0, math.ceil(percent / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def run_case(name, workdir, iterations):
+    """
+        子进程入口：在 workdir 中加载应用并执行单个用例
+    """
+    os.chdir(workdir)
+    sys.path.insert(0, ROOT)
+    sys.path.insert(0, BENCHMARK_DIR)
+    from local_oss import LocalFileServer, LocalOSSClient
+
+    with open(os.path.join(workdir, "fixtures.json")) as f:
+        fixtures = json.load(f)
+    file_server = LocalFileServer(os.path.join(workdir, "fixtures")).start()
+    urls = {key: file_server.url_for(path) for key, path in fixtures.items()}
+    path, payload, default_iterations = _cases(urls)[name]
+    iterations = iterations or default_iterations
+
+    import_start = time.perf_counter()
+    import src.oss
+    # 在加载应用之前替换，各模块 from ..oss import oss_client 得到的都是本地实现
+    src.oss.oss_client = LocalOSSClient(file_server)
+    from src.server import app
+    import_seconds = time.perf_counter() - import_start
+    client = app.test_client()
+
+    def call():
+        start = time.perf_counter()
+        response = client.post(path, json=json.loads(json.dumps(payload)))
+        elapsed = time.perf_counter() - start
+        if response.status_code != 200:
+            raise Exception(f"{name} 返回 {response.status_code}: {response.get_data(as_text=True)[:500]}")
+        return elapsed
+
+    # 第一次调用包含依赖导入和模型加载，单独统计
+    cold_start_seconds = call()
+    latencies = []
+    total_start = time.perf_counter()
+    for _ in range(iterations):
+        latencies.append(call())
+    total_seconds = time.perf_counter() - total_start
+    file_server.stop()
+
+    return {
+        "endpoint": path,
+        "iterations": iterations,
+        "import_seconds": import_seconds,
+        "cold_start_seconds": cold_start_seconds,
+        "throughput_rps": iterations / total_seconds,
+        "mean_seconds": statistics.mean(latencies),
+        "p50_seconds": _percentile(latencies, 50),
+        "p95_seconds": _percentile(latencies, 95),
+        "peak_rss_mb": _peak_rss_mb(resource.RUSAGE_SELF),
+        # paddleocr / pandoc 等以子进程方式运行的部分
+        "peak_children_rss_mb": _peak_rss_mb(resource.RUSAGE_CHILDREN),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/text/* 接口基准测试")
+    parser.add_argument("--case", action="append", default=None, help="只运行指定用例，可重复")
+    parser.add_argument("--iterations", type=int, default=None, help="每个用例的迭代次数，默认使用用例自身的设置")
+    parser.add_argument("--scale", type=float, default=1.0, help="样例文件大小的缩放系数")
+    parser.add_argument("--workdir", default=None, help="样例文件和临时文件目录，默认使用临时目录")
+    parser.add_argument("--output", default=None, help="结果 JSON 输出路径")
+    parser.add_argument("--single", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(run_case(args.single, args.workdir, args.iterations)))
+        return
+
+    sys.path.insert(0, BENCHMARK_DIR)
+    from fixtures import generate_fixtures
+
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="monkeys-tools-text-bench-"))
+    os.makedirs(workdir, exist_ok=True)
+    with open(os.path.join(workdir, "config.yaml"), "w") as f:
+        f.write(CONFIG_YAML)
+    fixtures = generate_fixtures(os.path.join(workdir, "fixtures"), scale=args.scale)
+    with open(os.path.join(workdir, "fixtures.json"), "w") as f:
+        json.dump(fixtures, f)
+
+    case_names = args.case or list(_cases({key: "" for key in fixtures}).keys())
+    env = {**os.environ, "CUDA_VISIBLE_DEVICES": ""}
+    results = {}
+    for name in case_names:
+        cmd = [sys.executable, os.path.abspath(__file__), "--single", name, "--workdir", workdir]
+        if args.iterations:
+            cmd += ["--iterations", str(args.iterations)]
+        print(f"运行用例 {name} ...", file=sys.stderr)
+        completed = subprocess.run(cmd, capture_output=True, text=True, env=env)
+        if completed.returncode != 0:
+            results[name] = {"error": completed.stderr.strip().splitlines()[-1] if completed.stderr else "unknown"}
+        else:
+            results[name] = json.loads(completed.stdout.strip().splitlines()[-1])
+        print(json.dumps({name: results[name]}, ensure_ascii=False), file=sys.stderr)
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "scale": args.scale,
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,12 @@
 from src.config import config_data
 from src.server import app
+from src.server.tool_groups import preload_tools
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=config_data.get('server', {}).get('port', 8890))
+    server_config = config_data.get('server', {})
+    if server_config.get('mode') == 'production':
+        from src.server.wsgi import run_production
+        run_production(app)
+    else:
+        preload_tools()
+        app.run(host='0.0.0.0', port=server_config.get('port', 8890), threaded=True)
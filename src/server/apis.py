@@ -1,24 +1,67 @@
 import json
-import os
 import subprocess
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 
+from src.config import config_data
 from .app import api, app
+from .metrics import download_file, upload_file, stage_timer, record_bytes_in, record_stage
+from .tool_groups import is_tool_enabled
 from flask_restx import Resource
 from flask import request
-from langchain_community.document_loaders import UnstructuredURLLoader, SeleniumURLLoader
-from paddleocr import PaddleOCR
-from langchain.text_splitter import MarkdownHeaderTextSplitter, RecursiveCharacterTextSplitter, CharacterTextSplitter
 
 from ..oss import oss_client
 from ..utils import generate_random_string, ensure_directory_exists
+from ..utils.content_chunking import chunk_hash, parse_manifest, diff_manifest
+from ..utils.compression import COMPRESSION_OPTIONS, open_text, open_text_writer, output_suffix, \
+    strip_compression_ext
+from ..utils.dedup import Deduplicator
 from ..utils.file_convert_helper import FileConvertHelper
-from ..utils.ocr_helper import OCRHelper
+from ..utils.image_preprocess import resolve_options
+from ..utils.ocr_helper import OCRHelper, SUPPORTED_LANGUAGES, paddleocr_cli_options, resolve_language
+from ..utils.pdf_raster import DEFAULT_DPI
+from ..utils.record_stream import iter_records, RecordWriter
+from ..utils.url_extract import extract_url
+from ..utils.site_crawler import SiteCrawler, PER_HOST_CONCURRENCY
+from ..utils.text_splitter import build_splitter, split_text, segment_text, segment_metadata, serialize_segment, \
+    read_text, split_file, get_split_pool, discard_split_pool
 
 text_ns = api.namespace('text', description='Text operations')
 
+segment_config = config_data.get('segment') or {}
 
-@text_ns.route('/extract-url-content')
+OCR_LANGUAGE_OPTIONS = [
+    {"name": "中英文", "value": "ch"},
+    {"name": "英文", "value": "en"},
+    {"name": "繁体中文", "value": "chinese_cht"},
+    {"name": "日文", "value": "japan"},
+    {"name": "韩文", "value": "korean"},
+    {"name": "法文", "value": "fr"},
+    {"name": "德文", "value": "german"},
+    {"name": "拉丁字母", "value": "latin"},
+    {"name": "西里尔字母", "value": "cyrillic"},
+    {"name": "阿拉伯字母", "value": "arabic"},
+    {"name": "天城文", "value": "devanagari"},
+]
+OCR_LANGUAGE_OPTIONS = [option for option in OCR_LANGUAGE_OPTIONS if option["value"] in SUPPORTED_LANGUAGES]
+
+
+def tool_route(group, path):
+    """
+        注册工具接口，未启用的工具分组不注册路由（也不会出现在 swagger 中）
+    """
+
+    def wrapper(cls):
+        if not is_tool_enabled(group):
+            return cls
+        return text_ns.route(path)(cls)
+
+    return wrapper
+
+
+@tool_route("url", "/extract-url-content")
 class ExtractUrlContent(Resource):
     @text_ns.doc('extract_url_content')
     @text_ns.vendor({
@@ -32,18 +75,43 @@ class ExtractUrlContent(Resource):
         },
         "x-monkey-tool-input": [
             {
-                "displayName": "启用 Headless Browser",
-                "name": "headless",
-                "type": "boolean",
+                "displayName": "URL",
+                "name": "url",
+                "type": "string",
                 "default": "",
                 "required": True,
             },
             {
-                "displayName": "URL",
-                "name": "url",
+                "displayName": "提取模式",
+                "name": "mode",
+                "type": "options",
+                "default": "auto",
+                "required": False,
+                "options": [
+                    {"name": "自动（优先 HTTP，JS 渲染页面使用浏览器）", "value": "auto"},
+                    {"name": "仅 HTTP 请求", "value": "http"},
+                    {"name": "浏览器渲染", "value": "browser"},
+                ],
+            },
+            {
+                "displayName": "等待正文的 CSS 选择器",
+                "name": "waitSelector",
                 "type": "string",
                 "default": "",
-                "required": True,
+                "required": False,
+                "description": "浏览器渲染时等待该选择器中出现正文，留空使用默认选择器",
+                "displayOptions": {
+                    "show": {
+                        "mode": ["auto", "browser"]
+                    }
+                },
+            },
+            {
+                "displayName": "启用 Headless Browser（已废弃，请使用提取模式）",
+                "name": "headless",
+                "type": "boolean",
+                "default": "",
+                "required": False,
             },
         ],
         "x-monkey-tool-output": [
@@ -72,19 +140,14 @@ class ExtractUrlContent(Resource):
     def post(self):
         input_data = request.json
         url = input_data.get("url")
-        headless = input_data.get("headless")
+        mode = input_data.get("mode")
+        if not mode:
+            # 兼容旧参数：headless 为真时只做 HTTP 请求，否则使用浏览器渲染
+            mode = "auto" if "headless" not in input_data else ("http" if input_data.get("headless") else "browser")
         try:
             if url is None:
                 raise Exception("URL 不能为空")
-            if headless:
-                loader = UnstructuredURLLoader(urls=[url])
-            else:
-                loader = SeleniumURLLoader(urls=[url])
-            document = loader.load()
-            result = {}
-            for doc in document:
-                result["metadata"] = doc.metadata
-                result["page_content"] = doc.page_content
+            result = extract_url(url, mode, input_data.get("waitSelector") or None)
             # FIX 不能直接返回 json 数据，否则 conductor 序列化会报错
             return {
                 "result": result,
@@ -93,7 +156,159 @@ class ExtractUrlContent(Resource):
             raise Exception(f"提取 URL 中的文本失败: {e}")
 
 
-@text_ns.route("/file-convert")
+@tool_route("url", "/crawl-site")
+class CrawlSite(Resource):
+    @text_ns.doc('crawl_site')
+    @text_ns.vendor({
+        "x-monkey-tool-name": "crawl_site",
+        "x-monkey-tool-categories": ["file"],
+        "x-monkey-tool-display-name": "站点抓取",
+        "x-monkey-tool-description": "从种子 URL 或 sitemap 开始抓取站点页面，提取正文后输出为 JSONL 文件",
+        "x-monkey-tool-icon": "emoji:🕸️:#56b4a2",
+        "x-monkey-tool-extra": {
+            "estimateTime": 300,
+        },
+        "x-monkey-tool-input": [
+            {
+                "displayName": "种子 URL",
+                "name": "urls",
+                "type": "string",
+                "default": [],
+                "required": False,
+                "typeOptions": {
+                    "multipleValues": True
+                }
+            },
+            {
+                "displayName": "sitemap URL",
+                "name": "sitemapUrl",
+                "type": "string",
+                "default": "",
+                "required": False,
+                "description": "sitemap.xml 或 sitemap 索引的地址，其中的页面作为种子 URL",
+            },
+            {
+                "displayName": "抓取深度",
+                "name": "maxDepth",
+                "type": "number",
+                "default": 2,
+                "required": False,
+                "description": "从种子页面开始最多跟随链接的层数，0 表示只抓取种子页面",
+            },
+            {
+                "displayName": "最大页面数",
+                "name": "maxPages",
+                "type": "number",
+                "default": 100,
+                "required": False,
+            },
+            {
+                "displayName": "URL 包含规则",
+                "name": "includePatterns",
+                "type": "string",
+                "default": [],
+                "required": False,
+                "description": "正则表达式，只抓取匹配任一规则的 URL，留空表示不限制",
+                "typeOptions": {
+                    "multipleValues": True
+                }
+            },
+            {
+                "displayName": "URL 排除规则",
+                "name": "excludePatterns",
+                "type": "string",
+                "default": [],
+                "required": False,
+                "description": "正则表达式，匹配任一规则的 URL 不抓取",
+                "typeOptions": {
+                    "multipleValues": True
+                }
+            },
+            {
+                "displayName": "只抓取种子所在站点",
+                "name": "sameSite",
+                "type": "boolean",
+                "default": True,
+                "required": False,
+            },
+            {
+                "displayName": "遵守 robots.txt",
+                "name": "respectRobots",
+                "type": "boolean",
+                "default": True,
+                "required": False,
+            },
+            {
+                "displayName": "同一域名并发数",
+                "name": "perHostConcurrency",
+                "type": "number",
+                "default": PER_HOST_CONCURRENCY,
+                "required": False,
+            },
+            {
+                "displayName": "输出压缩",
+                "name": "outputCompression",
+                "type": "options",
+                "options": COMPRESSION_OPTIONS,
+                "default": "none",
+                "required": False,
+            },
+        ],
+        "x-monkey-tool-output": [
+            {
+                "name": "result",
+                "displayName": "抓取结果的 JSONL 文件 URL",
+                "type": "string",
+            },
+            {
+                "name": "stats",
+                "displayName": "抓取统计",
+                "type": "any",
+            },
+        ],
+    })
+    def post(self):
+        input_data = request.json
+        task_id = generate_random_string(20)
+        urls = input_data.get("urls") or []
+        if isinstance(urls, str):
+            urls = [urls]
+        urls = [url.strip() for url in urls if url and url.strip()]
+        sitemap_url = input_data.get("sitemapUrl") or None
+        max_depth = int(input_data.get("maxDepth", 2))
+        max_pages = int(input_data.get("maxPages") or 100)
+        output_compression = input_data.get("outputCompression") or "none"
+        if not urls and not sitemap_url:
+            raise Exception("参数错误：种子 URL 和 sitemap URL 不能都为空")
+        if max_depth < 0 or max_pages <= 0:
+            raise Exception("参数错误：抓取深度和最大页面数不能为负数")
+        suffix = output_suffix(output_compression)
+
+        crawler = SiteCrawler(
+            max_depth=max_depth,
+            max_pages=max_pages,
+            include=input_data.get("includePatterns"),
+            exclude=input_data.get("excludePatterns"),
+            same_site=input_data.get("sameSite", True),
+            respect_robots=input_data.get("respectRobots", True),
+            per_host_concurrency=int(input_data.get("perHostConcurrency") or PER_HOST_CONCURRENCY),
+        )
+        folder = ensure_directory_exists(f"./download/crawl_site/{task_id}")
+        output_file = f"{folder}/pages.jsonl{suffix}"
+        # 每抓取到一个页面就写入一行，内存中不保留页面内容
+        with stage_timer("conversion"), open_text_writer(output_file, output_compression) as output, \
+                RecordWriter(output, "jsonl") as writer:
+            stats = crawler.crawl(urls, writer.write, sitemap_url=sitemap_url)
+        print(f"站点抓取完成：{json.dumps(stats, ensure_ascii=False)}")
+
+        url = upload_file(output_file, f"workflow/artifact/{task_id}/pages.jsonl{suffix}")
+        return {
+            "result": url,
+            "stats": stats,
+        }
+
+
+@tool_route("convert", "/file-convert")
 class FileConvert(Resource):
     @text_ns.doc('file_convert')
     @text_ns.vendor({
@@ -243,31 +458,34 @@ class FileConvert(Resource):
 
         # 1. 将文件下载到本地
         task_id = generate_random_string(20)
-        input_file = helper.download_file(url, "tmp/" + task_id)
+        with stage_timer("download"):
+            input_file = helper.download_file(url, "tmp/" + task_id)
+        record_bytes_in(input_file)
 
         # 2. 根据 input_format 调用helper
-        if input_format == "png" or input_format == "jpg":
-            output_file = input_file + "." + output_format
-            helper.convert_image(input_file, output_file, output_format)
-        elif input_format == "pdf" and output_format == "docx":
-            output_file = input_file + "." + output_format
-            helper.pdf_to_docx(input_file, output_file)
-        elif input_format == "docx" and output_format == "md":
-            output_file = input_file + "." + output_format
-            helper.docx_to_markdown(input_file, output_file)
-        elif input_format == "pdf" and output_format == "md":
-            output_file = input_file + "." + output_format
-            helper.pdf_to_markdown(input_file, output_file)
-        elif input_format == "xlsx" and output_format == "csv":
-            output_file = input_file + "." + output_format
-            helper.xlsx_to_csv(input_file, output_file)
-        elif input_format == "csv" and output_format == "xlsx":
-            output_file = input_file + "." + output_format
-            helper.csv_to_xlsx(input_file, output_file)
-        else:
-            raise Exception("不支持的格式转换")
+        with stage_timer("conversion"):
+            if input_format == "png" or input_format == "jpg":
+                output_file = input_file + "." + output_format
+                helper.convert_image(input_file, output_file, output_format)
+            elif input_format == "pdf" and output_format == "docx":
+                output_file = input_file + "." + output_format
+                helper.pdf_to_docx(input_file, output_file)
+            elif input_format == "docx" and output_format == "md":
+                output_file = input_file + "." + output_format
+                helper.docx_to_markdown(input_file, output_file)
+            elif input_format == "pdf" and output_format == "md":
+                output_file = input_file + "." + output_format
+                helper.pdf_to_markdown(input_file, output_file)
+            elif input_format == "xlsx" and output_format == "csv":
+                output_file = input_file + "." + output_format
+                helper.xlsx_to_csv(input_file, output_file)
+            elif input_format == "csv" and output_format == "xlsx":
+                output_file = input_file + "." + output_format
+                helper.csv_to_xlsx(input_file, output_file)
+            else:
+                raise Exception("不支持的格式转换")
         # 3. 将文件上传到 OSS
-        url = oss_client.upload_file_tos(output_file, key=f"workflow/artifact/{task_id}/{output_file.split('/')[-1]}")
+        url = upload_file(output_file, f"workflow/artifact/{task_id}/{output_file.split('/')[-1]}")
         print("txt_url", url)
         # 4. 返回文件 URL
         return {
@@ -275,7 +493,7 @@ class FileConvert(Resource):
         }
 
 
-@text_ns.route("/ocr")
+@tool_route("ocr", "/ocr")
 class OCR(Resource):
     @text_ns.doc('ocr')
     @text_ns.vendor({
@@ -299,7 +517,72 @@ class OCR(Resource):
                     "accept": ".jpg,.jpeg,.png",
                     "maxSize": 1024 * 1024 * 20
                 }
-            }
+            },
+            {
+                "displayName": "语言",
+                "name": "language",
+                "type": "options",
+                "default": "ch",
+                "required": False,
+                "options": OCR_LANGUAGE_OPTIONS,
+            },
+            {
+                "displayName": "输出格式",
+                "name": "outputFormat",
+                "type": "options",
+                "default": "text",
+                "required": False,
+                "options": [
+                    {
+                        "name": "纯文本",
+                        "value": "text",
+                    },
+                    {
+                        "name": "结构化（文本框、置信度、阅读顺序）",
+                        "value": "structured",
+                    },
+                ],
+            },
+            {
+                "displayName": "最低置信度",
+                "name": "minConfidence",
+                "type": "number",
+                "default": 0,
+                "required": False,
+                "displayOptions": {
+                    "show": {
+                        "outputFormat": ["structured"],
+                    },
+                },
+            },
+            {
+                "displayName": "长边最大像素（0 表示不缩放）",
+                "name": "maxSide",
+                "type": "number",
+                "default": 0,
+                "required": False,
+            },
+            {
+                "displayName": "灰度化",
+                "name": "grayscale",
+                "type": "boolean",
+                "default": False,
+                "required": False,
+            },
+            {
+                "displayName": "倾斜校正",
+                "name": "deskew",
+                "type": "boolean",
+                "default": False,
+                "required": False,
+            },
+            {
+                "displayName": "识别区域 x,y,w,h（像素，或 0~1 之间的比例）",
+                "name": "roi",
+                "type": "string",
+                "default": "",
+                "required": False,
+            },
         ],
         "x-monkey-tool-output": [
             {
@@ -307,40 +590,49 @@ class OCR(Resource):
                 "displayName": "识别结果 TXT",
                 "type": "string",
             },
+            {
+                "name": "lines",
+                "displayName": "按阅读顺序排列的文本行（含文本框坐标和置信度）",
+                "type": "any",
+            },
+            {
+                "name": "paragraphs",
+                "displayName": "段落",
+                "type": "any",
+            },
         ],
     })
     def post(self):
         input_data = request.json
         image_url = input_data.get("url")
+        output_format = input_data.get("outputFormat") or "text"
         tmp_file_folder = ensure_directory_exists("./download")
-        image_file_name = oss_client.download_file(image_url, tmp_file_folder)
+        image_file_name = download_file(image_url, tmp_file_folder)
 
-        ocr = PaddleOCR(
-            # 检测模型
-            # det_model_dir='{your_det_model_dir}',
-            # # 识别模型
-            # rec_model_dir='{your_rec_model_dir}',
-            # # 识别模型字典
-            # rec_char_dict_path='{your_rec_char_dict_path}',
-            # # 分类模型
-            # cls_model_dir='{your_cls_model_dir}',
-            # 加载分类模型
-            use_angle_cls=True,
-            lang='ch',
-        )
-        result = ocr.ocr(image_file_name, cls=True)
-        extracted_texts = []
-        for item in result:
-            for text_block in item:
-                text = text_block[1][0]
-                extracted_texts.append(text)
-        text = "\n".join(extracted_texts)
+        # 复用进程内已加载的模型，避免每次请求重新构造 PaddleOCR
+        ocr_helper = OCRHelper(language=input_data.get("language"))
+        # 图片只解码一次，预处理后的 ndarray 直接交给模型
+        with stage_timer("preprocess"):
+            img, matrix = ocr_helper.load_image(image_file_name, resolve_options(input_data))
+        if output_format == "structured":
+            with stage_timer("inference"):
+                structured = ocr_helper.structured(
+                    img, min_confidence=float(input_data.get("minConfidence") or 0), matrix=matrix
+                )
+            return {
+                "result": structured["text"],
+                "lines": structured["lines"],
+                "paragraphs": structured["paragraphs"],
+            }
+
+        with stage_timer("inference"):
+            text = ocr_helper.preprocess(img)
 
         print(text)
         return {"result": text}
 
 
-@text_ns.route("/pdf-to-text")
+@tool_route("ocr", "/pdf-to-text")
 class OCR(Resource):
     @text_ns.doc('pdf_to_txt')
     @text_ns.vendor({
@@ -365,6 +657,43 @@ class OCR(Resource):
                     "maxSize": 1024 * 1024 * 20
                 }
             },
+            {
+                "displayName": "语言",
+                "name": "language",
+                "type": "options",
+                "default": "ch",
+                "required": False,
+                "options": OCR_LANGUAGE_OPTIONS,
+            },
+            {
+                "displayName": "识别方式",
+                "name": "mode",
+                "type": "options",
+                "default": "layout",
+                "required": False,
+                "options": [
+                    {
+                        "name": "版面恢复（PDF -> DOCX -> TXT）",
+                        "value": "layout",
+                    },
+                    {
+                        "name": "逐页渲染后 OCR",
+                        "value": "ocr",
+                    },
+                ],
+            },
+            {
+                "displayName": "渲染 DPI",
+                "name": "dpi",
+                "type": "number",
+                "default": 200,
+                "required": False,
+                "displayOptions": {
+                    "show": {
+                        "mode": ["ocr"],
+                    },
+                },
+            },
         ],
         "x-monkey-tool-output": [
             {
@@ -386,9 +715,25 @@ class OCR(Resource):
         pdfUrl = input_data.get("pdfUrl")
         if not pdfUrl:
             raise Exception("任务参数中不存在 pdfUrl")
-        pdf_file = oss_client.download_file(pdfUrl, pdf_folder)
+        pdf_file = download_file(pdfUrl, pdf_folder)
         pdf_name = pdf_file.split("/")[-1]
 
+        if input_data.get("mode") == "ocr":
+            # 按配置的 DPI 逐页渲染，页面流式交给 OCR，内存占用与页数无关
+            dpi = input_data.get("dpi")
+            try:
+                # 工作流传入的数字可能是字符串或浮点数
+                dpi = int(float(dpi)) if dpi not in (None, "") else DEFAULT_DPI
+            except (TypeError, ValueError):
+                raise Exception(f"参数错误：dpi 应为数字，当前为 {dpi}")
+            txt_path = f"{txt_folder}/{pdf_name.replace('.pdf', '.txt')}"
+            with stage_timer("inference"):
+                OCRHelper(language=input_data.get("language")).pdf_to_text(
+                    pdf_file, txt_path, dpi=dpi if dpi > 0 else DEFAULT_DPI
+                )
+            url = upload_file(txt_path, f"workflow/artifact/{task_id}/{uuid.uuid4()}.txt")
+            return {"result": url}
+
         # pdf to docx
         cmd = [
             "paddleocr",
@@ -400,11 +745,15 @@ class OCR(Resource):
             "true",
             "--use_pdf2docx_api",
             "true",
+            "--lang",
+            resolve_language(input_data.get("language")),
+            *paddleocr_cli_options(),
             "--output",
             docx_folder,
         ]
         try:
-            result = subprocess.run(cmd, shell=False, check=True)
+            with stage_timer("inference"):
+                result = subprocess.run(cmd, shell=False, check=True)
             if result.returncode == 0:
                 print(f"版面识别成功，docx 文件地址为 {docx_folder}")
         except subprocess.CalledProcessError as e:
@@ -425,7 +774,8 @@ class OCR(Resource):
             md_path,
         ]
         try:
-            result = subprocess.run(cmd, shell=False, check=True)
+            with stage_timer("subprocess"):
+                result = subprocess.run(cmd, shell=False, check=True)
             if result.returncode == 0:
                 print(f"pandoc 转换成功，转换之后的 Markdown 文件地址为 {md_path}")
         except subprocess.CalledProcessError as e:
@@ -440,19 +790,20 @@ class OCR(Resource):
             txt_path,
         ]
         try:
-            result = subprocess.run(cmd, shell=False, check=True)
+            with stage_timer("subprocess"):
+                result = subprocess.run(cmd, shell=False, check=True)
             if result.returncode == 0:
                 print(f"pandoc 转换成功，转换之后的 txt 文件地址为 {txt_path}")
         except subprocess.CalledProcessError as e:
             print(f"pandoc 转换失败，错误信息为 {e}")
             raise Exception("pandoc 转换失败")
 
-        url = oss_client.upload_file_tos(txt_path, f"workflow/artifact/{task_id}/{uuid.uuid4()}.txt")
+        url = upload_file(txt_path, f"workflow/artifact/{task_id}/{uuid.uuid4()}.txt")
 
         return {"result": url}
 
 
-@text_ns.route("/pp-structure")
+@tool_route("ocr", "/pp-structure")
 class PPStructure(Resource):
     @text_ns.doc('pp_structure')
     @text_ns.vendor({
@@ -477,6 +828,14 @@ class PPStructure(Resource):
                     "maxSize": 1024 * 1024 * 20
                 }
             },
+            {
+                "displayName": "语言",
+                "name": "language",
+                "type": "options",
+                "default": "ch",
+                "required": False,
+                "options": OCR_LANGUAGE_OPTIONS,
+            },
         ],
         "x-monkey-tool-output": [
             {
@@ -492,14 +851,15 @@ class PPStructure(Resource):
         url = input_data.get("url")
         task_id = generate_random_string(20)
         folder = ensure_directory_exists(f"./download/{task_id}")
-        input_file = oss_client.download_file(url, folder)
-        ocr_helper = OCRHelper()
+        input_file = download_file(url, folder)
+        ocr_helper = OCRHelper(language=input_data.get("language"))
         try:
-            result = ocr_helper.recognize_text(img_path=str(input_file), task_id=task_id)
+            with stage_timer("inference"):
+                result = ocr_helper.recognize_text(img_path=str(input_file), task_id=task_id)
             if result is None:
                 raise Exception("版面恢复失败")
             # 上传 docx 文件到 OSS
-            file_url = oss_client.upload_file_tos(result, key=f"workflow/artifact/{task_id}/{result.split('/')[-1]}")
+            file_url = upload_file(result, f"workflow/artifact/{task_id}/{result.split('/')[-1]}")
             return {
                 "result": file_url,
             }
@@ -507,7 +867,95 @@ class PPStructure(Resource):
             raise Exception(f"版面恢复失败: {e}")
 
 
-@text_ns.route("/text-combination")
+@tool_route("ocr", "/table-extract")
+class TableExtract(Resource):
+    @text_ns.doc('table_extract')
+    @text_ns.vendor({
+        "x-monkey-tool-name": "table_extract",
+        "x-monkey-tool-categories": ["file"],
+        "x-monkey-tool-display-name": "表格提取",
+        "x-monkey-tool-description": "识别图片或 PDF 中的表格，每个表格输出一个 XLSX 和 CSV 文件",
+        "x-monkey-tool-icon": "emoji:📝:#56b4a2",
+        "x-monkey-tool-extra": {
+            "estimateTime": 60,
+        },
+        "x-monkey-tool-input": [
+            {
+                "displayName": "文件 URL",
+                "name": "url",
+                "type": "file",
+                "default": "",
+                "required": True,
+                "typeOptions": {
+                    "multipleValues": False,
+                    "accept": ".jpg,.jpeg,.png,.pdf",
+                    "maxSize": 1024 * 1024 * 20
+                }
+            },
+            {
+                "displayName": "语言",
+                "name": "language",
+                "type": "options",
+                "default": "ch",
+                "required": False,
+                "options": OCR_LANGUAGE_OPTIONS,
+            },
+        ],
+        "x-monkey-tool-output": [
+            {
+                "name": "result",
+                "displayName": "表格列表",
+                "type": "any",
+                "properties": [
+                    {
+                        "name": "page",
+                        "displayName": "页码",
+                        "type": "number",
+                    },
+                    {
+                        "name": "html",
+                        "displayName": "表格 HTML 结构",
+                        "type": "string",
+                    },
+                    {
+                        "name": "xlsx",
+                        "displayName": "XLSX 文件 URL",
+                        "type": "string",
+                    },
+                    {
+                        "name": "csv",
+                        "displayName": "CSV 文件 URL",
+                        "type": "string",
+                    },
+                ],
+                "typeOptions": {
+                    "multipleValues": True
+                }
+            },
+        ],
+    })
+    def post(self):
+        input_data = request.json
+        url = input_data.get("url")
+        if not url:
+            raise Exception("参数错误：未提供文件 URL")
+        task_id = generate_random_string(20)
+        folder = ensure_directory_exists(f"./download/{task_id}")
+        input_file = download_file(url, folder)
+        if not input_file:
+            raise Exception("下载文件失败")
+        try:
+            with stage_timer("inference"):
+                tables = OCRHelper(language=input_data.get("language")).extract_tables(input_file, f"{folder}/tables")
+        except Exception as e:
+            raise Exception(f"表格提取失败: {e}")
+        for table in tables:
+            for key in ["xlsx", "csv"]:
+                table[key] = upload_file(table[key], f"workflow/artifact/{task_id}/{table[key].split('/')[-1]}")
+        return {"result": tables}
+
+
+@tool_route("text", "/text-combination")
 class TextCombination(Resource):
     @text_ns.doc('text_combination')
     @text_ns.vendor({
@@ -551,7 +999,7 @@ class TextCombination(Resource):
                 "displayOptions": {"show": {"textOrUrl": ["url"]}},
                 "typeOptions": {
                     "multipleValues": True,
-                    "accept": ".json,.jsonl,.txt",
+                    "accept": ".json,.jsonl,.txt,.gz,.zst",
                     "maxSize": 1024 * 1024 * 20
                 }
             },
@@ -576,6 +1024,45 @@ class TextCombination(Resource):
                 "default": "txt",
                 "required": True,
             },
+            {
+                "displayName": "去重方式",
+                "name": "dedup",
+                "type": "options",
+                "options": [
+                    {"name": "不去重", "value": "none"},
+                    {"name": "精确去重", "value": "exact"},
+                    {"name": "精确去重 + 近似去重", "value": "near"},
+                ],
+                "default": "none",
+                "required": False,
+                "description": "TXT 按行去重，JSONL 按记录去重，JSON 按文档去重",
+            },
+            {
+                "displayName": "去重字段",
+                "name": "dedupKey",
+                "type": "string",
+                "default": "",
+                "required": False,
+                "description": "JSON/JSONL 记录中用于去重的字段，不填时使用整条记录",
+                "displayOptions": {"show": {"dedup": ["exact", "near"]}},
+            },
+            {
+                "displayName": "近似去重相似度阈值",
+                "name": "dedupThreshold",
+                "type": "number",
+                "default": 0.8,
+                "required": False,
+                "description": "两条文本的 Jaccard 相似度（按字符 shingle 计算）超过该值时视为重复",
+                "displayOptions": {"show": {"dedup": ["near"]}},
+            },
+            {
+                "displayName": "输出压缩格式",
+                "name": "outputCompression",
+                "type": "options",
+                "options": COMPRESSION_OPTIONS,
+                "default": "none",
+                "required": False,
+            },
         ],
         "x-monkey-tool-output": [
             {
@@ -583,100 +1070,93 @@ class TextCombination(Resource):
                 "displayName": "合并后的输出的文本URL",
                 "type": "string",
             },
+            {
+                "name": "total",
+                "displayName": "去重前的记录数",
+                "type": "number",
+            },
+            {
+                "name": "droppedExact",
+                "displayName": "精确重复被丢弃的记录数",
+                "type": "number",
+            },
+            {
+                "name": "droppedNear",
+                "displayName": "近似重复被丢弃的记录数",
+                "type": "number",
+            },
         ],
     })
     def post(self):
         input_data = request.json
         task_id = generate_random_string(20)
-        documents = input_data.get("documents")
-        documents_url = input_data.get("documentsUrl")
+        documents = input_data.get("documents") or []
+        if isinstance(documents, str):
+            documents = [documents]
+        documents_url = input_data.get("documentsUrl") or []
         if isinstance(documents_url, str):
             documents_url = [documents_url]
         document_type = input_data.get("documentType")  # 支持 json，jsonl, txt
+        dedup_mode = input_data.get("dedup") or "none"
+        dedup_key = input_data.get("dedupKey")
+        dedup_threshold = float(input_data.get("dedupThreshold") or 0.8)
+        output_compression = input_data.get("outputCompression") or "none"
 
         if not documents and not documents_url:
             raise Exception("参数错误：未提供文档")
         if document_type not in ["json", "jsonl", "txt"]:
             raise Exception("参数错误：不支持的文档类型")
+        if dedup_mode not in ["none", "exact", "near"]:
+            raise Exception("参数错误：不支持的去重方式")
+        if not 0 < dedup_threshold <= 1:
+            raise Exception("参数错误：相似度阈值应在 0~1 之间")
+        suffix = output_suffix(output_compression)
 
         folder = ensure_directory_exists(f"./download/text_combination/{task_id}")
-        # 合并本地文件
-        if len(documents) > 1:
-            document_list = []
-            for document in documents:
-                if document_type == "json":
-                    document_list.append(json.load(document))
-                elif document_type == "jsonl":
-                    for line in document.split("\n"):
-                        document_list.append(json.loads(line))
-                elif document_type == "txt":
-                    document_list.append(document)
+        # 下载需要合并的文件到本地
+        document_files = []
+        for document_url in documents_url:
+            document_file = download_file(document_url, folder)
+            # 压缩文件按 magic bytes 识别并边读边解压，类型检查时忽略 .gz / .zst 后缀
+            file_ext = strip_compression_ext(document_file).split(".")[-1]
+            if file_ext != document_type:
+                raise Exception(f"配置的文档类型为 {document_type}，但是实际上文档类型为 {file_ext}")
+            document_files.append(document_file)
+        if document_files:
+            print(f"{len(document_files)}个文件下载完成，开始合并")
 
-            filename = f"{folder}/all.{document_type}"
-            with open(filename, "w") as f:
-                if document_type == "json":
-                    json.dump(document_list, f)
-                elif document_type == "jsonl":
-                    for document in document_list:
-                        f.write(json.dumps(document))
-                        f.write("\n")
-                elif document_type == "txt":
-                    for document in document_list:
-                        f.write(f"{document}")
-                        f.write("\n")
-            url = oss_client.upload_file_tos(filename, f"workflow/artifact/{task_id}/result.txt")
-            return {"result": url}
-        else:
-            # 下载需要合并的文件到本地
-            for document_url in documents_url:
-                oss_client.download_file(document_url, folder)
-                print(f"{len(documents_url)}个文件下载完成，开始合并")
-            all_document_file = os.listdir(folder)
-            document_list = []
-            document = documents[0]
-            if document_type == "json":
-                document_list.append(json.load(document))
-            elif document_type == "jsonl":
-                for line in document.split("\n"):
-                    document_list.append(json.loads(line))
-            elif document_type == "txt":
-                document_list.append(document)
+        deduplicator = Deduplicator(dedup_mode, key=dedup_key, threshold=dedup_threshold) \
+            if dedup_mode != "none" else None
+        all_filename = f"{folder}/all.{document_type}{suffix}"
+        # 逐条读取、去重并写入，内存占用与文档大小无关（json 文档需要整体解析）
+        with stage_timer("conversion"), open_text_writer(all_filename, output_compression) as output, \
+                RecordWriter(output, document_type) as writer:
+            def combine(lines):
+                for record in iter_records(lines, document_type):
+                    blank = isinstance(record, str) and not record.strip()
+                    if deduplicator is None or blank or not deduplicator.is_duplicate(record):
+                        writer.write(record)
+                writer.end_document()
 
-            for document_file in all_document_file:
-                file_ext = document_file.split(".")[-1]
-                file_name = f"{folder}/{document_file}"
-                if file_ext != document_type:
-                    raise Exception(f"配置的文档类型为 {document_type}，但是实际上文档类型为 {file_ext}")
-                if document_type == "json":
-                    with open(file_name, "r") as f:
-                        document_list.append(json.load(f))
-                elif document_type == "jsonl":
-                    with open(file_name, "r") as f:
-                        for line in f.readlines():
-                            document_list.append(json.loads(line))
-                elif document_type == "txt":
-                    with open(file_name, "r") as f:
-                        document_list.append(f.read())
-            all_filename = f"{folder}/all.{document_type}"
-            print(all_filename, document_type)
-            with open(all_filename, "w") as f:
-                if document_type == "json":
-                    json.dump(document_list, f)
-                elif document_type == "jsonl":
-                    for document in document_list:
-                        f.write(json.dumps(document))
-                        f.write("\n")
-                elif document_type == "txt":
-                    for document in document_list:
-                        f.write(document)
-                        f.write("\n")
-            url = oss_client.upload_file_tos(
-                all_filename, f"workflow/artifact/{task_id}/result.{document_type}"
-            )
-            return {"result": url}
+            for document in documents:
+                combine(document.splitlines(keepends=True))
+            for document_file in document_files:
+                with open_text(document_file) as f:
+                    combine(f)
+
+        url = upload_file(
+            all_filename, f"workflow/artifact/{task_id}/result.{document_type}{suffix}"
+        )
+        result = {"result": url}
+        if deduplicator is not None:
+            stats = deduplicator.stats()
+            print(f"文本合并去重：共 {stats['total']} 条，精确重复 {stats['droppedExact']} 条，"
+                  f"近似重复 {stats['droppedNear']} 条")
+            result.update(stats)
+        return result
 
 
-@text_ns.route("/text-replace")
+@tool_route("text", "/text-replace")
 class TextReplace(Resource):
     @text_ns.doc('text_replace')
     @text_ns.vendor({
@@ -731,7 +1211,7 @@ class TextReplace(Resource):
                 },
                 "typeOptions": {
                     "multipleValues": False,
-                    "accept": ".txt",
+                    "accept": ".txt,.gz,.zst",
                     "maxSize": 1024 * 1024 * 20
                 }
             },
@@ -749,6 +1229,19 @@ class TextReplace(Resource):
                 "default": "",
                 "required": True,
             },
+            {
+                "displayName": "输出压缩格式",
+                "name": "outputCompression",
+                "type": "options",
+                "options": COMPRESSION_OPTIONS,
+                "default": "none",
+                "required": False,
+                "displayOptions": {
+                    "show": {
+                        "documentType": ["documentUrl"],
+                    },
+                },
+            },
         ],
         "x-monkey-tool-output": [
             {
@@ -777,22 +1270,25 @@ class TextReplace(Resource):
             raise Exception("参数错误")
 
         if document:
-            document = document.replace(text, replace_text)
+            with stage_timer("conversion"):
+                document = document.replace(text, replace_text)
             return {"result": document}
         elif document_url:
+            output_compression = input_data.get("outputCompression") or "none"
+            suffix = output_suffix(output_compression)
             tmp_file_folder = ensure_directory_exists("./download")
-            file_name = oss_client.download_file(document_url, tmp_file_folder)
-            with open(file_name, "r") as f:
-                lines = f.readlines()
-            lines = [line.replace(text, replace_text) for line in lines]
-            with open(file_name, "w") as f:
-                for line in lines:
-                    f.write(line)
-            url = oss_client.upload_file_tos(file_name, f"workflow/artifact/{task_id}/result.txt")
+            file_name = download_file(document_url, tmp_file_folder)
+            result_file_name = f"{tmp_file_folder}/{task_id}.txt{suffix}"
+            # 逐行替换，压缩的输入边读边解压
+            with stage_timer("conversion"):
+                with open_text(file_name) as f, open_text_writer(result_file_name, output_compression) as output:
+                    for line in f:
+                        output.write(line.replace(text, replace_text))
+            url = upload_file(result_file_name, f"workflow/artifact/{task_id}/result.txt{suffix}")
             return {"result": url}
 
 
-@text_ns.route("/text-segment")
+@tool_route("text", "/text-segment")
 class TextSegmentResource(Resource):
     @text_ns.doc('text_segment')
     @text_ns.vendor({
@@ -805,18 +1301,56 @@ class TextSegmentResource(Resource):
             "estimateTime": 30,
         },
         "x-monkey-tool-input": [
+            {
+                "displayName": "文档数量",
+                "name": "documentMode",
+                "type": "options",
+                "default": "single",
+                "required": False,
+                "options": [
+                    {"name": "单个文档", "value": "single"},
+                    {"name": "多个文档", "value": "multiple"},
+                ],
+            },
             {
                 "displayName": "txt 文件",
                 "name": "txtUrl",
                 "type": "file",
                 "default": "",
-                "required": True,
+                "required": False,
+                "displayOptions": {"show": {"documentMode": ["single"]}},
                 "typeOptions": {
                     "multipleValues": False,
-                    "accept": ".txt",
+                    "accept": ".txt,.gz,.zst",
+                    "maxSize": 1024 * 1024 * 20
+                }
+            },
+            {
+                "displayName": "txt 文件列表",
+                "name": "txtUrls",
+                "type": "file",
+                "default": [],
+                "required": False,
+                "displayOptions": {"show": {"documentMode": ["multiple"]}},
+                "typeOptions": {
+                    "multipleValues": True,
+                    "accept": ".txt,.gz,.zst",
                     "maxSize": 1024 * 1024 * 20
                 }
             },
+            {
+                "displayName": "文档清单",
+                "name": "manifestUrl",
+                "type": "file",
+                "default": "",
+                "required": False,
+                "description": "txt 每行一个 URL；json / jsonl 中每项为 URL 或 {\"id\": ..., \"url\": ...}",
+                "displayOptions": {"show": {"documentMode": ["multiple"]}},
+                "typeOptions": {
+                    "multipleValues": False,
+                    "accept": ".txt,.json,.jsonl,.gz,.zst",
+                }
+            },
             {
                 "displayName": "切割器",
                 "name": "splitType",
@@ -838,6 +1372,11 @@ class TextSegmentResource(Resource):
                         "value": "markdown",
                         "description": "Markdown 切割器",
                     },
+                    {
+                        "name": "Markdown 标题 + 大小切割器",
+                        "value": "markdownBySize",
+                        "description": "先按标题切分章节，章节内再按块大小切分，代码块和表格不会被切开",
+                    },
                     {
                         "name": "递归字符切割器",
                         "value": "recursivelySplitByCharacter",
@@ -848,6 +1387,11 @@ class TextSegmentResource(Resource):
                         "value": "splitByToken",
                         "description": "Token 切割器",
                     },
+                    {
+                        "name": "内容定义切割器",
+                        "value": "contentDefined",
+                        "description": "根据内容选择切分点，文档局部修改时只有附近的分段会变化，适合增量更新索引",
+                    },
                 ],
                 "required": False,
             },
@@ -880,6 +1424,19 @@ class TextSegmentResource(Resource):
                     },
                 },
             },
+            {
+                "displayName": "标题层级",
+                "name": "headerDepth",
+                "type": "number",
+                "default": 3,
+                "required": False,
+                "description": "按 1 ~ headerDepth 级标题切分章节",
+                "displayOptions": {
+                    "show": {
+                        "splitType": ["markdownBySize"],
+                    },
+                },
+            },
             {
                 "displayName": "语言",
                 "name": "language",
@@ -958,6 +1515,21 @@ class TextSegmentResource(Resource):
                 ],
                 "required": True,
             },
+            {
+                "displayName": "返回分段哈希",
+                "name": "returnHashes",
+                "type": "boolean",
+                "default": False,
+                "required": False,
+            },
+            {
+                "displayName": "上一次的分段清单",
+                "name": "previousManifest",
+                "type": "string",
+                "default": "",
+                "required": False,
+                "description": "上一次返回的 manifest（分段哈希列表），传入后 result 只包含新增和修改的分段",
+            },
         ],
         "x-monkey-tool-output": [
             {
@@ -968,6 +1540,34 @@ class TextSegmentResource(Resource):
                     "multipleValues": True
                 }
             },
+            {
+                "name": "chunks",
+                "displayName": "分段及其哈希",
+                "type": "any",
+            },
+            {
+                "name": "manifest",
+                "displayName": "分段清单（分段哈希列表）",
+                "type": "string",
+                "typeOptions": {
+                    "multipleValues": True
+                }
+            },
+            {
+                "name": "changes",
+                "displayName": "与上一次分段清单相比的变化",
+                "type": "any",
+            },
+            {
+                "name": "resultUrl",
+                "displayName": "多个文档的分段结果（JSONL，每行包含 source、index、text、hash）",
+                "type": "string",
+            },
+            {
+                "name": "stats",
+                "displayName": "多个文档分段的统计信息",
+                "type": "any",
+            },
         ],
     })
     def post(self):
@@ -978,49 +1578,169 @@ class TextSegmentResource(Resource):
         txt_url = input_data.get("txtUrl")
         separator = input_data.get("separator")
         split_type = input_data.get("splitType")
+        header_depth = input_data.get("headerDepth") or 3
+        return_hashes = bool(input_data.get("returnHashes"))
+        previous_manifest = input_data.get("previousManifest")
         print(input_data)
+        if input_data.get("documentMode") == "multiple":
+            if not split_type or not chunk_size or not chunk_overlap:
+                raise Exception("参数错误")
+            return self.segment_documents(input_data, {
+                "split_type": split_type,
+                "chunk_size": chunk_size,
+                "chunk_overlap": chunk_overlap,
+                "separator": separator,
+                "language": language,
+                "header_depth": header_depth,
+            })
         if not txt_url or not split_type or not chunk_size or not chunk_overlap:
             raise Exception("参数错误")
+        previous_hashes = parse_manifest(previous_manifest) if previous_manifest else None
 
         tmp_file_folder = ensure_directory_exists("./download")
-        txt_file_name = oss_client.download_file(txt_url, tmp_file_folder)
+        txt_file_name = download_file(txt_url, tmp_file_folder)
+        text = read_text(txt_file_name)
+        splitter = build_splitter(split_type, chunk_size, chunk_overlap, separator, language, header_depth)
 
-        text = ""
-        try:
-            with open(txt_file_name, "r", encoding="utf-8") as f:
-                text = f.read()
-        except:
-            raise Exception("读取文件失败，请传入合法的 utf-8 格式的 txt 文件")
+        with stage_timer("conversion"):
+            segments = [serialize_segment(segment) for segment in split_text(splitter, split_type, text, chunk_size)]
+        print("转换完成")
+        if not return_hashes and previous_hashes is None:
+            return {"result": segments}
 
-        splitter = None
-        if split_type == "splitByCharacter":
-            splitter = CharacterTextSplitter(
-                separator=separator,
-                chunk_size=chunk_size,
-                chunk_overlap=chunk_overlap,
-            )
-        elif split_type == "splitCode":
-            splitter = RecursiveCharacterTextSplitter.from_language(
-                language=language,
-                chunk_size=chunk_size,
-                chunk_overlap=chunk_overlap,
-            )
-        elif split_type == "markdown":
-            headers_to_split_on = [
-                ("#", "Header 1"),
-                ("##", "Header 2"),
-                ("###", "Header 3"),
-            ]
-            splitter = MarkdownHeaderTextSplitter(headers_to_split_on=headers_to_split_on)
-        elif split_type == "recursivelySplitByCharacter":
-            splitter = RecursiveCharacterTextSplitter(chunk_size, chunk_overlap)
-        elif split_type == "splitByToken":
-            splitter = CharacterTextSplitter.from_tiktoken_encoder(
-                chunk_size=chunk_size, chunk_overlap=chunk_overlap
-            )
-        else:
-            raise Exception(f"split_type 参数错误")
+        chunks = [
+            {"index": index, "hash": chunk_hash(segment_text(segment)), "text": segment}
+            for index, segment in enumerate(segments)
+        ]
+        result = {
+            "result": segments,
+            "chunks": chunks,
+            "manifest": [chunk["hash"] for chunk in chunks],
+        }
+        if previous_hashes is not None:
+            changes = diff_manifest(previous_hashes, chunks)
+            print(f"分段变化：新增 {len(changes['added'])}，修改 {len(changes['changed'])}，"
+                  f"删除 {len(changes['removed'])}，未变化 {changes['unchanged']}")
+            result["changes"] = changes
+            # 只返回需要重新处理的分段
+            result["chunks"] = sorted(changes["added"] + changes["changed"], key=lambda chunk: chunk["index"])
+            result["result"] = [chunk["text"] for chunk in result["chunks"]]
+        return result
 
-        segments = splitter.split_text(text)
-        print("转换完成")
-        return {"result": segments}
+    @staticmethod
+    def load_sources(input_data, folder):
+        """
+            多文档模式的输入：txtUrls 列表和/或 manifestUrl 清单文件，返回 [(source_id, url), ...]
+        """
+        sources = []
+        txt_urls = input_data.get("txtUrls") or []
+        if isinstance(txt_urls, str):
+            txt_urls = [txt_urls]
+        sources.extend((url, url) for url in txt_urls if url)
+
+        manifest_url = input_data.get("manifestUrl")
+        if manifest_url:
+            manifest_file = download_file(manifest_url, folder)
+            manifest_ext = strip_compression_ext(manifest_file).split(".")[-1]
+            with open_text(manifest_file) as f:
+                if manifest_ext == "json":
+                    items = json.load(f)
+                elif manifest_ext == "jsonl":
+                    items = [json.loads(line) for line in f if line.strip()]
+                else:
+                    items = [line.strip() for line in f if line.strip()]
+            for number, item in enumerate(items, 1):
+                if isinstance(item, dict):
+                    url = item.get("url")
+                    if not url or not isinstance(url, str):
+                        raise Exception(f"参数错误：文档清单第 {number} 项缺少 url")
+                    sources.append((str(item.get("id") or url), url))
+                elif isinstance(item, str) and item:
+                    sources.append((item, item))
+                else:
+                    raise Exception(f"参数错误：文档清单第 {number} 项应为 URL 或包含 url 的对象")
+        if not sources:
+            raise Exception("参数错误：未提供文档")
+        return sources
+
+    def segment_documents(self, input_data, options):
+        """
+            多文档分段：线程池并发下载，进程内共用的进程池并行切分（工作进程按参数缓存切割器），
+            结果按完成顺序逐行写入一个 JSONL 文件
+        """
+        task_id = generate_random_string(20)
+        folder = ensure_directory_exists(f"./download/text_segment/{task_id}")
+        sources = self.load_sources(input_data, folder)
+        fetch_concurrency = segment_config.get('fetch_concurrency', 8)
+        build_splitter(**options)  # 提前校验参数，避免在每个工作进程里报错
+
+        start = time.perf_counter()
+        failed = []
+        documents = segments = characters = 0
+        output_file = f"{folder}/segments.jsonl"
+        pool = get_split_pool()
+
+        def fetch(index, url):
+            # 下载线程中没有请求上下文，只返回文件路径和耗时，指标由请求线程记录
+            fetch_start = time.perf_counter()
+            file_path = oss_client.download_file(url, ensure_directory_exists(f"{folder}/{index}"))
+            return file_path, time.perf_counter() - fetch_start
+
+        def submit(source, file_path):
+            nonlocal pool
+            try:
+                return pool.submit(split_file, options, source, file_path)
+            except BrokenProcessPool:
+                # 之前有工作进程异常退出，换一个新的进程池
+                discard_split_pool(pool)
+                pool = get_split_pool()
+                return pool.submit(split_file, options, source, file_path)
+
+        with ThreadPoolExecutor(max_workers=fetch_concurrency) as fetcher, \
+                open(output_file, "w", encoding="utf-8") as output:
+            downloads = {fetcher.submit(fetch, index, url): source for index, (source, url) in enumerate(sources)}
+            splits = {}
+            for future in as_completed(downloads):
+                source = downloads[future]
+                try:
+                    file_path, seconds = future.result()
+                    record_stage("download", seconds)
+                    record_bytes_in(file_path)
+                    splits[submit(source, file_path)] = source
+                except Exception as e:
+                    failed.append({"source": source, "error": str(e)})
+
+            with stage_timer("conversion"):
+                for future in as_completed(splits):
+                    try:
+                        source, document_segments, length = future.result()
+                    except BrokenProcessPool as e:
+                        discard_split_pool(pool)
+                        failed.append({"source": splits[future], "error": f"分段进程异常退出: {e}"})
+                        continue
+                    except Exception as e:
+                        failed.append({"source": splits[future], "error": str(e)})
+                        continue
+                    for index, (text, metadata) in enumerate(document_segments):
+                        record = {"source": source, "index": index, "text": text, "hash": chunk_hash(text)}
+                        if metadata:
+                            record["metadata"] = metadata
+                        output.write(json.dumps(record, ensure_ascii=False))
+                        output.write("\n")
+                    documents += 1
+                    segments += len(document_segments)
+                    characters += length
+
+        seconds = time.perf_counter() - start
+        stats = {
+            "documents": documents,
+            "segments": segments,
+            "characters": characters,
+            "failed": failed,
+            "seconds": round(seconds, 3),
+            "documentsPerSecond": round(documents / seconds, 2) if seconds else None,
+            "charactersPerSecond": round(characters / seconds, 2) if seconds else None,
+        }
+        print(f"多文档分段完成：{documents} 个文档，{segments} 个分段，失败 {len(failed)} 个，耗时 {seconds:.2f}s")
+        url = upload_file(output_file, f"workflow/artifact/{task_id}/segments.jsonl")
+        return {"resultUrl": url, "stats": stats}
@@ -1,10 +1,19 @@
 from flask import Flask, request
 from flask_restx import Api
 
+from .coalescing import join_in_flight, publish_response, abandon_in_flight
+from .concurrency import acquire_slot, release_slot
+from .metrics import start_request, record_response, finish_request, stage_timer, generate_metrics
+from .profiling import start_profiling, stop_profiling
+from .responses import output_json, compress_response, cached_specs
+
 app = Flask(__name__)
 api = Api(app, version='1.0', title='TodoMVC API',
           description='A simple TodoMVC API',
           )
+# 工具输出使用 orjson 序列化；swagger.json 只生成一次并带 ETag
+api.representations['application/json'] = output_json
+app.view_functions['specs'] = cached_specs(api)
 
 
 @app.before_request
@@ -13,6 +22,39 @@ def before_request():
     request.user_id = request.headers.get('x-monkeys-userid')
     request.team_id = request.headers.get('x-monkeys-teamid')
     request.workflow_instance_id = request.headers.get('x-monkeys-workflow-instanceid')
+    start_request()
+    # 相同参数的 OCR / PDF 请求正在执行时，等待并复用它的结果，不再占用执行槽位
+    with stage_timer("queue"):
+        coalesced_response = join_in_flight()
+    if coalesced_response is not None:
+        return coalesced_response
+    # 重型 / 轻量接口分别限流，队列满时直接返回 503
+    with stage_timer("queue"):
+        overload_response = acquire_slot()
+    if overload_response is not None:
+        return overload_response
+    start_profiling()
+
+
+@app.after_request
+def after_request(response):
+    stop_profiling(response)
+    publish_response(response)
+    # 在共享给合并请求之后压缩，等待方按各自的 Accept-Encoding 重新协商
+    return record_response(compress_response(response))
+
+
+@app.teardown_request
+def teardown_request(exception=None):
+    stop_profiling()
+    release_slot()
+    abandon_in_flight(exception)
+    finish_request()
+
+
+@app.get("/metrics")
+def get_metrics():
+    return generate_metrics()
 
 
 @app.get("/manifest.json")
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import threading
+import time
+
+from flask import request, Response
+from prometheus_client import Counter
+
+from src.config import config_data
+
+coalescing_config = config_data.get('coalescing') or {}
+
+COALESCING_ENABLED = coalescing_config.get('enabled', True)
+# 等待相同请求结果的最长时间，超时后不再等待，自己执行（等待期间占用一个服务线程）
+WAIT_TIMEOUT = coalescing_config.get('wait_timeout', 60)
+
+# 同一进程内，参数完全相同的并发请求只执行一次
+COALESCED_ENDPOINTS = [
+    "/text/ocr",
+    "/text/pdf-to-text",
+]
+# 随共享结果一起返回给等待方的响应头
+SHARED_HEADERS = ["Content-Type"]
+# 执行方被限流拒绝时的状态码：限流按租户计算，结果不共享，等待方重新竞争执行
+RETRY_STATUSES = [429, 503]
+
+COALESCED_REQUESTS = Counter(
+    "monkeys_tools_text_coalesced_requests_total",
+    "与正在执行的相同请求合并、直接复用其结果的请求数",
+    ["endpoint", "outcome"],
+)
+
+
+class _InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+        self.retry = False
+
+
+_in_flight = {}
+_lock = threading.Lock()
+
+
+def _request_key():
+    # 接口 + 请求参数（包含输入文件 URL），参数按 key 排序后计算
+    payload = request.get_json(silent=True)
+    body = json.dumps(payload, sort_keys=True, ensure_ascii=False) if payload is not None \
+        else request.get_data(as_text=True)
+    return hashlib.sha256(f"{request.path}\n{body}".encode("utf-8")).hexdigest()
+
+
+def join_in_flight():
+    """
+        在 before_request 中、占用执行槽位之前调用：
+        已有相同请求在执行时等待并返回它的响应（不占用槽位），否则登记当前请求为执行方，返回 None
+    """
+    if not COALESCING_ENABLED or request.path not in COALESCED_ENDPOINTS or request.method != "POST":
+        return None
+    key = _request_key()
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while True:
+        with _lock:
+            call = _in_flight.get(key)
+            if call is None:
+                _in_flight[key] = _InFlight()
+                request.coalesce_key = key
+                return None
+
+        if not call.done.wait(max(0, deadline - time.monotonic())):
+            # 不再等待，不登记为执行方，直接自己执行
+            COALESCED_REQUESTS.labels(request.path, "timeout").inc()
+            return None
+        if call.retry:
+            COALESCED_REQUESTS.labels(request.path, "retry").inc()
+            continue
+        break
+
+    if call.error is not None:
+        COALESCED_REQUESTS.labels(request.path, "error").inc()
+        return {
+            "code": 500,
+            "message": f"相同请求执行失败: {call.error}",
+        }, 500
+    COALESCED_REQUESTS.labels(request.path, "shared").inc()
+    data, status, headers = call.response
+    response = Response(data, status=status, headers=headers)
+    response.headers["x-monkeys-coalesced"] = "1"
+    return response
+
+
+def _finish(response=None, error=None):
+    key = getattr(request, "coalesce_key", None)
+    if key is None:
+        return
+    request.coalesce_key = None
+    with _lock:
+        call = _in_flight.pop(key, None)
+    if call is None:
+        return
+    if response is not None and response.status_code in RETRY_STATUSES:
+        call.retry = True
+    elif response is not None:
+        headers = {name: response.headers[name] for name in SHARED_HEADERS if name in response.headers}
+        call.response = (response.get_data(), response.status_code, headers)
+    else:
+        call.error = error or Exception("请求未返回结果")
+    call.done.set()
+
+
+def publish_response(response):
+    """
+        在 after_request 中调用，将执行方的响应共享给所有等待方；
+        执行方被限流拒绝（429 / 503）时不共享，等待方重新登记或加入新的执行方
+    """
+    _finish(response=response)
+    return response
+
+
+def abandon_in_flight(exception=None):
+    """
+        在 teardown_request 中调用，执行方没有产生响应（未处理的异常）时通知等待方失败
+    """
+    _finish(error=exception)
@@ -0,0 +1,273 @@
+import itertools
+import threading
+import time
+from collections import deque
+
+from flask import request
+from prometheus_client import Counter, Histogram
+
+from src.config import config_data
+from .metrics import LATENCY_BUCKETS, team_label
+
+# 计算密集型接口（OCR / 版面分析），与轻量文本接口分开限流，避免互相抢占
+HEAVY_ENDPOINTS = [
+    "/text/ocr",
+    "/text/pp-structure",
+    "/text/pdf-to-text",
+    "/text/table-extract",
+]
+LIGHT_ENDPOINTS = [
+    "/text/text-replace",
+    "/text/text-combination",
+    "/text/text-segment",
+]
+
+# heavy 的排队超时不短于组内最慢接口（/text/pdf-to-text，estimateTime 180 秒）的一次执行时间，
+# 否则排在一个正常的 PDF 请求后面也会被拒绝
+DEFAULT_LIMITS = {
+    "heavy": {"max_concurrency": 1, "max_queue": 4, "queue_timeout": 180, "fair_share": {"enabled": True}},
+    "light": {"max_concurrency": 16, "max_queue": 64, "queue_timeout": 10},
+}
+# 公平调度的租户划分方式：按团队、按应用，或按团队 + 应用
+TENANT_KEYS = ["team", "app", "team_app"]
+
+ADMISSION_WAIT = Histogram(
+    "monkeys_tools_text_admission_wait_seconds",
+    "请求在限流队列中的等待时间",
+    ["limiter", "team_id"],
+    buckets=LATENCY_BUCKETS,
+)
+ADMISSION_RUN = Histogram(
+    "monkeys_tools_text_admission_run_seconds",
+    "请求占用执行槽位的时间",
+    ["limiter", "team_id"],
+    buckets=LATENCY_BUCKETS,
+)
+ADMISSION_REJECTED = Counter(
+    "monkeys_tools_text_admission_rejected_total",
+    "被限流拒绝（返回 503）的请求数",
+    ["limiter", "team_id", "reason"],
+)
+
+
+class ServerOverloadedException(Exception):
+    def __init__(self, message, reason="queue_full"):
+        super().__init__(message)
+        self.reason = reason
+
+
+class ConcurrencyLimiter:
+    """
+        单进程内的并发限制：最多 max_concurrency 个请求同时执行，
+        最多 max_queue 个请求排队等待，排队超过 queue_timeout 秒或队列已满时拒绝
+    """
+
+    def __init__(self, name, max_concurrency, max_queue, queue_timeout):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.running = 0
+        self.waiting = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, tenant=None):
+        with self._cond:
+            if self.running < self.max_concurrency:
+                self.running += 1
+                return
+            if self.waiting >= self.max_queue:
+                raise ServerOverloadedException(f"{self.name} 队列已满")
+            self.waiting += 1
+            try:
+                acquired = self._cond.wait_for(
+                    lambda: self.running < self.max_concurrency, timeout=self.queue_timeout
+                )
+                if not acquired:
+                    raise ServerOverloadedException(f"{self.name} 排队超时", reason="timeout")
+                self.running += 1
+            finally:
+                self.waiting -= 1
+
+    def release(self, tenant=None):
+        with self._cond:
+            self.running -= 1
+            self._cond.notify()
+
+
+class _Waiter:
+    def __init__(self, tenant, seq):
+        self.tenant = tenant
+        self.seq = seq
+        self.granted = False
+        self.event = threading.Event()
+
+
+class FairShareLimiter:
+    """
+        按租户（团队 / 应用）公平调度的并发限制：
+        - 每个租户最多 team_max_concurrency 个请求同时执行、最多 team_max_queue 个请求排队
+        - 有空闲槽位时，在还有排队请求且未达到并发上限的租户中选虚拟时间最小的租户放行（加权公平排队），
+          租户每放行一个请求虚拟时间增加 1 / weight，权重越大分到的槽位越多
+        - 全局最多 max_concurrency 个请求同时执行、max_queue 个请求排队，排队超时或队列已满时拒绝
+    """
+
+    def __init__(self, name, max_concurrency, max_queue, queue_timeout, team_max_concurrency=0,
+                 team_max_queue=0, weights=None):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        # 0 表示不单独限制，只受全局限制
+        self.team_max_concurrency = team_max_concurrency or max_concurrency
+        self.team_max_queue = team_max_queue or max_queue
+        self.weights = weights or {}
+        self.running = 0
+        self.waiting = 0
+        self._running = {}
+        self._queues = {}
+        self._vtime = {}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def _weight(self, tenant):
+        return max(float(self.weights.get(tenant, 1)), 1e-6)
+
+    def _grant(self, tenant):
+        self.running += 1
+        self._running[tenant] = self._running.get(tenant, 0) + 1
+        self._vtime[tenant] += 1 / self._weight(tenant)
+
+    def _activate(self, tenant):
+        # 空闲后重新开始排队的租户从当前最小虚拟时间开始，不能用之前空闲的时间攒下的额度插队
+        if tenant in self._queues or self._running.get(tenant):
+            return
+        active = [self._vtime[t] for t in self._vtime if t in self._queues or self._running.get(t)]
+        self._vtime[tenant] = max(self._vtime.get(tenant, 0), min(active, default=0))
+
+    def _dispatch(self):
+        while self.running < self.max_concurrency:
+            eligible = [
+                tenant for tenant, queue in self._queues.items()
+                if queue and self._running.get(tenant, 0) < self.team_max_concurrency
+            ]
+            if not eligible:
+                return
+            tenant = min(eligible, key=lambda t: (self._vtime[t], self._queues[t][0].seq))
+            waiter = self._queues[tenant].popleft()
+            if not self._queues[tenant]:
+                del self._queues[tenant]
+            self.waiting -= 1
+            self._grant(tenant)
+            waiter.granted = True
+            waiter.event.set()
+
+    def acquire(self, tenant=None):
+        tenant = tenant or ""
+        with self._lock:
+            self._activate(tenant)
+            if not self._queues.get(tenant) and self.running < self.max_concurrency \
+                    and self._running.get(tenant, 0) < self.team_max_concurrency:
+                self._grant(tenant)
+                return
+            if self.waiting >= self.max_queue:
+                raise ServerOverloadedException(f"{self.name} 队列已满")
+            if len(self._queues.get(tenant) or ()) >= self.team_max_queue:
+                raise ServerOverloadedException(f"{self.name} 当前团队排队的请求过多", reason="team_queue_full")
+            waiter = _Waiter(tenant, next(self._seq))
+            self._queues.setdefault(tenant, deque()).append(waiter)
+            self.waiting += 1
+        if waiter.event.wait(self.queue_timeout):
+            return
+        with self._lock:
+            # 超时的同时可能刚好被放行
+            if waiter.granted:
+                return
+            self._queues[tenant].remove(waiter)
+            if not self._queues[tenant]:
+                del self._queues[tenant]
+            self.waiting -= 1
+        raise ServerOverloadedException(f"{self.name} 排队超时", reason="timeout")
+
+    def release(self, tenant=None):
+        tenant = tenant or ""
+        with self._lock:
+            self.running -= 1
+            self._running[tenant] -= 1
+            if not self._running[tenant]:
+                del self._running[tenant]
+            self._dispatch()
+
+
+def _build_limiters():
+    concurrency_config = config_data.get('concurrency') or {}
+    limiters = {}
+    for name, default in DEFAULT_LIMITS.items():
+        limits = {**default, **(concurrency_config.get(name) or {})}
+        fair_share = {**(default.get('fair_share') or {}), **(limits.pop('fair_share', None) or {})}
+        if fair_share.pop('enabled', False):
+            key = fair_share.pop('key', "team")
+            if key not in TENANT_KEYS:
+                raise Exception(f"配置错误：concurrency.{name}.fair_share.key 只能为 {', '.join(TENANT_KEYS)}")
+            limiters[name] = FairShareLimiter(name, **limits, **fair_share)
+            limiters[name].tenant_key = key
+        else:
+            limiters[name] = ConcurrencyLimiter(name, **limits)
+    return limiters
+
+
+limiters = _build_limiters()
+
+
+def get_limiter(path):
+    if path in HEAVY_ENDPOINTS:
+        return limiters["heavy"]
+    if path in LIGHT_ENDPOINTS:
+        return limiters["light"]
+    return None
+
+
+def _tenant(limiter):
+    key = getattr(limiter, "tenant_key", None)
+    if key is None:
+        return None
+    team_id = getattr(request, "team_id", None) or ""
+    app_id = getattr(request, "app_id", None) or ""
+    if key == "app":
+        return app_id
+    if key == "team_app":
+        return f"{team_id}/{app_id}"
+    return team_id
+
+
+def acquire_slot():
+    """
+        在 before_request 中调用，为当前请求占用一个执行槽位，
+        队列已满时返回 503 响应（调用方可按 Retry-After 重试）
+    """
+    limiter = get_limiter(request.path)
+    if limiter is None:
+        return None
+    tenant = _tenant(limiter)
+    start = time.perf_counter()
+    try:
+        limiter.acquire(tenant)
+    except ServerOverloadedException as e:
+        ADMISSION_REJECTED.labels(limiter.name, team_label(), e.reason).inc()
+        return {
+            "code": 503,
+            "message": f"服务繁忙，请稍后重试: {e}",
+        }, 503, {"Retry-After": "5"}
+    request.concurrency_limiter = limiter
+    request.concurrency_tenant = tenant
+    request.concurrency_start = time.perf_counter()
+    ADMISSION_WAIT.labels(limiter.name, team_label()).observe(request.concurrency_start - start)
+    return None
+
+
+def release_slot():
+    limiter = getattr(request, "concurrency_limiter", None)
+    if limiter is not None:
+        request.concurrency_limiter = None
+        limiter.release(request.concurrency_tenant)
+        ADMISSION_RUN.labels(limiter.name, team_label()).observe(time.perf_counter() - request.concurrency_start)
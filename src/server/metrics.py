@@ -0,0 +1,198 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import request, has_request_context
+from prometheus_client import Counter, Histogram, Gauge, CollectorRegistry, CONTENT_TYPE_LATEST, generate_latest, \
+    REGISTRY
+from prometheus_client import multiprocess
+
+from src.config import config_data
+from ..oss import oss_client
+
+metrics_config = config_data.get('metrics') or {}
+
+# 只使用基数可控的 header 作为 label：app_id 对应部署，team_id 可通过配置关闭；
+# user_id、workflow_instance_id 基数无上限，不作为 label
+TEAM_LABEL_ENABLED = metrics_config.get('team_label', True)
+# app_id / team_id 来自请求头，取值没有上限：配置了白名单时只保留白名单中的值，
+# 否则每个进程只保留最先出现的 max_label_values 个值，其余的统一记为 other
+MAX_LABEL_VALUES = metrics_config.get('max_label_values', 50)
+OTHER_LABEL = "other"
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+REQUEST_COUNT = Counter(
+    "monkeys_tools_text_requests_total",
+    "请求数",
+    ["endpoint", "method", "status", "app_id", "team_id"],
+)
+# 直方图每个 label 组合都有一组 bucket，不使用 app_id
+REQUEST_LATENCY = Histogram(
+    "monkeys_tools_text_request_duration_seconds",
+    "请求耗时（包含排队时间）",
+    ["endpoint", "team_id"],
+    buckets=LATENCY_BUCKETS,
+)
+IN_FLIGHT = Gauge(
+    "monkeys_tools_text_requests_in_flight",
+    "正在处理（包含排队中）的请求数",
+    ["endpoint"],
+    multiprocess_mode="livesum",
+)
+STAGE_LATENCY = Histogram(
+    "monkeys_tools_text_stage_duration_seconds",
+    "各处理阶段耗时：queue, download, preprocess, inference, subprocess, conversion, upload",
+    ["endpoint", "stage"],
+    buckets=LATENCY_BUCKETS,
+)
+BYTES_IN = Counter(
+    "monkeys_tools_text_bytes_in_total",
+    "下载的输入文件字节数",
+    ["endpoint"],
+)
+BYTES_OUT = Counter(
+    "monkeys_tools_text_bytes_out_total",
+    "上传的输出文件字节数",
+    ["endpoint"],
+)
+
+
+def _endpoint():
+    if not has_request_context():
+        return "background"
+    # 使用路由规则而不是原始 path，避免 404 等请求造成 label 基数膨胀
+    return request.url_rule.rule if request.url_rule else "unknown"
+
+
+class _BoundedLabel:
+    """
+        限制 label 的取值个数：不在白名单中或超出个数上限的值记为 other
+    """
+
+    def __init__(self, allowlist, max_values):
+        self.allowlist = set(allowlist or [])
+        self.max_values = max_values
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def __call__(self, value):
+        if not value:
+            return ""
+        if self.allowlist:
+            return value if value in self.allowlist else OTHER_LABEL
+        if value in self._seen:
+            return value
+        with self._lock:
+            if value in self._seen or len(self._seen) < self.max_values:
+                self._seen.add(value)
+                return value
+        return OTHER_LABEL
+
+
+_app_label = _BoundedLabel(metrics_config.get('app_allowlist'), MAX_LABEL_VALUES)
+_team_label = _BoundedLabel(metrics_config.get('team_allowlist'), MAX_LABEL_VALUES)
+
+
+def team_label():
+    """
+        当前请求的 team_id label，未开启 team_label 时为空
+    """
+    if not TEAM_LABEL_ENABLED:
+        return ""
+    return _team_label(getattr(request, "team_id", None) or "")
+
+
+def _header_labels():
+    return _app_label(getattr(request, "app_id", None) or ""), team_label()
+
+
+def start_request():
+    request.metrics_start = time.perf_counter()
+    request.metrics_status = 500
+    IN_FLIGHT.labels(_endpoint()).inc()
+
+
+def record_response(response):
+    request.metrics_status = response.status_code
+    return response
+
+
+def finish_request():
+    start = getattr(request, "metrics_start", None)
+    if start is None:
+        return
+    request.metrics_start = None
+    endpoint = _endpoint()
+    app_id, team_id = _header_labels()
+    IN_FLIGHT.labels(endpoint).dec()
+    REQUEST_LATENCY.labels(endpoint, team_id).observe(time.perf_counter() - start)
+    REQUEST_COUNT.labels(endpoint, request.method, str(request.metrics_status), app_id, team_id).inc()
+
+
+@contextmanager
+def stage_timer(stage):
+    """
+        记录当前请求某个阶段的耗时：
+
+            with stage_timer("inference"):
+                ...
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start)
+
+
+def record_stage(stage, seconds):
+    """
+        记录当前请求某个阶段的耗时，用于在其他线程中计时、回到请求线程后再记录的阶段
+    """
+    STAGE_LATENCY.labels(_endpoint(), stage).observe(seconds)
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except (OSError, TypeError):
+        return 0
+
+
+def record_bytes_in(file_path):
+    BYTES_IN.labels(_endpoint()).inc(_file_size(file_path))
+
+
+def download_file(url, folder):
+    """
+        oss_client.download_file 的包装，记录下载耗时和字节数
+    """
+    with stage_timer("download"):
+        file_path = oss_client.download_file(url, folder)
+    record_bytes_in(file_path)
+    return file_path
+
+
+def upload_file(file_path, key):
+    """
+        oss_client.upload_file_tos 的包装，记录上传耗时和字节数
+    """
+    BYTES_OUT.labels(_endpoint()).inc(_file_size(file_path))
+    with stage_timer("upload"):
+        return oss_client.upload_file_tos(file_path, key)
+
+
+def generate_metrics():
+    # gunicorn 多进程部署时需要设置 PROMETHEUS_MULTIPROC_DIR，由各进程写入的文件汇总
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), 200, {"Content-Type": CONTENT_TYPE_LATEST}
+
+
+def mark_worker_dead(pid):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
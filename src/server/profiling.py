@@ -0,0 +1,131 @@
+import collections
+import cProfile
+import os
+import sys
+import threading
+import time
+
+from flask import request
+
+from src.config import config_data
+from ..oss import oss_client
+from ..utils import generate_random_string, ensure_directory_exists
+
+profiling_config = config_data.get('profiling') or {}
+
+PROFILING_ENABLED = profiling_config.get('enabled', False)
+# 请求头为 1 / true 时使用 cProfile 完整记录该请求
+PROFILE_HEADER = profiling_config.get('header', 'x-monkeys-profile')
+# 大于 0 时对所有请求低频采样，耗时超过阈值的请求保存采样结果
+SLOW_THRESHOLD_SECONDS = profiling_config.get('slow_threshold_seconds', 0)
+SAMPLE_INTERVAL_SECONDS = profiling_config.get('sample_interval_ms', 10) / 1000
+OUTPUT_DIR = profiling_config.get('output_dir', './profiles')
+UPLOAD_ENABLED = profiling_config.get('upload', False)
+
+
+class StackSampler:
+    """
+        后台线程定时读取已注册线程的调用栈，按 "frame;frame;frame" 折叠后计数，
+        输出格式可以直接用 flamegraph.pl / speedscope 打开
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.samples = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def register(self, thread_id):
+        with self._lock:
+            self.samples[thread_id] = collections.Counter()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+
+    def unregister(self, thread_id):
+        with self._lock:
+            return self.samples.pop(thread_id, None)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self.samples:
+                    continue
+                frames = sys._current_frames()
+                for thread_id, counter in self.samples.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        counter[self._fold(frame)] += 1
+
+    @staticmethod
+    def _fold(frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(stack))
+
+
+sampler = StackSampler(SAMPLE_INTERVAL_SECONDS)
+
+
+def _artifact_path(extension):
+    endpoint = request.path.strip("/").replace("/", "_") or "root"
+    name = f"{endpoint}-{time.strftime('%Y%m%d%H%M%S')}-{generate_random_string(6)}.{extension}"
+    return os.path.join(ensure_directory_exists(OUTPUT_DIR), name)
+
+
+def _save_artifact(file_path):
+    if UPLOAD_ENABLED:
+        return oss_client.upload_file_tos(file_path, f"profiles/{os.path.basename(file_path)}")
+    return file_path
+
+
+def start_profiling():
+    if not PROFILING_ENABLED:
+        return
+    request.profile_start = time.perf_counter()
+    if request.headers.get(PROFILE_HEADER, "").lower() in ("1", "true"):
+        request.profiler = cProfile.Profile()
+        request.profiler.enable()
+    elif SLOW_THRESHOLD_SECONDS > 0:
+        request.profile_thread_id = threading.get_ident()
+        sampler.register(request.profile_thread_id)
+
+
+def stop_profiling(response=None):
+    """
+        结束当前请求的 profile 并保存结果，返回 artifact 地址（本地路径或 OSS URL）
+    """
+    if not PROFILING_ENABLED or getattr(request, "profile_start", None) is None:
+        return None
+    elapsed = time.perf_counter() - request.profile_start
+    request.profile_start = None
+    artifact = None
+
+    profiler = getattr(request, "profiler", None)
+    if profiler is not None:
+        profiler.disable()
+        request.profiler = None
+        file_path = _artifact_path("prof")
+        profiler.dump_stats(file_path)
+        artifact = _save_artifact(file_path)
+
+    thread_id = getattr(request, "profile_thread_id", None)
+    if thread_id is not None:
+        request.profile_thread_id = None
+        samples = sampler.unregister(thread_id)
+        if samples and elapsed >= SLOW_THRESHOLD_SECONDS:
+            file_path = _artifact_path("folded")
+            with open(file_path, "w") as f:
+                for stack, count in samples.most_common():
+                    f.write(f"{stack} {count}\n")
+            artifact = _save_artifact(file_path)
+
+    if artifact:
+        print(f"请求 {request.path} 耗时 {elapsed:.2f}s，profile 结果保存到 {artifact}")
+        if response is not None:
+            response.headers["x-monkeys-profile-artifact"] = artifact
+    return artifact
@@ -0,0 +1,134 @@
+import gzip
+import hashlib
+import json
+import threading
+
+from flask import current_app, make_response, request
+
+from src.config import config_data
+
+response_config = config_data.get('response') or {}
+compression_config = response_config.get('compression') or {}
+
+COMPRESSION_ENABLED = compression_config.get('enabled', True)
+# 响应体超过该字节数时才压缩
+MIN_SIZE = compression_config.get('min_size', 4096)
+GZIP_LEVEL = compression_config.get('gzip_level', 5)
+ZSTD_LEVEL = compression_config.get('zstd_level', 3)
+COMPRESSIBLE_TYPES = ["application/json", "text/", "application/xml", "application/javascript"]
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def _default(value):
+    # numpy 标量 / 数组（OCR 结果中的坐标等）
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(data):
+    """
+        序列化为 JSON 字节串，安装了 orjson 时使用 orjson
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(data, default=_default) + "\n").encode("utf-8")
+
+
+def output_json(data, code, headers=None):
+    """
+        flask_restx 的 application/json 序列化函数，替代默认的 json.dumps
+    """
+    settings = current_app.config.get("RESTX_JSON", {})
+    # 调试模式或配置了格式化参数时沿用 flask_restx 的默认行为
+    if current_app.debug or settings:
+        from flask_restx.representations import output_json as restx_output_json
+        return restx_output_json(data, code, headers)
+    response = make_response(dumps(data), code)
+    response.headers["Content-Type"] = "application/json"
+    response.headers.extend(headers or {})
+    return response
+
+
+def _accepted_encoding():
+    accepted = request.accept_encodings
+    if zstandard is not None and accepted["zstd"]:
+        return "zstd"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def _compress(data, encoding):
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+
+def compress_response(response):
+    """
+        在 after_request 中调用：客户端支持且响应体超过 min_size 时按 Accept-Encoding 使用 zstd / gzip 压缩
+    """
+    if not COMPRESSION_ENABLED or response.direct_passthrough or response.is_streamed \
+            or "Content-Encoding" in response.headers or response.status_code < 200 or response.status_code >= 300:
+        return response
+    if not any(response.mimetype.startswith(t) for t in COMPRESSIBLE_TYPES):
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = _accepted_encoding()
+    if encoding is None:
+        return response
+    data = response.get_data()
+    if len(data) < MIN_SIZE:
+        return response
+    response.set_data(_compress(data, encoding))
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+_specs_cache = {}
+_specs_lock = threading.Lock()
+
+
+def cached_specs(api):
+    """
+        返回替代 /swagger.json 的视图函数：序列化结果、压缩结果和 ETag 只生成一次（按 script_root 区分），
+        客户端带 If-None-Match 时返回 304
+    """
+
+    def specs():
+        key = request.script_root
+        entry = _specs_cache.get(key)
+        if entry is None:
+            with _specs_lock:
+                entry = _specs_cache.get(key)
+                if entry is None:
+                    schema = api.__schema__
+                    if "error" in schema:
+                        return output_json(schema, 500)
+                    body = dumps(schema)
+                    entry = _specs_cache[key] = {
+                        "etag": hashlib.sha256(body).hexdigest()[:32],
+                        None: body,
+                    }
+        encoding = _accepted_encoding() if COMPRESSION_ENABLED else None
+        if encoding not in entry:
+            entry[encoding] = _compress(entry[None], encoding)
+        response = make_response(entry[encoding], 200)
+        response.headers["Content-Type"] = "application/json"
+        response.vary.add("Accept-Encoding")
+        if encoding is not None:
+            response.headers["Content-Encoding"] = encoding
+        response.set_etag(f"{entry['etag']}-{encoding}" if encoding else entry["etag"])
+        return response.make_conditional(request)
+
+    return specs
@@ -0,0 +1,333 @@
+import itertools
+import json
+import os
+import socket
+import threading
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from src.config import config_data
+from ..oss import oss_client
+
+worker_config = config_data.get('worker') or {}
+
+# 同时执行的任务数，以及每次向任务队列领取的最大任务数
+CONCURRENCY = worker_config.get('concurrency', 4)
+POLL_BATCH_SIZE = worker_config.get('poll_batch_size', 4)
+# 某一轮所有任务类型都没有领取到任务时的等待间隔，以及 conductor 长轮询的等待时间
+POLL_INTERVAL_MS = worker_config.get('poll_interval_ms', 500)
+POLL_TIMEOUT_MS = worker_config.get('poll_timeout_ms', 100)
+# 任务结果由后台线程上报：攒够 report_batch_size 条或等待超过 report_interval_ms 后交给上报线程，
+# conductor 没有批量更新接口，每条结果仍是一次请求，执行线程不等待上报
+REPORT_BATCH_SIZE = worker_config.get('report_batch_size', 16)
+REPORT_INTERVAL_MS = worker_config.get('report_interval_ms', 200)
+# 输出超过该大小（KB）时上传到 OSS，只上报存储路径，与 vines_worker_sdk 一致
+OUTPUT_PAYLOAD_THRESHOLD_KB = worker_config.get('output_payload_threshold_kb', 1024)
+# 服务繁忙（503）时让 conductor 在 Retry-After 秒后重新下发任务
+DEFAULT_RETRY_AFTER = 5
+# 任务输入中携带工作流上下文的字段，键名与 vines_worker_sdk 的 workflow context 一致（teamId / APP_ID）
+CONTEXT_KEY = "__context"
+
+
+def tool_endpoints(app, prefix=""):
+    """
+        从 swagger 中读取已注册的工具：任务类型（prefix + x-monkey-tool-name）-> 接口路径
+    """
+    from .app import api
+
+    with app.test_request_context():
+        schema = api.__schema__
+    endpoints = {}
+    for path, operations in schema.get("paths", {}).items():
+        name = (operations.get("post") or {}).get("x-monkey-tool-name")
+        if name:
+            endpoints[prefix + name] = path
+    return endpoints
+
+
+def _context_headers(task, input_data):
+    """
+        工作流所属的团队和应用，转换为与 HTTP 调用相同的 x-monkeys-teamid / x-monkeys-appid 请求头：
+        优先取任务输入中的 __context，其次取任务本身的 teamId / appId 字段
+    """
+    context = input_data.get(CONTEXT_KEY) if isinstance(input_data, dict) else None
+    context = context if isinstance(context, dict) else {}
+    team_id = context.get("teamId") or task.get("teamId")
+    app_id = context.get("APP_ID") or context.get("appId") or task.get("appId")
+    headers = {}
+    if team_id:
+        headers["x-monkeys-teamid"] = str(team_id)
+    if app_id:
+        headers["x-monkeys-appid"] = str(app_id)
+    return headers
+
+
+class ConductorTaskSource:
+    """
+        通过 conductor 的 REST 接口批量领取任务、逐个上报结果
+    """
+
+    def __init__(self, base_url, worker_id, username=None, password=None, domain=None,
+                 poll_timeout_ms=POLL_TIMEOUT_MS):
+        import requests
+        from requests.auth import HTTPBasicAuth
+
+        self.base_url = base_url.rstrip("/")
+        self.worker_id = worker_id
+        self.domain = domain
+        self.poll_timeout_ms = poll_timeout_ms
+        # 轮询线程和上报线程各用一个 Session，复用 keep-alive 连接
+        self._poll_session = requests.Session()
+        self._update_session = requests.Session()
+        if username and password:
+            self._poll_session.auth = self._update_session.auth = HTTPBasicAuth(username, password)
+
+    def poll(self, task_type, count):
+        params = {"workerid": self.worker_id, "count": count, "timeout": self.poll_timeout_ms}
+        if self.domain:
+            params["domain"] = self.domain
+        response = self._poll_session.get(f"{self.base_url}/tasks/poll/batch/{task_type}", params=params,
+                                          timeout=30)
+        if response.status_code == 204 or not response.content:
+            return []
+        if response.status_code != 200:
+            raise Exception(f"领取 {task_type} 任务失败，状态码 {response.status_code}")
+        return response.json()
+
+    def update(self, results):
+        # conductor 没有批量更新接口，每条结果一次 POST /tasks，在同一个 keep-alive 连接上依次提交
+        for result in results:
+            body = {key: value for key, value in result.items() if key != "task"}
+            body["workerId"] = self.worker_id
+            response = self._update_session.post(f"{self.base_url}/tasks", json=body, timeout=30)
+            if response.status_code >= 300:
+                print(f"上报任务 {result['taskId']} 结果失败，状态码 {response.status_code}: {response.text[:200]}")
+
+
+class MemoryTaskSource:
+    """
+        进程内的任务队列，接口与 ConductorTaskSource 一致，用于本地调试和测试
+    """
+
+    def __init__(self):
+        self._queues = {}
+        self._ids = itertools.count()
+        self._cond = threading.Condition()
+        self.results = {}
+        self.updates = []
+
+    def submit(self, task_type, input_data, workflow_instance_id=None, **fields):
+        """
+            加入一个任务，fields 为任务的其他字段（例如 teamId、appId）
+        """
+        with self._cond:
+            task_id = f"task-{next(self._ids)}"
+            self._queues.setdefault(task_type, deque()).append({
+                **fields,
+                "taskId": task_id,
+                "taskType": task_type,
+                "workflowInstanceId": workflow_instance_id or f"workflow-{task_id}",
+                "inputData": input_data,
+            })
+            return task_id
+
+    def poll(self, task_type, count):
+        with self._cond:
+            queue = self._queues.get(task_type) or deque()
+            return [queue.popleft() for _ in range(min(count, len(queue)))]
+
+    def update(self, results):
+        with self._cond:
+            self.updates.append(len(results))
+            for result in results:
+                if result["status"] == "IN_PROGRESS":
+                    # 与 conductor 一致：callbackAfterSeconds 后重新下发，这里直接放回队尾
+                    task = result["task"]
+                    self._queues.setdefault(task["taskType"], deque()).append(task)
+                    continue
+                self.results[result["taskId"]] = result
+            self._cond.notify_all()
+
+    def wait(self, task_ids, timeout=None):
+        """
+            等待指定任务全部完成（COMPLETED / FAILED），返回 {task_id: result}
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: all(task_id in self.results for task_id in task_ids), timeout):
+                raise Exception("等待任务完成超时")
+            return {task_id: self.results[task_id] for task_id in task_ids}
+
+
+class TaskWorker:
+    """
+        拉取模式的任务执行器：按任务类型轮询领取任务（每次最多领取空闲槽位数个），
+        通过 Flask test client 调用与 HTTP 服务相同的接口处理函数（限流、合并、指标等逻辑保持一致），
+        任务结果交给后台线程逐个上报，执行线程不等待上报完成
+    """
+
+    def __init__(self, app, source, endpoints, concurrency=CONCURRENCY, poll_batch_size=POLL_BATCH_SIZE,
+                 poll_interval_ms=POLL_INTERVAL_MS, report_batch_size=REPORT_BATCH_SIZE,
+                 report_interval_ms=REPORT_INTERVAL_MS):
+        if not endpoints:
+            raise Exception("没有可以处理的任务类型")
+        self.app = app
+        self.source = source
+        self.endpoints = endpoints
+        self.concurrency = max(1, concurrency)
+        self.poll_batch_size = max(1, poll_batch_size)
+        self.poll_interval = poll_interval_ms / 1000
+        self.report_batch_size = max(1, report_batch_size)
+        self.report_interval = report_interval_ms / 1000
+        self._executor = ThreadPoolExecutor(self.concurrency, thread_name_prefix="task-worker")
+        self._in_flight = 0
+        self._idle = threading.Condition()
+        self._pending = []
+        self._report_cond = threading.Condition()
+        self._stopping = threading.Event()
+        self._reporter = threading.Thread(target=self._report_loop, name="task-reporter", daemon=True)
+
+    def _free_slots(self):
+        with self._idle:
+            return self.concurrency - self._in_flight
+
+    def _load_input(self, task):
+        path = task.get("externalInputPayloadStoragePath")
+        if not path:
+            return task.get("inputData") or {}
+        tmp_file = os.path.join("/tmp", f"{task['taskId']}.json")
+        oss_client.download_file_tos(tmp_file, path)
+        try:
+            with open(tmp_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        finally:
+            os.remove(tmp_file)
+
+    def _output(self, task, output_data):
+        payload = json.dumps(output_data).encode("utf-8")
+        if len(payload) / 1024 <= OUTPUT_PAYLOAD_THRESHOLD_KB:
+            return {"outputData": output_data}
+        key = f"task/output/{task['taskId']}.json"
+        oss_client.upload_bytes(key, payload)
+        return {"outputData": {}, "externalOutputPayloadStoragePath": key}
+
+    def _execute(self, task_type, task):
+        result = {"taskId": task["taskId"], "workflowInstanceId": task.get("workflowInstanceId")}
+        try:
+            input_data = self._load_input(task)
+            headers = {
+                "x-monkeys-workflow-instanceid": task.get("workflowInstanceId") or "",
+                **_context_headers(task, input_data),
+            }
+            if isinstance(input_data, dict):
+                input_data = {key: value for key, value in input_data.items() if key != CONTEXT_KEY}
+            client = self.app.test_client()
+            response = client.post(self.endpoints[task_type], json=input_data, headers=headers)
+            body = response.get_json(silent=True)
+            if response.status_code == 200:
+                result.update(status="COMPLETED", **self._output(task, body))
+            elif response.status_code == 503:
+                # 服务繁忙，交还给 conductor 稍后重新下发
+                retry_after = int(response.headers.get("Retry-After") or DEFAULT_RETRY_AFTER)
+                result.update(status="IN_PROGRESS", callbackAfterSeconds=retry_after, task=task)
+            else:
+                message = (body or {}).get("message") or response.get_data(as_text=True)[:500]
+                result.update(status="FAILED", reasonForIncompletion=message,
+                              outputData={"success": False, "errMsg": message})
+        except Exception as e:
+            traceback.print_exc()
+            result.update(status="FAILED", reasonForIncompletion=str(e),
+                          outputData={"success": False, "errMsg": str(e)})
+        finally:
+            with self._idle:
+                self._in_flight -= 1
+                self._idle.notify()
+        self._report(result)
+
+    def _report(self, result):
+        with self._report_cond:
+            self._pending.append(result)
+            if len(self._pending) >= self.report_batch_size:
+                self._report_cond.notify()
+
+    def _flush(self):
+        with self._report_cond:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
+        try:
+            self.source.update(batch)
+        except Exception as e:
+            print(f"上报 {len(batch)} 个任务结果失败: {e}")
+
+    def _report_loop(self):
+        while not self._stopping.is_set():
+            with self._report_cond:
+                self._report_cond.wait_for(lambda: len(self._pending) >= self.report_batch_size,
+                                           timeout=self.report_interval)
+            self._flush()
+
+    def _poll_once(self):
+        """
+            所有任务类型轮询一遍，返回领取到的任务数
+        """
+        polled = 0
+        for task_type in self.endpoints:
+            free = self._free_slots()
+            if free <= 0:
+                break
+            try:
+                tasks = self.source.poll(task_type, min(self.poll_batch_size, free))
+            except Exception as e:
+                print(f"领取 {task_type} 任务失败: {e}")
+                continue
+            for task in tasks:
+                with self._idle:
+                    self._in_flight += 1
+                self._executor.submit(self._execute, task_type, task)
+            polled += len(tasks)
+        return polled
+
+    def run(self):
+        print(f"任务执行器启动，任务类型: {', '.join(self.endpoints)}，并发数 {self.concurrency}")
+        self._reporter.start()
+        try:
+            while not self._stopping.is_set():
+                with self._idle:
+                    # 没有空闲槽位时等待任意一个任务完成
+                    if not self._idle.wait_for(lambda: self._in_flight < self.concurrency, self.poll_interval):
+                        continue
+                if not self._poll_once():
+                    self._stopping.wait(self.poll_interval)
+        finally:
+            self._executor.shutdown(wait=True)
+            self._stopping.set()
+            self._flush()
+
+    def stop(self):
+        """
+            不再领取新任务，等待正在执行的任务完成并上报结果后 run 返回
+        """
+        self._stopping.set()
+
+
+def run_worker(app):
+    """
+        拉取模式入口：从 conductor 领取当前部署启用的全部工具的任务
+    """
+    import signal
+
+    base_url = worker_config.get('conductor_base_url')
+    if not base_url:
+        raise Exception("配置错误：worker.conductor_base_url 不能为空")
+    source = ConductorTaskSource(
+        base_url,
+        worker_id=worker_config.get('worker_id') or socket.gethostname(),
+        username=worker_config.get('username'),
+        password=worker_config.get('password'),
+        domain=worker_config.get('domain'),
+    )
+    worker = TaskWorker(app, source, tool_endpoints(app, worker_config.get('task_type_prefix') or ""))
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: worker.stop())
+    worker.run()
@@ -0,0 +1,63 @@
+import importlib
+
+from src.config import config_data
+
+# 工具分组：每个分组对应一组接口，以及这些接口依赖的重量级模块
+TOOL_GROUPS = {
+    # /text/extract-url-content, /text/crawl-site
+    "url": [
+        "requests",
+        "lxml.html",
+        "selenium.webdriver",
+    ],
+    # /text/file-convert
+    "convert": [
+        "PIL.Image",
+        "docx",
+        "pandas",
+        "fitz",
+    ],
+    # /text/ocr, /text/pdf-to-text, /text/pp-structure, /text/table-extract
+    "ocr": [
+        "paddleocr",
+    ],
+    # /text/text-combination, /text/text-replace, /text/text-segment
+    "text": [
+        "langchain.text_splitter",
+    ],
+}
+
+tools_config = config_data.get('tools') or {}
+
+
+def get_enabled_groups():
+    """
+        当前部署启用的工具分组，未配置时启用全部分组
+    """
+    enabled = tools_config.get('enabled') or list(TOOL_GROUPS.keys())
+    for group in enabled:
+        if group not in TOOL_GROUPS:
+            raise Exception(f"配置错误：未知的工具分组 {group}")
+    return enabled
+
+
+def is_tool_enabled(group):
+    return group in get_enabled_groups()
+
+
+def preload_tools():
+    """
+        预加载配置中指定分组的依赖和模型，在服务启动（fork 之前）调用
+    """
+    for group in tools_config.get('preload') or []:
+        if not is_tool_enabled(group):
+            continue
+        for module in TOOL_GROUPS[group]:
+            importlib.import_module(module)
+        if group == "ocr":
+            from src.utils.ocr_helper import preload_languages
+            from src.utils.ocr_workers import WORKERS_ENABLED
+            # 启用 OCR 工作进程时模型由工作进程各自加载
+            if not WORKERS_ENABLED:
+                preload_languages()
+        print(f"工具分组 {group} 预加载完成")
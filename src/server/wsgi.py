@@ -0,0 +1,44 @@
+from gunicorn.app.base import BaseApplication
+
+from src.config import config_data
+from .metrics import mark_worker_dead
+from .tool_groups import preload_tools
+
+
+class ProductionServer(BaseApplication):
+    """
+        以 gunicorn（gthread worker）方式运行 Flask 应用
+    """
+
+    def __init__(self, application, options=None):
+        self.application = application
+        self.options = options or {}
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key.lower(), value)
+
+    def load(self):
+        return self.application
+
+
+def run_production(application):
+    server_config = config_data.get('server') or {}
+    options = {
+        "bind": f"0.0.0.0:{server_config.get('port', 8890)}",
+        # OCR 为 CPU 密集型任务，进程数一般不超过 CPU 核数
+        "workers": server_config.get('workers', 2),
+        "threads": server_config.get('threads', 8),
+        "worker_class": "gthread",
+        "timeout": server_config.get('timeout', 300),
+        "graceful_timeout": server_config.get('graceful_timeout', 30),
+        "max_requests": server_config.get('max_requests', 0),
+        "max_requests_jitter": server_config.get('max_requests_jitter', 0),
+        # 应用和预加载的模型在 master 进程中加载，fork 之后各 worker 共享只读内存
+        "preload_app": True,
+        "child_exit": lambda server, worker: mark_worker_dead(worker.pid),
+    }
+    preload_tools()
+    ProductionServer(application, options).run()
@@ -0,0 +1,81 @@
+import gzip
+import io
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+COMPRESSION_SUFFIXES = {
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+COMPRESSION_OPTIONS = [
+    {"name": "不压缩", "value": "none"},
+    {"name": "gzip", "value": "gzip"},
+    {"name": "zstd", "value": "zstd"},
+]
+
+
+def detect_compression(file_path):
+    """
+        根据文件头的 magic bytes 判断压缩格式，返回 gzip、zstd 或 None
+    """
+    with open(file_path, "rb") as f:
+        head = f.read(4)
+    if head.startswith(GZIP_MAGIC):
+        return "gzip"
+    if head.startswith(ZSTD_MAGIC):
+        return "zstd"
+    return None
+
+
+def strip_compression_ext(file_name):
+    """
+        去掉 .gz / .zst / .zstd 后缀，例如 a.jsonl.gz -> a.jsonl
+    """
+    for suffix in [".gz", ".zst", ".zstd"]:
+        if file_name.lower().endswith(suffix):
+            return file_name[:-len(suffix)]
+    return file_name
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        raise Exception("处理 zstd 压缩文件需要安装 zstandard")
+    return zstandard
+
+
+def open_text(file_path, encoding="utf-8"):
+    """
+        以文本方式流式读取文件，gzip / zstd 压缩的文件边读边解压
+    """
+    compression = detect_compression(file_path)
+    if compression == "gzip":
+        return gzip.open(file_path, "rt", encoding=encoding)
+    if compression == "zstd":
+        # 分多次追加写入（或 pzstd 并行压缩）的文件包含多个 frame，需要连续读完所有 frame
+        reader = _zstd().ZstdDecompressor().stream_reader(open(file_path, "rb"), closefd=True,
+                                                          read_across_frames=True)
+        return io.TextIOWrapper(io.BufferedReader(reader), encoding=encoding)
+    return open(file_path, "r", encoding=encoding)
+
+
+def open_text_writer(file_path, compression=None, encoding="utf-8"):
+    """
+        以文本方式流式写入文件，compression 为 gzip / zstd 时边写边压缩
+    """
+    if compression == "gzip":
+        return gzip.open(file_path, "wt", encoding=encoding, compresslevel=6)
+    if compression == "zstd":
+        writer = _zstd().ZstdCompressor(level=3).stream_writer(open(file_path, "wb"), closefd=True)
+        return io.TextIOWrapper(writer, encoding=encoding)
+    return open(file_path, "w", encoding=encoding)
+
+
+def output_suffix(compression):
+    if compression in [None, "", "none"]:
+        return ""
+    if compression not in COMPRESSION_SUFFIXES:
+        raise Exception(f"参数错误：不支持的压缩格式 {compression}")
+    return COMPRESSION_SUFFIXES[compression]
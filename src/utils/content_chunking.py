@@ -0,0 +1,134 @@
+import difflib
+import hashlib
+import json
+import re
+
+import numpy as np
+
+# gear 哈希的窗口长度（字符数）：切分点只取决于它前面 WINDOW 个字符，局部修改不会影响后面的切分点
+WINDOW = 32
+# 哈希选出的切分点向后对齐到最近的换行 / 句末 / 空白，最多移动的字符数
+SNAP_DISTANCE = 64
+BOUNDARY_PATTERN = re.compile(r"\n|[。！？；]|[.!?;](?=\s|$)|\s")
+
+
+def _gear(codepoints):
+    # 将字符码位散列为 32 位随机数（murmur3 fmix32）
+    h = codepoints.astype(np.uint32) * np.uint32(0x9E3779B1)
+    h ^= h >> np.uint32(16)
+    h *= np.uint32(0x85EBCA6B)
+    h ^= h >> np.uint32(13)
+    h *= np.uint32(0xC2B2AE35)
+    h ^= h >> np.uint32(16)
+    return h
+
+
+def _rolling_hash(text):
+    """
+        h[i] = sum(gear[text[i - j]] << j for j in range(WINDOW))，按 2^32 取模，向量化计算
+    """
+    codepoints = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    gear = _gear(codepoints)
+    h = np.zeros(len(gear), dtype=np.uint32)
+    for j in range(WINDOW):
+        h[j:] += gear[:len(gear) - j] << np.uint32(j)
+    return h
+
+
+def content_defined_chunks(text, chunk_size):
+    """
+        内容定义切分：用滚动哈希在文本内容上选切分点，切分点只由附近的内容决定，
+        因此局部修改只会影响附近的一两个分段，后面的分段保持不变。
+        分段长度在 [chunk_size / 4, chunk_size] 之间，平均约 chunk_size / 2。
+        返回 [(start, end), ...]
+    """
+    length = len(text)
+    if length == 0:
+        return []
+    max_size = max(1, int(chunk_size))
+    min_size = max(1, max_size // 4)
+    if length <= max_size:
+        return [(0, length)]
+
+    # 哈希高 bits 位全为 0 的位置作为候选切分点，期望间隔为 2^bits
+    bits = max(1, int(np.log2(max(2, max_size // 4))))
+    hashes = _rolling_hash(text)
+    candidates = np.flatnonzero((hashes >> np.uint32(32 - bits)) == 0) + 1
+    boundaries = np.asarray([m.end() for m in BOUNDARY_PATTERN.finditer(text)], dtype=np.int64)
+
+    # 候选切分点对齐到之后最近的自然边界，避免从单词或句子中间切开
+    if len(boundaries) and len(candidates):
+        following = np.searchsorted(boundaries, candidates)
+        valid = following < len(boundaries)
+        snapped = candidates.copy()
+        snapped[valid] = np.where(
+            boundaries[following[valid]] - candidates[valid] <= SNAP_DISTANCE,
+            boundaries[following[valid]], candidates[valid],
+        )
+        candidates = np.unique(snapped)
+
+    spans = []
+    start = 0
+    while length - start > max_size:
+        index = np.searchsorted(candidates, start + min_size)
+        if index < len(candidates) and candidates[index] <= start + max_size:
+            end = int(candidates[index])
+        else:
+            # 范围内没有候选切分点时强制切分，尽量切在最后一个自然边界上
+            lo, hi = np.searchsorted(boundaries, [start + min_size, start + max_size], side="right")
+            end = int(boundaries[hi - 1]) if hi > lo else start + max_size
+        spans.append((start, end))
+        start = end
+    spans.append((start, length))
+    return spans
+
+
+def chunk_hash(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def parse_manifest(manifest):
+    """
+        上一次的分段清单，支持哈希列表、上一次返回的 chunks 列表，或它们的 JSON 字符串
+    """
+    if isinstance(manifest, str):
+        try:
+            manifest = json.loads(manifest)
+        except ValueError:
+            raise Exception("参数错误：previousManifest 不是合法的 JSON")
+    if isinstance(manifest, dict):
+        manifest = manifest.get("manifest") or manifest.get("chunks") or []
+    if not isinstance(manifest, list):
+        raise Exception("参数错误：previousManifest 应为分段哈希列表")
+    return [item["hash"] if isinstance(item, dict) else str(item) for item in manifest]
+
+
+def diff_manifest(previous_hashes, chunks):
+    """
+        对比上一次的分段哈希序列和本次的分段，返回新增、删除、修改的分段
+        chunks: [{"index", "hash", "text"}, ...]
+    """
+    current_hashes = [chunk["hash"] for chunk in chunks]
+    matcher = difflib.SequenceMatcher(None, previous_hashes, current_hashes, autojunk=False)
+    added, removed, changed = [], [], []
+    unchanged = 0
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            unchanged += i2 - i1
+        elif tag == "insert":
+            added.extend(chunks[j1:j2])
+        elif tag == "delete":
+            removed.extend(previous_hashes[i1:i2])
+        elif tag == "replace":
+            # 位置对应的分段视为修改，多出来的部分视为新增或删除
+            pairs = min(i2 - i1, j2 - j1)
+            for offset in range(pairs):
+                changed.append(dict(chunks[j1 + offset], previousHash=previous_hashes[i1 + offset]))
+            added.extend(chunks[j1 + pairs:j2])
+            removed.extend(previous_hashes[i1 + pairs:i2])
+    return {
+        "added": added,
+        "removed": removed,
+        "changed": changed,
+        "unchanged": unchanged,
+    }
@@ -0,0 +1,206 @@
+import hashlib
+import json
+import math
+import re
+import zlib
+
+import numpy as np
+
+from src.config import config_data
+
+dedup_config = config_data.get('dedup') or {}
+
+
+class BloomFilter:
+    """
+        固定内存的布隆过滤器，容量和误判率决定占用的内存：
+        1000 万条、误判率 1e-7 约占 42MB，10 万条约占 0.4MB
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.size = max(64, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        self._steps = np.arange(self.hash_count, dtype=np.uint64)
+
+    def _positions(self, digests):
+        # 双重哈希：h1 + i * h2，digests 为 (N, 2) uint64
+        h1, h2 = digests[:, :1], digests[:, 1:] | np.uint64(1)
+        return (h1 + self._steps[None, :] * h2) % np.uint64(self.size)
+
+    def _bits(self, digests):
+        positions = self._positions(digests)
+        return positions >> np.uint64(3), (positions & np.uint64(7)).astype(np.uint8)
+
+    def contains_many(self, digests):
+        byte_index, bit = self._bits(digests)
+        return ((self.bits[byte_index] >> bit) & 1).all(axis=1)
+
+    def add_many(self, digests):
+        """
+            批量加入，返回每个元素在加入前是否已存在（可能误判为已存在）
+        """
+        byte_index, bit = self._bits(digests)
+        present = ((self.bits[byte_index] >> bit) & 1).all(axis=1)
+        np.bitwise_or.at(self.bits, byte_index.ravel(), (np.uint8(1) << bit).ravel())
+        return present
+
+    def add(self, digest):
+        return bool(self.add_many(np.asarray([digest], dtype=np.uint64))[0])
+
+
+class ScalableBloomFilter:
+    """
+        按实际数据量增长的布隆过滤器：当前过滤器写满后追加一个容量为 growth 倍的过滤器，
+        第 i 个过滤器的误判率为 error_rate / 2^(i+1)，总误判率不超过 error_rate，
+        内存占用与实际加入的元素数成正比，小请求不会预先分配大块内存。
+        总容量达到 max_capacity 后不再扩容（继续写入最后一个过滤器，误判率逐渐升高），内存占用有上限
+    """
+
+    def __init__(self, initial_capacity, error_rate, max_capacity=None, growth=2):
+        self.initial_capacity = max(1, int(initial_capacity))
+        self.error_rate = error_rate
+        self.max_capacity = max_capacity
+        self.growth = growth
+        self.filters = []
+        self.total_capacity = 0
+        self._append()
+
+    def _append(self):
+        index = len(self.filters)
+        self.capacity = self.initial_capacity * self.growth ** index
+        self.count = 0
+        self.total_capacity += self.capacity
+        self.filters.append(BloomFilter(self.capacity, self.error_rate / 2 ** (index + 1)))
+
+    @property
+    def nbytes(self):
+        return sum(bloom.bits.nbytes for bloom in self.filters)
+
+    def add_many(self, digests):
+        """
+            批量加入，返回每个元素在加入前是否已存在（可能误判为已存在），新元素只写入最后一个过滤器
+        """
+        present = np.zeros(len(digests), dtype=bool)
+        for bloom in self.filters[:-1]:
+            present |= bloom.contains_many(digests)
+        absent = np.flatnonzero(~present)
+        if len(absent):
+            added = self.filters[-1].add_many(digests[absent])
+            present[absent] = added
+            self.count += int(len(absent) - added.sum())
+            if self.count >= self.capacity and (not self.max_capacity or self.total_capacity < self.max_capacity):
+                self._append()
+        return present
+
+    def add(self, digest):
+        return bool(self.add_many(np.asarray([digest], dtype=np.uint64))[0])
+
+
+def digest128(data: bytes):
+    value = hashlib.blake2b(data, digest_size=16).digest()
+    return int.from_bytes(value[:8], "little"), int.from_bytes(value[8:], "little")
+
+
+def _optimal_bands(num_perm, threshold):
+    """
+        选择 bands * rows = num_perm，使 LSH 的 S 曲线拐点 (1/b)^(1/r) 最接近阈值
+    """
+    candidates = [(bands, num_perm // bands) for bands in range(1, num_perm + 1) if num_perm % bands == 0]
+    return min(candidates, key=lambda item: abs((1 / item[0]) ** (1 / item[1]) - threshold))
+
+
+class MinHashLSH:
+    """
+        基于字符 shingle 的 MinHash + LSH 近似去重，band 的哈希保存在布隆过滤器中，
+        内存占用与记录数成正比，不保存原文
+    """
+
+    def __init__(self, threshold=0.8, num_perm=128, shingle_size=5, capacity=10000, error_rate=1e-5, seed=1):
+        self.shingle_size = shingle_size
+        self.bands, self.rows = _optimal_bands(num_perm, threshold)
+        rng = np.random.RandomState(seed)
+        # multiply-shift 哈希族：((a * x + b) mod 2^64) >> 32，a 为奇数
+        self.a = rng.randint(1, 2 ** 32, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.b = rng.randint(0, 2 ** 32, size=num_perm, dtype=np.uint64)
+        # capacity 为初始容量（记录数），记录数超过后布隆过滤器自动扩容
+        self.filter = ScalableBloomFilter(capacity * self.bands, error_rate)
+
+    def _shingles(self, text):
+        text = re.sub(r"\s+", " ", text.lower()).strip()
+        if len(text) <= self.shingle_size:
+            return {text}
+        return {text[i:i + self.shingle_size] for i in range(len(text) - self.shingle_size + 1)}
+
+    def signature(self, text):
+        shingles = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in self._shingles(text)), dtype=np.uint64
+        )
+        signature = np.full(len(self.a), np.iinfo(np.uint64).max, dtype=np.uint64)
+        # 分块计算，避免超长文本生成过大的中间矩阵
+        for start in range(0, len(shingles), 4096):
+            block = shingles[start:start + 4096]
+            hashes = (self.a[:, None] * block[None, :] + self.b[:, None]) >> np.uint64(32)
+            np.minimum(signature, hashes.min(axis=1), out=signature)
+        return signature
+
+    def add(self, text):
+        """
+            加入一条文本，返回它是否与之前的某条文本近似重复
+        """
+        signature = self.signature(text).reshape(self.bands, self.rows)
+        digests = np.asarray(
+            [digest128(band.tobytes() + index.to_bytes(2, "little")) for index, band in enumerate(signature)],
+            dtype=np.uint64,
+        )
+        return bool(self.filter.add_many(digests).any())
+
+
+class Deduplicator:
+    """
+        流式去重：先按内容哈希做精确去重，再（可选）做 MinHash 近似去重，统计被丢弃的记录数
+    """
+
+    def __init__(self, mode="exact", key=None, threshold=0.8):
+        self.mode = mode
+        self.key = key
+        # 布隆过滤器从 initial_capacity 开始按实际记录数扩容，内存占用与输入规模成正比
+        self.exact = ScalableBloomFilter(dedup_config.get('initial_capacity', 100000),
+                                         dedup_config.get('error_rate', 1e-7),
+                                         max_capacity=dedup_config.get('max_capacity', 10000000))
+        self.near = MinHashLSH(
+            threshold=threshold,
+            num_perm=dedup_config.get('num_perm', 128),
+            shingle_size=dedup_config.get('shingle_size', 5),
+            capacity=dedup_config.get('near_initial_capacity', 10000),
+        ) if mode == "near" else None
+        self.total = 0
+        self.dropped_exact = 0
+        self.dropped_near = 0
+
+    def _text(self, record):
+        if isinstance(record, str):
+            return record.strip()
+        if self.key and isinstance(record, dict):
+            value = record.get(self.key)
+            return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, sort_keys=True)
+        return json.dumps(record, ensure_ascii=False, sort_keys=True)
+
+    def is_duplicate(self, record):
+        self.total += 1
+        text = self._text(record)
+        if self.exact.add(digest128(text.encode("utf-8"))):
+            self.dropped_exact += 1
+            return True
+        if self.near is not None and self.near.add(text):
+            self.dropped_near += 1
+            return True
+        return False
+
+    def stats(self):
+        return {
+            "total": self.total,
+            "kept": self.total - self.dropped_exact - self.dropped_near,
+            "droppedExact": self.dropped_exact,
+            "droppedNear": self.dropped_near,
+        }
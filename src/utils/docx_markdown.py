@@ -0,0 +1,293 @@
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PACKAGE_RELS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+HEADING_STYLE_PATTERN = re.compile(r"^heading\s*([1-9])$", re.IGNORECASE)
+# 这些编号格式按无序列表输出，其余按有序列表输出
+BULLET_FORMATS = {"bullet", "none", ""}
+
+
+def _val(element, tag):
+    child = element.find(tag) if element is not None else None
+    return child.get(f"{W}val") if child is not None else None
+
+
+def _enabled(element, tag):
+    # <w:b/> 或 <w:b w:val="true"/> 为开启，w:val 为 0 / false 时关闭
+    child = element.find(tag) if element is not None else None
+    return child is not None and child.get(f"{W}val", "true").lower() not in ["0", "false", "off"]
+
+
+class _Styles:
+    """
+        从 styles.xml 读取段落样式对应的标题级别和列表编号（样式可以继承）
+    """
+
+    def __init__(self, archive):
+        self.headings = {}
+        self.numbering = {}
+        self.based_on = {}
+        if "word/styles.xml" not in archive.namelist():
+            return
+        root = ET.fromstring(archive.read("word/styles.xml"))
+        for style in root.iter(f"{W}style"):
+            style_id = style.get(f"{W}styleId")
+            name = (_val(style, f"{W}name") or "").strip()
+            ppr = style.find(f"{W}pPr")
+            match = HEADING_STYLE_PATTERN.match(name)
+            outline = _val(ppr, f"{W}outlineLvl")
+            if name.lower() == "title":
+                self.headings[style_id] = 1
+            elif match:
+                self.headings[style_id] = int(match.group(1))
+            elif outline is not None and outline.isdigit() and int(outline) < 9:
+                self.headings[style_id] = int(outline) + 1
+            num_pr = ppr.find(f"{W}numPr") if ppr is not None else None
+            if num_pr is not None:
+                self.numbering[style_id] = (_val(num_pr, f"{W}numId"), int(_val(num_pr, f"{W}ilvl") or 0))
+            based_on = _val(style, f"{W}basedOn")
+            if based_on:
+                self.based_on[style_id] = based_on
+
+    def _lookup(self, table, style_id):
+        seen = set()
+        while style_id and style_id not in seen:
+            if style_id in table:
+                return table[style_id]
+            seen.add(style_id)
+            style_id = self.based_on.get(style_id)
+        return None
+
+    def heading(self, style_id):
+        return self._lookup(self.headings, style_id)
+
+    def list_info(self, style_id):
+        return self._lookup(self.numbering, style_id)
+
+
+class _Numbering:
+    """
+        从 numbering.xml 读取每个列表（numId）各级别的编号格式，并维护有序列表的序号
+    """
+
+    def __init__(self, archive):
+        self.formats = {}
+        self.counters = {}
+        if "word/numbering.xml" not in archive.namelist():
+            return
+        root = ET.fromstring(archive.read("word/numbering.xml"))
+        abstract_formats = {}
+        for abstract in root.iter(f"{W}abstractNum"):
+            levels = {}
+            for level in abstract.iter(f"{W}lvl"):
+                levels[int(level.get(f"{W}ilvl", 0))] = _val(level, f"{W}numFmt") or ""
+            abstract_formats[abstract.get(f"{W}abstractNumId")] = levels
+        for num in root.iter(f"{W}num"):
+            self.formats[num.get(f"{W}numId")] = abstract_formats.get(_val(num, f"{W}abstractNumId"), {})
+
+    def marker(self, num_id, level):
+        number_format = self.formats.get(num_id, {}).get(level, "bullet")
+        if number_format in BULLET_FORMATS:
+            return "-"
+        counters = self.counters.setdefault(num_id, {})
+        counters[level] = counters.get(level, 0) + 1
+        # 上一级列表项开始后，下级序号重新计数
+        for deeper in [key for key in counters if key > level]:
+            del counters[deeper]
+        return f"{counters[level]}."
+
+
+def _paragraphs(element):
+    """
+        element 下的段落（包括嵌套表格中的段落），不进入段落内部的文本框
+    """
+    for child in element:
+        if child.tag == f"{W}p":
+            yield child
+        else:
+            yield from _paragraphs(child)
+
+
+def _relationships(archive):
+    name = "word/_rels/document.xml.rels"
+    if name not in archive.namelist():
+        return {}
+    root = ET.fromstring(archive.read(name))
+    return {rel.get("Id"): rel.get("Target") for rel in root.iter(f"{PACKAGE_RELS}Relationship")}
+
+
+class DocxMarkdownConverter:
+    """
+        流式将 docx 转换为 Markdown：用 iterparse 逐个解析 word/document.xml 中的段落和表格，
+        处理完立即写出并从树中移除，内存占用与文档长度无关。保留标题级别、列表层级、表格、超链接和粗体 / 斜体。
+    """
+
+    def __init__(self, docx_file):
+        self.docx_file = docx_file
+
+    def convert(self, md_file):
+        with zipfile.ZipFile(self.docx_file) as archive, open(md_file, "w", encoding="utf-8") as md:
+            self.styles = _Styles(archive)
+            self.numbering = _Numbering(archive)
+            self.links = _relationships(archive)
+            self.md = md
+            self.in_list = False
+            with archive.open("word/document.xml") as document:
+                self._stream(document)
+
+    def _stream(self, document):
+        stack = []
+        table_depth = paragraph_depth = 0
+        for event, element in ET.iterparse(document, events=("start", "end")):
+            if event == "start":
+                stack.append(element)
+                if element.tag == f"{W}tbl":
+                    table_depth += 1
+                elif element.tag == f"{W}p":
+                    paragraph_depth += 1
+                continue
+            stack.pop()
+            # 文本框（w:txbxContent）中的段落和表格嵌套在正文段落内，与 python-docx 一致不输出，
+            # 同一文本框在 mc:Choice 和 mc:Fallback 中各有一份
+            if element.tag == f"{W}tbl":
+                table_depth -= 1
+                if table_depth or paragraph_depth:
+                    continue
+                self._write_table(element)
+            elif element.tag == f"{W}p":
+                paragraph_depth -= 1
+                if table_depth or paragraph_depth:
+                    continue
+                self._write_paragraph(element)
+            else:
+                continue
+            # 已处理的段落 / 表格从父节点中移除，避免整棵树留在内存中
+            element.clear()
+            if stack:
+                stack[-1].remove(element)
+
+    def _inline(self, element):
+        """
+            段落内容：合并格式相同的相邻 run，超链接输出为 [文本](链接)
+        """
+        parts = []
+        pending = {"text": "", "style": None}
+
+        def flush():
+            if pending["text"]:
+                bold, italic = pending["style"]
+                text = pending["text"]
+                stripped = text.strip()
+                if stripped and (bold or italic):
+                    mark = ("**" if bold else "") + ("*" if italic else "")
+                    text = text.replace(stripped, f"{mark}{stripped}{mark[::-1]}", 1)
+                parts.append(text)
+            pending["text"], pending["style"] = "", None
+
+        def walk(node):
+            for child in node:
+                tag = child.tag
+                if tag == f"{W}r":
+                    rpr = child.find(f"{W}rPr")
+                    style = (_enabled(rpr, f"{W}b"), _enabled(rpr, f"{W}i"))
+                    text = self._run_text(child)
+                    if not text:
+                        continue
+                    if style != pending["style"]:
+                        flush()
+                        pending["style"] = style
+                    pending["text"] += text
+                elif tag == f"{W}hyperlink":
+                    flush()
+                    target = self.links.get(child.get(f"{R}id"))
+                    label = self._inline(child)
+                    parts.append(f"[{label}]({target})" if target and label else label)
+                elif tag in [f"{W}ins", f"{W}smartTag", f"{W}fldSimple", f"{W}sdt", f"{W}sdtContent",
+                             f"{W}customXml"]:
+                    walk(child)
+
+        walk(element)
+        flush()
+        return "".join(parts)
+
+    @staticmethod
+    def _run_text(run):
+        text = []
+        for child in run:
+            if child.tag == f"{W}t":
+                text.append(child.text or "")
+            elif child.tag == f"{W}tab":
+                text.append("\t")
+            elif child.tag in [f"{W}br", f"{W}cr"]:
+                text.append("\n")
+        return "".join(text)
+
+    def _write_paragraph(self, paragraph):
+        ppr = paragraph.find(f"{W}pPr")
+        style_id = _val(ppr, f"{W}pStyle")
+        text = self._inline(paragraph).strip()
+        outline = _val(ppr, f"{W}outlineLvl")
+        level = self.styles.heading(style_id)
+        if outline is not None and outline.isdigit() and int(outline) < 9:
+            level = int(outline) + 1
+
+        num_pr = ppr.find(f"{W}numPr") if ppr is not None else None
+        list_info = (_val(num_pr, f"{W}numId"), int(_val(num_pr, f"{W}ilvl") or 0)) \
+            if num_pr is not None else self.styles.list_info(style_id)
+        if list_info and list_info[0] == "0":
+            # numId 为 0 表示取消样式中的编号
+            list_info = None
+
+        if not text:
+            return
+        if list_info and not level:
+            num_id, ilvl = list_info
+            marker = self.numbering.marker(num_id, ilvl)
+            self.md.write("  " * ilvl + f"{marker} {text.replace(chr(10), ' ')}\n")
+            self.in_list = True
+            return
+        self._end_list()
+        if level:
+            self.md.write("#" * min(level, 6) + " " + text.replace("\n", " ") + "\n\n")
+        else:
+            self.md.write(text + "\n\n")
+
+    def _end_list(self):
+        if self.in_list:
+            self.md.write("\n")
+            self.in_list = False
+
+    def _cell_text(self, cell):
+        paragraphs = [self._inline(p).strip() for p in _paragraphs(cell)]
+        text = "<br>".join(p for p in paragraphs if p)
+        return text.replace("\n", "<br>").replace("|", "\\|")
+
+    def _write_table(self, table):
+        rows = []
+        for row in table.findall(f"{W}tr"):
+            cells = []
+            for cell in row.findall(f"{W}tc"):
+                span = _val(cell.find(f"{W}tcPr"), f"{W}gridSpan")
+                cells.append(self._cell_text(cell))
+                # 合并单元格用空单元格补齐列数
+                cells.extend([""] * (int(span) - 1 if span and span.isdigit() else 0))
+            rows.append(cells)
+        if not rows:
+            return
+        self._end_list()
+        width = max(len(row) for row in rows)
+        lines = []
+        for index, row in enumerate(rows):
+            row = row + [""] * (width - len(row))
+            lines.append("| " + " | ".join(row) + " |")
+            if index == 0:
+                lines.append("|" + "---|" * width)
+        self.md.write("\n".join(lines) + "\n\n")
+
+
+def docx_to_markdown(docx_file, md_file):
+    DocxMarkdownConverter(docx_file).convert(md_file)
@@ -1,16 +1,17 @@
 import os
-from PIL import Image
-from docx import Document
-import pandas as pd
-import fitz
 import requests
 
+from . import docx_markdown
+
+# PIL、python-docx、pandas、fitz 导入较慢，均在用到时再导入
+
 
 class FileConvertHelper:
     def __init__(self, file_url):
         self.file_url = file_url
 
     def convert_image(self, input_file, output_file, output_format=None):
+        from PIL import Image
         if output_format == "jpg" or output_format == "jpeg":
             output_format = "JPEG"
         with Image.open(input_file) as img:
@@ -24,6 +25,8 @@ class FileConvertHelper:
                 img.save(output_file, quality=95)
 
     def pdf_to_docx(self, pdf_file, docx_file):
+        import fitz
+        from docx import Document
         document = Document()
         with fitz.Document(pdf_file) as pdf:
             for page in pdf:
@@ -32,12 +35,11 @@ class FileConvertHelper:
         document.save(docx_file)
 
     def docx_to_markdown(self, docx_file, md_file):
-        document = Document(docx_file)
-        with open(md_file, "w", encoding="utf-8") as md:
-            for para in document.paragraphs:
-                md.write(para.text + "\n\n")
+        # 直接流式解析 docx 中的 XML，保留标题、列表和表格，不加载 python-docx 的对象模型
+        docx_markdown.docx_to_markdown(docx_file, md_file)
 
     def pdf_to_markdown(self, pdf_file, md_file):
+        import fitz
         with fitz.Document(pdf_file) as pdf:
             with open(md_file, "w", encoding="utf-8") as md:
                 for page in pdf:
@@ -45,10 +47,12 @@ class FileConvertHelper:
                     md.write(text + "\n\n")
 
     def xlsx_to_csv(self, xlsx_file, csv_file):
+        import pandas as pd
         df = pd.read_excel(xlsx_file)
         df.to_csv(csv_file, index=False)
 
     def csv_to_xlsx(self, csv_file, xlsx_file):
+        import pandas as pd
         df = pd.read_csv(csv_file)
         df.to_excel(xlsx_file, index=False)
 
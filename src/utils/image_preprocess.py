@@ -0,0 +1,140 @@
+import math
+
+import numpy as np
+
+from src.config import config_data
+
+preprocess_config = (config_data.get('ocr') or {}).get('preprocess') or {}
+
+DEFAULT_OPTIONS = {
+    # 长边缩放到不超过该像素值，0 表示不缩放（默认不缩放，保持与原图一致的识别效果）
+    "max_side": preprocess_config.get('max_side', 0),
+    "grayscale": preprocess_config.get('grayscale', False),
+    "deskew": preprocess_config.get('deskew', False),
+    # 感兴趣区域 [x, y, w, h]，取值 0~1 时按图片宽高的比例计算
+    "roi": None,
+}
+# 倾斜角度小于该值时不做校正，大于 MAX_SKEW_ANGLE 时认为检测不可靠
+MIN_SKEW_ANGLE = 0.3
+MAX_SKEW_ANGLE = 15
+
+
+def decode_image(file_path):
+    """
+        读取图片文件并解码为 BGR ndarray（按 EXIF 方向旋转），后续处理和 OCR 都直接使用该数组
+    """
+    import cv2
+    with open(file_path, "rb") as f:
+        data = np.frombuffer(f.read(), dtype=np.uint8)
+    img = cv2.imdecode(data, cv2.IMREAD_COLOR)
+    if img is None:
+        raise Exception(f"无法解码图片 {file_path}")
+    return img
+
+
+def _roi_rect(roi, width, height):
+    x, y, w, h = [float(v) for v in roi]
+    if max(x, y, w, h) <= 1:
+        x, y, w, h = x * width, y * height, w * width, h * height
+    x0, y0 = int(max(0, min(width - 1, x))), int(max(0, min(height - 1, y)))
+    x1, y1 = int(max(x0 + 1, min(width, x + w))), int(max(y0 + 1, min(height, y + h)))
+    return x0, y0, x1, y1
+
+
+def estimate_skew(gray):
+    """
+        估算校正文本倾斜所需的旋转角度（度，逆时针为正）：对二值化后的前景像素求最小外接矩形
+    """
+    import cv2
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+    points = cv2.findNonZero(binary)
+    if points is None or len(points) < 10:
+        return 0.0
+    # OpenCV 4.5 前后 minAreaRect 返回的角度范围和对应的边不同（[-90, 0) / (0, 90]），
+    # 直接用外接矩形一条边的方向计算倾斜角（图像坐标 y 轴向下），再归一化到 [-45, 45)
+    corners = cv2.boxPoints(cv2.minAreaRect(points))
+    dx, dy = corners[1] - corners[0]
+    angle = math.degrees(math.atan2(float(dy), float(dx)))
+    return (angle + 45) % 90 - 45
+
+
+def preprocess_image(img, max_side=None, grayscale=False, deskew=False, roi=None):
+    """
+        OCR 前的图像预处理：裁剪感兴趣区域 -> 缩放长边 -> 灰度化 -> 倾斜校正
+        返回 (处理后的 BGR 图片, 2x3 仿射矩阵)，矩阵将原图坐标映射到处理后的坐标
+    """
+    import cv2
+    matrix = np.array([[1, 0, 0], [0, 1, 0], [0, 0, 1]], dtype=np.float64)
+
+    if roi:
+        height, width = img.shape[:2]
+        x0, y0, x1, y1 = _roi_rect(roi, width, height)
+        img = img[y0:y1, x0:x1]
+        matrix = np.array([[1, 0, -x0], [0, 1, -y0], [0, 0, 1]], dtype=np.float64) @ matrix
+
+    if max_side:
+        height, width = img.shape[:2]
+        scale = max_side / max(height, width)
+        if scale < 1:
+            img = cv2.resize(img, (max(1, round(width * scale)), max(1, round(height * scale))),
+                             interpolation=cv2.INTER_AREA)
+            matrix = np.array([[scale, 0, 0], [0, scale, 0], [0, 0, 1]], dtype=np.float64) @ matrix
+
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if grayscale or deskew else None
+    if grayscale:
+        # PaddleOCR 需要三通道输入
+        img = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+
+    if deskew:
+        angle = estimate_skew(gray)
+        if MIN_SKEW_ANGLE <= abs(angle) <= MAX_SKEW_ANGLE:
+            height, width = img.shape[:2]
+            rotation = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+            img = cv2.warpAffine(img, rotation, (width, height), flags=cv2.INTER_LINEAR,
+                                 borderMode=cv2.BORDER_REPLICATE)
+            matrix = np.vstack([rotation, [0, 0, 1]]) @ matrix
+
+    return np.ascontiguousarray(img), matrix[:2]
+
+
+def map_boxes_back(boxes, matrix):
+    """
+        将处理后图片上的文本框坐标 (N, 4, 2) 映射回原图坐标
+    """
+    if boxes.size == 0:
+        return boxes
+    inverse = np.linalg.inv(np.vstack([matrix, [0, 0, 1]]))[:2]
+    points = boxes.reshape(-1, 2).astype(np.float64)
+    mapped = points @ inverse[:, :2].T + inverse[:, 2]
+    return mapped.reshape(boxes.shape).astype(np.float32)
+
+
+def map_rect_back(rect, matrix):
+    """
+        将处理后图片上的矩形 [x0, y0, x1, y1] 映射回原图，返回映射后四个顶点的外接矩形
+    """
+    x0, y0, x1, y1 = rect
+    corners = np.array([[[x0, y0], [x1, y0], [x1, y1], [x0, y1]]], dtype=np.float32)
+    mapped = map_boxes_back(corners, matrix)[0]
+    return [float(mapped[:, 0].min()), float(mapped[:, 1].min()),
+            float(mapped[:, 0].max()), float(mapped[:, 1].max())]
+
+
+def resolve_options(input_data):
+    """
+        合并配置文件中的默认值和请求参数（maxSide、grayscale、deskew、roi）
+    """
+    options = dict(DEFAULT_OPTIONS)
+    if input_data.get("maxSide") is not None:
+        options["max_side"] = int(input_data.get("maxSide"))
+    for key in ["grayscale", "deskew"]:
+        if input_data.get(key) is not None:
+            options[key] = bool(input_data.get(key))
+    roi = input_data.get("roi")
+    if roi:
+        if isinstance(roi, str):
+            roi = [v for v in roi.replace("，", ",").split(",") if v.strip()]
+        if len(roi) != 4:
+            raise Exception("参数错误：roi 格式应为 x,y,w,h")
+        options["roi"] = roi
+    return options
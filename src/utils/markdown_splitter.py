@@ -0,0 +1,130 @@
+import re
+
+HEADER_PATTERN = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+FENCE_PATTERN = re.compile(r"^\s{0,3}(`{3,}|~{3,})")
+TABLE_SEPARATOR_PATTERN = re.compile(r"^\s*\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$")
+# 超长段落依次尝试按换行、句末、空白切分
+SENTENCE_END_PATTERN = re.compile(r"(?<=[。！？；.!?;])\s*")
+
+
+def _split_long_text(text, chunk_size, chunk_overlap):
+    """
+        将超过 chunk_size 的普通文本切成若干段，尽量切在换行、句末或空白处，相邻分段重叠 chunk_overlap 个字符
+    """
+    pieces = []
+    start = 0
+    length = len(text)
+    overlap = min(chunk_overlap, chunk_size // 2)
+    while length - start > chunk_size:
+        window = text[start:start + chunk_size]
+        cut = window.rfind("\n")
+        if cut < chunk_size // 2:
+            ends = [m.end() for m in SENTENCE_END_PATTERN.finditer(window) if m.end() < len(window)]
+            cut = ends[-1] if ends and ends[-1] >= chunk_size // 2 else window.rfind(" ")
+        if cut < chunk_size // 2:
+            cut = chunk_size
+        pieces.append(text[start:start + cut].strip())
+        next_start = start + cut - overlap
+        if overlap:
+            # 重叠部分从单词边界开始
+            space = text.find(" ", next_start, start + cut)
+            next_start = space + 1 if space != -1 else next_start
+        start = max(next_start, start + 1)
+    pieces.append(text[start:].strip())
+    return [piece for piece in pieces if piece]
+
+
+class MarkdownChunker:
+    """
+        Markdown 标题 + 大小切分，一次线性扫描完成：
+            1. 遇到不超过 header_depth 级的标题时开始新的章节，标题层级记录在分段的 metadata 中
+            2. 章节内按段落、代码块、表格组合成不超过 chunk_size 的分段
+            3. 代码块和表格不会被切开（单个超过 chunk_size 时独立成段），超长段落按句子切分
+        返回 [{"content": ..., "metadata": {"Header 1": ..., ...}}, ...]，与 MarkdownHeaderTextSplitter 的输出格式一致
+    """
+
+    def __init__(self, chunk_size, chunk_overlap=0, header_depth=3):
+        self.chunk_size = max(1, int(chunk_size))
+        self.chunk_overlap = max(0, int(chunk_overlap or 0))
+        self.header_depth = max(1, min(6, int(header_depth or 3)))
+
+    def _blocks(self, lines):
+        """
+            逐行扫描，产出 (类型, 文本, 标题级别)，类型为 header、paragraph、code、table
+        """
+        index = 0
+        paragraph = []
+        while index < len(lines):
+            line = lines[index]
+            fence = FENCE_PATTERN.match(line)
+            header = HEADER_PATTERN.match(line) if not fence else None
+            is_table = "|" in line and index + 1 < len(lines) and TABLE_SEPARATOR_PATTERN.match(lines[index + 1])
+            if fence or header or is_table or not line.strip():
+                if paragraph:
+                    yield "paragraph", "\n".join(paragraph), 0
+                    paragraph = []
+
+            if fence:
+                # 代码块到相同字符、长度不小于开始标记的结束标记为止
+                marker = fence.group(1)
+                block = [line]
+                index += 1
+                while index < len(lines):
+                    block.append(lines[index])
+                    closing = FENCE_PATTERN.match(lines[index])
+                    index += 1
+                    if closing and closing.group(1)[0] == marker[0] and len(closing.group(1)) >= len(marker) \
+                            and not lines[index - 1].strip()[len(closing.group(1)):].strip():
+                        break
+                yield "code", "\n".join(block), 0
+                continue
+            if header:
+                yield "header", header.group(2), len(header.group(1))
+            elif is_table:
+                block = [line, lines[index + 1]]
+                index += 2
+                while index < len(lines) and lines[index].strip() and "|" in lines[index]:
+                    block.append(lines[index])
+                    index += 1
+                yield "table", "\n".join(block), 0
+                continue
+            elif line.strip():
+                paragraph.append(line)
+            index += 1
+        if paragraph:
+            yield "paragraph", "\n".join(paragraph), 0
+
+    def split_text(self, text):
+        chunks = []
+        headers = {}
+        current = []
+        current_size = 0
+
+        def flush():
+            nonlocal current, current_size
+            if current:
+                chunks.append({"content": "\n\n".join(current), "metadata": dict(headers)})
+            current, current_size = [], 0
+
+        for kind, block, level in self._blocks(text.splitlines()):
+            if kind == "header":
+                if level <= self.header_depth:
+                    flush()
+                    headers = {key: value for key, value in headers.items() if int(key.split(" ")[1]) < level}
+                    headers[f"Header {level}"] = block
+                    continue
+                # 超过 header_depth 的标题作为普通文本保留
+                block = "#" * level + " " + block
+                kind = "paragraph"
+
+            pieces = [block]
+            if kind == "paragraph" and len(block) > self.chunk_size:
+                pieces = _split_long_text(block, self.chunk_size, self.chunk_overlap)
+            for piece in pieces:
+                # 加上分隔的两个换行后超过大小限制时先输出当前分段；代码块和表格超长时独立成段
+                if current and current_size + 2 + len(piece) > self.chunk_size:
+                    flush()
+                current.append(piece)
+                current_size += len(piece) + (2 if current_size else 0)
+        flush()
+        return chunks
@@ -0,0 +1,53 @@
+import queue
+import threading
+from contextlib import contextmanager
+
+
+class ModelPool:
+    """
+        模型实例池：最多创建 size 个实例（按需懒加载），使用时独占一个实例，用完归还。
+        paddle 的 predictor 不是线程安全的，多线程并行推理时每个线程需要独占一个实例。
+    """
+
+    def __init__(self, factory, size):
+        self.factory = factory
+        self.size = max(1, size)
+        self._idle = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def acquire(self):
+        model = self._get()
+        try:
+            yield model
+        finally:
+            self._idle.put(model)
+
+    def _get(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+        if create:
+            try:
+                return self.factory()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        return self._idle.get()
+
+    def warmup(self):
+        """
+            预先创建全部实例
+        """
+        models = [self._get() for _ in range(self.size)]
+        for model in models:
+            self._idle.put(model)
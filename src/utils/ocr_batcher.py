@@ -0,0 +1,119 @@
+import threading
+import time
+from concurrent.futures import Future
+
+from prometheus_client import Histogram
+
+from src.config import config_data
+
+batching_config = (config_data.get('ocr') or {}).get('batching') or {}
+
+BATCHING_ENABLED = batching_config.get('enabled', False)
+# 每批最多的文本行数，以及第一个请求进入队列后最多等待的毫秒数
+MAX_BATCH_SIZE = batching_config.get('max_batch_size', 32)
+MAX_WAIT_MS = batching_config.get('max_wait_ms', 10)
+
+BATCH_SIZE = Histogram(
+    "monkeys_tools_text_ocr_batch_size",
+    "每次文字识别推理的批大小",
+    ["unit"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+QUEUE_WAIT = Histogram(
+    "monkeys_tools_text_ocr_batch_queue_wait_seconds",
+    "文本行在批处理队列中的等待时间",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+
+
+class _Job:
+    def __init__(self, crops):
+        self.crops = crops
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+
+
+class RecognitionBatcher:
+    """
+        文字识别的动态批处理：收集并发请求的文本行图片，凑满 max_batch_size 行或
+        第一个请求等待超过 max_wait_ms 后统一识别一次，再把结果按顺序分发回各个请求。
+
+        recognize(crops) 接收一批文本行图片，在后台线程中调用并返回 [(text, score), ...]
+    """
+
+    def __init__(self, recognize, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS, name="ocr-batcher"):
+        self.recognize = recognize
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self._jobs = []
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, crops):
+        """
+            提交一个请求的全部文本行，返回 Future，结果为与 crops 一一对应的 [(text, score), ...]
+        """
+        job = _Job(crops)
+        if not crops:
+            job.future.set_result([])
+            return job.future
+        with self._condition:
+            self._jobs.append(job)
+            self._condition.notify()
+        return job.future
+
+    def _take_batch(self):
+        with self._condition:
+            while not self._jobs:
+                self._condition.wait()
+            deadline = self._jobs[0].enqueued + self.max_wait
+            while sum(len(job.crops) for job in self._jobs) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            # 按请求整体出队，单个请求的行数超过批大小时独立成批
+            batch, size = [], 0
+            while self._jobs and (not batch or size + len(self._jobs[0].crops) <= self.max_batch_size):
+                job = self._jobs.pop(0)
+                batch.append(job)
+                size += len(job.crops)
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            now = time.perf_counter()
+            crops = []
+            for job in batch:
+                QUEUE_WAIT.observe(now - job.enqueued)
+                crops.extend(job.crops)
+            BATCH_SIZE.labels("lines").observe(len(crops))
+            BATCH_SIZE.labels("requests").observe(len(batch))
+            try:
+                results = self.recognize(crops)
+            except Exception as e:
+                for job in batch:
+                    job.future.set_exception(e)
+                continue
+            offset = 0
+            for job in batch:
+                job.future.set_result(results[offset:offset + len(job.crops)])
+                offset += len(job.crops)
+
+
+class BatchedRecognizer:
+    """
+        替换 PaddleOCR 实例的 text_recognizer：图片预处理、检测、方向分类和结果过滤仍由 PaddleOCR.ocr 完成，
+        只有文字识别交给批处理器，与其他请求的文本行合并推理
+    """
+
+    def __init__(self, batcher):
+        self.batcher = batcher
+
+    def __call__(self, crops):
+        start = time.perf_counter()
+        results = self.batcher.submit(list(crops)).result()
+        # 与 TextRecognizer 的返回值一致：(结果, 耗时)
+        return results, time.perf_counter() - start
@@ -1,44 +1,274 @@
+import io
 import os
 import subprocess
-from paddleocr import PaddleOCR, PPStructure
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+
+from src.config import config_data
+from .image_preprocess import decode_image, preprocess_image, map_boxes_back, map_rect_back
+from .model_pool import ModelPool
+from .ocr_batcher import BATCHING_ENABLED, BatchedRecognizer, RecognitionBatcher
+from .ocr_layout import parse_ocr_result, reconstruct_layout
+from .ocr_registry import ModelRegistry
+from .ocr_workers import WORKERS_ENABLED, get_worker_pool
+from .pdf_raster import PdfRasterizer, render_page, page_count
+
+# 在 OCR 工作进程中为 True，此时直接在本进程内推理
+LOCAL_INFERENCE = False
+
+table_config = config_data.get('table') or {}
+languages_config = (config_data.get('ocr') or {}).get('languages') or {}
+backend_config = (config_data.get('ocr') or {}).get('backend') or {}
+
+BACKEND_TYPES = ["paddle", "onnx"]
+MODEL_DIR_KEYS = ["det_model_dir", "rec_model_dir", "cls_model_dir", "rec_char_dict_path"]
+# 直接透传给 PaddleOCR 的推理参数
+TUNING_KEYS = ["det_limit_side_len", "rec_batch_num", "cls_batch_num", "ocr_version"]
+# 每种语言的 OCR 模型实例数，即同一语言可以并行推理的请求数
+POOL_SIZE = languages_config.get('pool_size', 1)
+# 支持的语言（PaddleOCR 的 lang 参数），可在配置中缩小范围
+SUPPORTED_LANGUAGES = languages_config.get('supported') or [
+    "ch", "en", "chinese_cht", "japan", "korean", "fr", "german", "latin", "cyrillic", "arabic", "devanagari",
+]
+
+
+def resolve_language(language):
+    """
+        校验请求中的语言参数，未传时使用 ch
+    """
+    language = language or "ch"
+    if language not in SUPPORTED_LANGUAGES:
+        raise Exception(f"参数错误：不支持的语言 {language}，可选 {', '.join(SUPPORTED_LANGUAGES)}")
+    return language
+
+
+def _runtime_options(backend):
+    """
+        CPU 推理相关参数，OCR、版面分析和表格识别模型共用
+    """
+    options = {"use_gpu": False}
+    if backend.get("type", "paddle") == "paddle":
+        options["enable_mkldnn"] = bool(backend.get("enable_mkldnn", False))
+    if backend.get("cpu_threads"):
+        options["cpu_threads"] = int(backend["cpu_threads"])
+    return options
+
+
+def ocr_engine_options(language, backend=None):
+    """
+        根据后端配置生成 PaddleOCR 的构造参数：
+            paddle: Paddle Inference，可开启 MKLDNN 并设置 CPU 线程数
+            onnx: ONNX Runtime，det / rec（/ cls）模型目录需指向导出的 .onnx 文件
+        模型目录按语言配置，可指向量化（slim）或轻量（mobile）模型，未配置时使用 PaddleOCR 默认模型
+    """
+    backend = backend_config if backend is None else backend
+    backend_type = backend.get("type", "paddle")
+    if backend_type not in BACKEND_TYPES:
+        raise Exception(f"不支持的 OCR 推理后端 {backend_type}，可选 {', '.join(BACKEND_TYPES)}")
+
+    options = {
+        "use_angle_cls": backend.get("use_angle_cls", True),
+        "lang": language,
+        "show_log": False,
+        **_runtime_options(backend),
+    }
+    for key in TUNING_KEYS:
+        if backend.get(key) is not None:
+            options[key] = backend[key]
+    models = (backend.get("models") or {}).get(language) or {}
+    for key in MODEL_DIR_KEYS:
+        if models.get(key):
+            options[key] = models[key]
+
+    if backend_type == "onnx":
+        required = ["det_model_dir", "rec_model_dir"] + (["cls_model_dir"] if options["use_angle_cls"] else [])
+        missing = [key for key in required if not options.get(key)]
+        if missing:
+            raise Exception(f"ONNX 后端需要为语言 {language} 配置模型路径: {', '.join(missing)}")
+        options["use_onnx"] = True
+    return options
+
+
+def create_ocr_engine(language, backend=None):
+    from paddleocr import PaddleOCR
+    return PaddleOCR(**ocr_engine_options(language, backend))
+
+
+def paddleocr_cli_options():
+    """
+        paddleocr 命令行（版面恢复）使用的 CPU 推理参数
+    """
+    args = []
+    for key, value in _runtime_options(backend_config).items():
+        args += [f"--{key}", str(value).lower() if isinstance(value, bool) else str(value)]
+    return args
+
+
+def _create_ocr_engine_pool(language):
+    def factory():
+        engine = create_ocr_engine(language)
+        if BATCHING_ENABLED:
+            # 文字识别交给该语言的批处理器，与同时在其他实例上执行的请求合并
+            engine.text_recognizer = BatchedRecognizer(get_recognition_batcher(language))
+        return engine
+
+    return ModelPool(factory, POOL_SIZE)
+
+
+def _create_recognizer_pool(language):
+    # 批处理器专用的模型实例，只在批处理线程中使用，不与请求线程争用 ocr 模型池
+    return ModelPool(lambda: create_ocr_engine(language), 1)
+
+
+def _create_table_engine_pool(language):
+    """
+        表格识别模型池（版面分析 + 表格结构识别，不对非表格区域做 OCR），
+        池大小即多页文档可以并行处理的页数
+    """
+
+    def factory():
+        from paddleocr import PPStructure
+        return PPStructure(show_log=False, lang=language, layout=True, table=True, ocr=False,
+                           **_runtime_options(backend_config))
+
+    return ModelPool(factory, table_config.get('workers', 2))
+
+
+# 每种语言一套模型池，按需加载，常驻数量超过上限时淘汰最久未使用的空闲模型
+model_registry = ModelRegistry(
+    {
+        "ocr": _create_ocr_engine_pool,
+        "recognizer": _create_recognizer_pool,
+        "table": _create_table_engine_pool,
+    },
+    max_resident=languages_config.get('max_resident', 3),
+    idle_seconds=languages_config.get('idle_seconds', 0),
+)
+
+
+@contextmanager
+def checkout_engine(kind, language="ch"):
+    """
+        独占一个模型实例：使用期间占用该语言的模型池（避免被淘汰），并从池中取出一个实例，
+        paddle 的 predictor 不是线程安全的，不能被多个线程同时调用
+    """
+    with model_registry.acquire(kind, language) as pool:
+        with pool.acquire() as engine:
+            yield engine
+
+
+_batchers = {}
+_batchers_lock = threading.Lock()
+
+
+def get_recognition_batcher(language):
+    """
+        每种语言一个识别批处理器，并发请求的文本行合并后统一识别。
+        只有 pool_size > 1 时多个请求才能同时完成检测，批处理才有合并的机会
+    """
+    with _batchers_lock:
+        if language not in _batchers:
+            def recognize(crops):
+                with checkout_engine("recognizer", language) as engine:
+                    result = engine.text_recognizer(crops)
+                return result[0] if isinstance(result, tuple) else result
+
+            _batchers[language] = RecognitionBatcher(recognize, name=f"ocr-batcher-{language}")
+        return _batchers[language]
+
+
+def preload_languages():
+    """
+        预加载配置中常用语言的 OCR 模型
+    """
+    for language in languages_config.get('preload') or ["ch"]:
+        model_registry.get("ocr", language).warmup()
 
 
 class OCRHelper:
     def __init__(self, language="ch"):
-        self.language = language
-        self.ocr = PaddleOCR(
-            # 检测模型
-            # det_model_dir='{your_det_model_dir}',
-            # # 识别模型
-            # rec_model_dir='{your_rec_model_dir}',
-            # # 识别模型字典
-            # rec_char_dict_path='{your_rec_char_dict_path}',
-            # # 分类模型
-            # cls_model_dir='{your_cls_model_dir}',
-            # 加载分类模型
-            use_angle_cls=True,
-            lang=self.language,
-        )
-        self.structure = PPStructure(show_log=False, lang=self.language)
-
-    def preprocess(self, img_path: str):
-        # 图像预处理
+        self.language = resolve_language(language)
+
+    def run_ocr(self, img):
+        """
+            执行 OCR，img 为图片路径或 ndarray，返回 PaddleOCR 原始结果
+        """
         try:
-            result = self.ocr.ocr(img_path, cls=True)
+            if WORKERS_ENABLED and not LOCAL_INFERENCE:
+                # 交给 OCR 工作进程执行，图片通过共享内存传递
+                img = img if isinstance(img, np.ndarray) else decode_image(img)
+                return get_worker_pool().call("run_ocr", self.language, img)
+            with checkout_engine("ocr", self.language) as engine:
+                return engine.ocr(img, cls=True)
         except Exception as e:
             raise Exception(f"OCR 识别失败: {e}")
 
+    def preprocess(self, img):
+        result = self.run_ocr(img)
+
         # 提取识别结果
         extracted_texts = []
         for item in result:
-            for text_block in item:
+            # 图片中没有识别到文字时为 None
+            for text_block in item or []:
                 text = text_block[1][0]
                 extracted_texts.append(text)
 
         text = "\n".join(extracted_texts)
         return text
 
+    def load_image(self, img_path: str, options=None):
+        """
+            解码图片并做 OCR 前的预处理（缩放、灰度化、倾斜校正、裁剪），
+            返回 (BGR ndarray, 仿射矩阵)，ndarray 直接交给模型，避免重复解码
+        """
+        img = decode_image(img_path)
+        return preprocess_image(img, **(options or {}))
+
+    def structured(self, img, min_confidence=0.0, matrix=None):
+        """
+            结构化 OCR 结果：保留文本框坐标和置信度，按阅读顺序重建行和段落；
+            传入预处理的仿射矩阵时，输出的坐标会映射回原图
+        """
+        boxes, scores, texts = parse_ocr_result(self.run_ocr(img), min_confidence)
+        # 阅读顺序在校正后的坐标上计算，之后再把坐标映射回原图
+        lines, paragraphs = reconstruct_layout(boxes, scores, texts)
+        if matrix is not None:
+            for line in lines:
+                line["box"] = map_rect_back(line["box"], matrix)
+                for block in line["blocks"]:
+                    block["box"] = map_boxes_back(np.asarray([block["box"]], dtype=np.float32), matrix)[0] \
+                        .round(1).tolist()
+            for paragraph in paragraphs:
+                paragraph["box"] = map_rect_back(paragraph["box"], matrix)
+        return {
+            "text": "\n\n".join(paragraph["text"] for paragraph in paragraphs),
+            "lines": lines,
+            "paragraphs": paragraphs,
+        }
+
+    def pdf_to_text(self, pdf_path: str, txt_path: str, dpi=None):
+        """
+            逐页渲染 PDF 并 OCR，每页识别完成后立即写入 txt 文件；
+            渲染在后台线程中进行，当前页 OCR 时下一页已经在渲染
+        """
+        page_total = 0
+        with open(txt_path, "w", encoding="utf-8") as f:
+            for page_index, img in PdfRasterizer(pdf_path, dpi=dpi).pages():
+                text = self.structured(img)["text"]
+                f.write(text)
+                f.write("\n\n")
+                page_total = page_index + 1
+        return page_total
+
     def recognize_text(self, img_path: str, task_id: str):
+        """
+            版面恢复为 docx：需要 PPStructure 的 recovery 流程（版面分析、表格、OCR 后重建文档），
+            仍通过 paddleocr 命令行在子进程中执行，每次请求会重新加载模型
+        """
         save_folder = "tmp/" + task_id + "/docx/"
         # 检查 docx 文件夹是否存在
         if not os.path.exists(save_folder):
@@ -54,6 +284,9 @@ class OCRHelper:
             "true",
             "--use_pdf2docx_api",
             "true",
+            "--lang",
+            self.language,
+            *paddleocr_cli_options(),
             "--output",
             save_folder,
         ]
@@ -69,17 +302,66 @@ class OCRHelper:
             raise Exception("版面恢复失败")
         return None
 
-    def table_structure(self, img_path: str):
-        save_folder = "tmp/" + os.path.basename(img_path).split('.')[0] + "/xlsx/"
-        cmd = [
-            "paddleocr",
-            "--image_dir",
-            img_path,
-            "--type",
-            "table_structure",
-            "--layout",
-            "false",
-            "--output",
-            save_folder,
-        ]
-        # TODO 提取 output 所有 .xlsx 文件
+    def table_structure(self, img):
+        """
+            识别单张图片（BGR ndarray）中的表格，返回表格区域列表，
+            每个区域包含 bbox 以及 res.html（表格 HTML 结构）
+        """
+        if WORKERS_ENABLED and not LOCAL_INFERENCE:
+            return get_worker_pool().call("table_structure", self.language, img)
+        with checkout_engine("table", self.language) as engine:
+            result = engine(img)
+        # 区域截图不再使用，不随结果返回
+        return [{key: value for key, value in region.items() if key != 'img'}
+                for region in result if region.get('type') == 'table']
+
+    def _load_page(self, file_path, page_index):
+        if not file_path.lower().endswith(".pdf"):
+            return decode_image(file_path)
+        return render_page(file_path, page_index, dpi=table_config.get('pdf_dpi', 200))
+
+    def _page_count(self, file_path):
+        if not file_path.lower().endswith(".pdf"):
+            return 1
+        return page_count(file_path)
+
+    def _extract_page_tables(self, file_path, page_index, output_folder):
+        import pandas as pd
+        img = self._load_page(file_path, page_index)
+        tables = []
+        for table_index, region in enumerate(self.table_structure(img)):
+            html = region.get('res', {}).get('html', '')
+            name = f"page{page_index + 1}_table{table_index + 1}"
+            xlsx_path = os.path.join(output_folder, f"{name}.xlsx")
+            csv_path = os.path.join(output_folder, f"{name}.csv")
+            frames = pd.read_html(io.StringIO(html)) if html else []
+            df = frames[0] if frames else pd.DataFrame()
+            df.to_excel(xlsx_path, index=False, header=False)
+            df.to_csv(csv_path, index=False, header=False)
+            tables.append({
+                "page": page_index + 1,
+                "index": table_index + 1,
+                "bbox": [int(v) for v in region.get('bbox', [])],
+                "html": html,
+                "xlsx": xlsx_path,
+                "csv": csv_path,
+            })
+        return tables
+
+    def extract_tables(self, file_path: str, output_folder: str):
+        """
+            提取图片或 PDF 中的全部表格，每个表格输出一个 xlsx 和 csv 文件，
+            多页 PDF 的各页使用模型池并行处理
+        """
+        if not os.path.exists(output_folder):
+            os.makedirs(output_folder)
+        page_count = self._page_count(file_path)
+        if page_count == 0:
+            return []
+        pool_size = table_config.get('workers', 2)
+        with ThreadPoolExecutor(max_workers=min(pool_size, page_count)) as executor:
+            pages = executor.map(
+                lambda page_index: self._extract_page_tables(file_path, page_index, output_folder),
+                range(page_count),
+            )
+            return [table for tables in pages for table in tables]
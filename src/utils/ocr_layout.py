@@ -0,0 +1,162 @@
+import numpy as np
+
+
+def parse_ocr_result(result, min_confidence=0.0):
+    """
+        将 PaddleOCR 的识别结果（[[box, (text, score)], ...]）转换为向量化结构：
+            boxes: (N, 4, 2) float32，四个顶点坐标
+            scores: (N,) float32
+            texts: 长度为 N 的 list
+        并过滤掉置信度低于 min_confidence 的行
+    """
+    lines = [line for page in (result or []) if page for line in page]
+    if not lines:
+        return np.zeros((0, 4, 2), dtype=np.float32), np.zeros((0,), dtype=np.float32), []
+    boxes = np.asarray([line[0] for line in lines], dtype=np.float32).reshape(-1, 4, 2)
+    scores = np.asarray([line[1][1] for line in lines], dtype=np.float32)
+    texts = [line[1][0] for line in lines]
+    keep = scores >= min_confidence
+    return boxes[keep], scores[keep], [text for text, k in zip(texts, keep) if k]
+
+
+def _join(parts):
+    # 中文之间不加空格，英文单词之间加空格
+    text = ""
+    for part in parts:
+        if text and part and text[-1].isascii() and text[-1].isalnum() and part[0].isascii() and part[0].isalnum():
+            text += " "
+        text += part
+    return text
+
+
+def _find_gutters(x0, x1, page_left, page_right, min_gap):
+    """
+        在 x 方向的投影上寻找空白带（栏间距），返回 [(start, end), ...]
+    """
+    width = int(np.ceil(page_right - page_left)) + 1
+    coverage = np.zeros(width + 1, dtype=np.int32)
+    # 差分数组统计每个 x 位置被多少个文本框覆盖
+    np.add.at(coverage, np.clip((x0 - page_left).astype(np.int64), 0, width), 1)
+    np.add.at(coverage, np.clip((x1 - page_left).astype(np.int64), 0, width), -1)
+    covered = np.cumsum(coverage)[:width] > 0
+    # 找到连续未覆盖的区间
+    edges = np.diff(np.concatenate([[1], covered.astype(np.int8), [1]]))
+    starts = np.flatnonzero(edges == -1)
+    ends = np.flatnonzero(edges == 1)
+    return [
+        (page_left + s, page_left + e)
+        for s, e in zip(starts, ends)
+        if e - s >= min_gap and s > 0 and e < width
+    ]
+
+
+def _group_lines(order, y0, y1, x0):
+    """
+        将同一栏内的文本框按垂直方向重叠程度聚成行，order 为按 y 中心排序后的下标
+    """
+    lines = []
+    current = [order[0]]
+    top, bottom = y0[order[0]], y1[order[0]]
+    for index in order[1:]:
+        overlap = min(bottom, y1[index]) - max(top, y0[index])
+        height = min(bottom - top, y1[index] - y0[index])
+        if height > 0 and overlap / height > 0.5:
+            current.append(index)
+            top, bottom = min(top, y0[index]), max(bottom, y1[index])
+        else:
+            lines.append(sorted(current, key=lambda i: x0[i]))
+            current = [index]
+            top, bottom = y0[index], y1[index]
+    lines.append(sorted(current, key=lambda i: x0[i]))
+    return lines
+
+
+def reconstruct_layout(boxes, scores, texts):
+    """
+        基于文本框坐标重建阅读顺序：
+            1. 在 x 方向投影上找出栏间空白，划分栏；跨栏的文本框（标题等）将页面切成多个水平区域
+            2. 每个区域内按栏从左到右、栏内从上到下输出
+            3. 栏内按垂直重叠聚合成行，行间距明显变大或缩进变化时切分段落
+        返回 (lines, paragraphs)，均已按阅读顺序排列
+    """
+    if len(texts) == 0:
+        return [], []
+    x0, y0 = boxes[:, :, 0].min(axis=1), boxes[:, :, 1].min(axis=1)
+    x1, y1 = boxes[:, :, 0].max(axis=1), boxes[:, :, 1].max(axis=1)
+    heights = y1 - y0
+    median_height = float(np.median(heights)) or 1.0
+    page_left, page_right = float(x0.min()), float(x1.max())
+
+    # 宽度超过页面一半的文本框不参与栏的划分
+    narrow = (x1 - x0) < (page_right - page_left) * 0.5
+    gutters = _find_gutters(x0[narrow], x1[narrow], page_left, page_right, min_gap=median_height * 1.5) \
+        if narrow.any() else []
+    gutter_starts = np.asarray([g[0] for g in gutters], dtype=np.float32)
+    gutter_ends = np.asarray([g[1] for g in gutters], dtype=np.float32)
+
+    # 每个文本框所在栏 = 中心点左侧的栏间距个数；跨越任意栏间距的为跨栏文本框
+    centers = (x0 + x1) / 2
+    columns = np.searchsorted(gutter_ends, centers) if len(gutters) else np.zeros(len(texts), dtype=np.int64)
+    spanning = ((x0[:, None] < gutter_starts[None, :]) & (x1[:, None] > gutter_ends[None, :])).any(axis=1) \
+        if len(gutters) else np.zeros(len(texts), dtype=bool)
+
+    # 跨栏文本框按 y 排序，作为水平区域的分隔
+    separators = np.flatnonzero(spanning)
+    separators = separators[np.argsort(y0[separators], kind="stable")]
+    band_edges = np.concatenate([[-np.inf], (y0[separators] + y1[separators]) / 2, [np.inf]])
+    bands = np.searchsorted(band_edges, (y0 + y1) / 2) - 1
+
+    ordered_lines = []
+    for band in range(len(band_edges) - 1):
+        for column in range(len(gutters) + 1):
+            members = np.flatnonzero((bands == band) & (columns == column) & ~spanning)
+            if len(members):
+                order = members[np.argsort(((y0 + y1) / 2)[members], kind="stable")]
+                for line in _group_lines(list(order), y0, y1, x0):
+                    ordered_lines.append((column, line))
+        if band < len(separators):
+            ordered_lines.append((-1, [separators[band]]))
+
+    lines = []
+    paragraphs = []
+    previous = None
+    for line_index, (column, members) in enumerate(ordered_lines):
+        members = np.asarray(members)
+        line_box = [float(x0[members].min()), float(y0[members].min()),
+                    float(x1[members].max()), float(y1[members].max())]
+        new_paragraph = (
+                previous is None
+                or column != previous["column"]
+                or column == -1
+                or line_box[1] - previous["box"][3] > median_height * 0.8
+                or abs(line_box[0] - previous["box"][0]) > median_height * 1.5
+        )
+        if new_paragraph:
+            paragraphs.append({"column": int(column), "line_indexes": [], "box": list(line_box)})
+        paragraph = paragraphs[-1]
+        paragraph["line_indexes"].append(line_index)
+        paragraph["box"] = [min(paragraph["box"][0], line_box[0]), min(paragraph["box"][1], line_box[1]),
+                            max(paragraph["box"][2], line_box[2]), max(paragraph["box"][3], line_box[3])]
+        line = {
+            "text": _join([texts[i] for i in members]),
+            "confidence": float(scores[members].mean()),
+            "box": line_box,
+            "column": int(column),
+            "paragraph": len(paragraphs) - 1,
+            "blocks": [
+                {
+                    "text": texts[i],
+                    "confidence": float(scores[i]),
+                    "box": boxes[i].round(1).tolist(),
+                }
+                for i in members
+            ],
+        }
+        lines.append(line)
+        previous = line
+
+    for paragraph in paragraphs:
+        paragraph_lines = [lines[i] for i in paragraph.pop("line_indexes")]
+        paragraph["text"] = _join([line["text"] for line in paragraph_lines])
+        paragraph["confidence"] = float(np.mean([line["confidence"] for line in paragraph_lines]))
+    return lines, paragraphs
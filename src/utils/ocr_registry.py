@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class _Entry:
+    def __init__(self):
+        self.model = None
+        self.loaded = threading.Event()
+        self.error = None
+        self.in_use = 0
+        self.last_used = time.monotonic()
+
+
+class ModelRegistry:
+    """
+        按 key（模型类型 + 语言）懒加载模型，常驻的语言数超过 max_resident 时按 LRU 淘汰最久未使用的语言
+        （该语言的各类模型一起释放），超过 idle_seconds 未使用的模型也会被淘汰。正在使用中的模型不会被淘汰。
+    """
+
+    def __init__(self, factories, max_resident=3, idle_seconds=0):
+        self.factories = factories
+        self.max_resident = max(1, max_resident)
+        self.idle_seconds = idle_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def acquire(self, kind, language):
+        entry = self._checkout((kind, language))
+        try:
+            yield entry.model
+        finally:
+            with self._lock:
+                entry.in_use -= 1
+                entry.last_used = time.monotonic()
+
+    def get(self, kind, language):
+        """
+            获取（必要时加载）模型但不占用，用于预加载
+        """
+        with self.acquire(kind, language) as model:
+            return model
+
+    def resident(self):
+        with self._lock:
+            return [key for key, entry in self._entries.items() if entry.loaded.is_set() and entry.error is None]
+
+    def _checkout(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            owner = entry is None
+            if owner:
+                entry = _Entry()
+                self._entries[key] = entry
+            self._entries.move_to_end(key)
+            entry.in_use += 1
+            self._evict()
+
+        if owner:
+            # 由第一个请求负责加载，其他请求等待加载完成，避免同一语言重复加载
+            try:
+                entry.model = self.factories[key[0]](key[1])
+            except Exception as e:
+                entry.error = e
+                with self._lock:
+                    self._entries.pop(key, None)
+            finally:
+                entry.loaded.set()
+        else:
+            entry.loaded.wait()
+
+        if entry.error is not None:
+            with self._lock:
+                entry.in_use -= 1
+            raise Exception(f"加载模型 {key[0]}（{key[1]}）失败: {entry.error}")
+        return entry
+
+    @staticmethod
+    def _idle(entry):
+        return entry.in_use == 0 and entry.loaded.is_set()
+
+    def _evict(self):
+        now = time.monotonic()
+        if self.idle_seconds:
+            for key, entry in list(self._entries.items()):
+                if self._idle(entry) and now - entry.last_used > self.idle_seconds:
+                    print(f"模型 {key[0]}（{key[1]}）空闲超过 {self.idle_seconds}s，已释放")
+                    del self._entries[key]
+        # _entries 按最近使用时间从旧到新排列，语言的最近使用时间取其中最近使用的模型
+        recency = {}
+        for index, (_, language) in enumerate(self._entries):
+            recency[language] = index
+        for language in sorted(recency, key=recency.get):
+            if len(recency) <= self.max_resident:
+                break
+            keys = [key for key in self._entries if key[1] == language]
+            if not all(self._idle(self._entries[key]) for key in keys):
+                continue
+            print(f"常驻语言数超过 {self.max_resident}，释放最久未使用的语言 {language} 的模型")
+            for key in keys:
+                del self._entries[key]
+            del recency[language]
@@ -0,0 +1,280 @@
+import atexit
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+from multiprocessing import get_context, shared_memory
+
+import numpy as np
+
+from src.config import config_data
+
+workers_config = (config_data.get('ocr') or {}).get('workers') or {}
+
+WORKERS_ENABLED = workers_config.get('enabled', False)
+# 每个 Web 进程下的 OCR 工作进程数，以及每个工作进程内并发处理任务的线程数（每个线程独占一套模型实例）
+PROCESSES = workers_config.get('processes', 2)
+THREADS = workers_config.get('threads', 1)
+# 工作进程常驻内存超过该值（MB）后不再分配新任务，处理完已有任务后替换，0 表示不限制
+MAX_RSS_MB = workers_config.get('max_rss_mb', 0)
+# 工作进程处理的任务数超过该值后替换，0 表示不限制
+MAX_TASKS = workers_config.get('max_tasks', 0)
+TASK_TIMEOUT = workers_config.get('task_timeout', 300)
+CHECK_INTERVAL = 1
+
+
+def _rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0
+
+
+def _worker_main(tasks, results, threads, helper=None):
+    """
+        工作进程入口：从任务队列取任务，通过共享内存读取图片，在本进程内执行 OCR / 版面模型。
+        helper 为处理任务的类，默认 OCRHelper
+    """
+    if helper is None:
+        from . import ocr_helper
+        ocr_helper.LOCAL_INFERENCE = True
+        # paddle 的 predictor 不是线程安全的，模型池至少为每个线程准备一个实例
+        ocr_helper.POOL_SIZE = max(ocr_helper.POOL_SIZE, threads)
+        try:
+            ocr_helper.preload_languages()
+        except Exception as e:
+            print(f"OCR 工作进程预加载模型失败: {e}")
+        helper = ocr_helper.OCRHelper
+
+    send_lock = threading.Lock()
+
+    def send(message):
+        # 多个线程共用一个结果管道
+        with send_lock:
+            results.send(message)
+
+    def run(task):
+        task_id, op, language, shm_name, shape, dtype, kwargs = task
+        # 共享内存由 Web 进程创建和释放，工作进程只读取
+        shm = shared_memory.SharedMemory(name=shm_name)
+        try:
+            img = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+            result = getattr(helper(language), op)(img, **kwargs)
+            del img
+            send((task_id, True, result))
+        except Exception as e:
+            send((task_id, False, str(e)))
+        finally:
+            shm.close()
+
+    def loop():
+        while True:
+            task = tasks.get()
+            if task is None:
+                # 通知同一进程内的其他线程退出
+                tasks.put(None)
+                return
+            run(task)
+
+    pool = [threading.Thread(target=loop, daemon=True) for _ in range(max(1, threads))]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+
+
+class _Worker:
+    def __init__(self, context, threads, helper):
+        self.tasks = context.Queue()
+        # 每个工作进程独立的结果管道，进程在写入途中被杀死时只会损坏它自己的管道
+        self.results, writer = context.Pipe(duplex=False)
+        self.process = context.Process(target=_worker_main, args=(self.tasks, writer, threads, helper),
+                                       daemon=True)
+        self.process.start()
+        # 写端只保留在工作进程中，进程退出后读端收到 EOFError
+        writer.close()
+        self.in_flight = set()
+        self.completed = 0
+        self.draining = False
+
+
+class _Task:
+    def __init__(self, shm):
+        self.shm = shm
+        self.future = Future()
+        self.worker = None
+
+
+class OCRWorkerPool:
+    """
+        受监督的 OCR 工作进程池：Web 进程把解码后的图片写入共享内存，通过本地队列把任务交给工作进程，
+        工作进程崩溃时其上的任务全部失败并自动重启，内存膨胀或处理任务数达到上限时平滑替换
+    """
+
+    def __init__(self, processes=PROCESSES, threads=THREADS, max_rss_mb=MAX_RSS_MB, max_tasks=MAX_TASKS,
+                 helper=None):
+        # spawn 方式启动，避免在多线程的 Web 进程中 fork
+        self._context = get_context("spawn")
+        self._threads = threads
+        # 工作进程中处理任务的类（需要能按模块路径导入），默认 OCRHelper 并预加载模型
+        self._helper = helper
+        self._max_rss_mb = max_rss_mb
+        self._max_tasks = max_tasks
+        self._lock = threading.Lock()
+        self._closed = False
+        self._tasks = {}
+        self._ids = itertools.count()
+        self._workers = [self._start_worker() for _ in range(max(1, processes))]
+        threading.Thread(target=self._supervise, name="ocr-worker-supervisor", daemon=True).start()
+
+    def call(self, op, language, img, timeout=TASK_TIMEOUT, **kwargs):
+        """
+            在工作进程中执行 OCRHelper(language).op(img, **kwargs)，img 为 ndarray
+        """
+        img = np.ascontiguousarray(img)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, img.nbytes))
+        np.ndarray(img.shape, dtype=img.dtype, buffer=shm.buf)[:] = img
+        task = _Task(shm)
+        task_id = next(self._ids)
+        with self._lock:
+            if self._closed:
+                shm.close()
+                shm.unlink()
+                raise Exception("OCR 工作进程池已关闭")
+            worker = min((w for w in self._workers if not w.draining), key=lambda w: (len(w.in_flight), w.completed))
+            worker.in_flight.add(task_id)
+            task.worker = worker
+            self._tasks[task_id] = task
+            # 在锁内放入任务，保证排在 _drain 的结束标记之前
+            worker.tasks.put((task_id, op, language, shm.name, img.shape, img.dtype.str, kwargs))
+        try:
+            return task.future.result(timeout)
+        except TimeoutError:
+            # 任务超时时认为工作进程已卡死，重启该进程
+            self._restart(worker, f"任务超时（{timeout}s）")
+            # 工作进程已被替换时 _restart 不会处理该任务，这里保证任务结束并释放共享内存
+            self._finish(task_id, False, f"OCR 工作进程处理超时（{timeout}s）")
+            raise Exception(f"OCR 工作进程处理超时（{timeout}s）")
+
+    def _finish(self, task_id, ok, payload):
+        with self._lock:
+            task = self._tasks.pop(task_id, None)
+            if task is None:
+                return
+            task.worker.in_flight.discard(task_id)
+            task.worker.completed += 1
+        task.shm.close()
+        task.shm.unlink()
+        if ok:
+            task.future.set_result(payload)
+        elif not task.future.done():
+            task.future.set_exception(Exception(payload))
+
+    def _start_worker(self):
+        worker = _Worker(self._context, self._threads, self._helper)
+        threading.Thread(target=self._collect, args=(worker,), name=f"ocr-worker-results-{worker.process.pid}",
+                         daemon=True).start()
+        return worker
+
+    def _collect(self, worker):
+        """
+            读取一个工作进程的结果，直到进程退出（管道关闭）或管道损坏，之后该进程上未完成的任务全部失败
+        """
+        try:
+            while True:
+                task_id, ok, payload = worker.results.recv()
+                self._finish(task_id, ok, payload)
+        except EOFError:
+            pass
+        except Exception as e:
+            print(f"读取 OCR 工作进程 {worker.process.pid} 的结果失败: {e}")
+        worker.results.close()
+        worker.process.join(CHECK_INTERVAL)
+        if worker.draining and not worker.process.is_alive():
+            with self._lock:
+                if worker in self._workers:
+                    self._workers.remove(worker)
+        elif worker.process.is_alive():
+            self._restart(worker, "结果管道损坏")
+        elif not self._closed:
+            self._restart(worker, f"异常退出（exitcode={worker.process.exitcode}）")
+        with self._lock:
+            failed = list(worker.in_flight)
+        # 已被替换或进程池已关闭时，剩余的任务在这里失败
+        for task_id in failed:
+            self._finish(task_id, False, "OCR 工作进程已退出")
+
+    def shutdown(self):
+        """
+            结束全部工作进程，未完成的任务失败
+        """
+        with self._lock:
+            self._closed = True
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.process.kill()
+
+    def _restart(self, worker, reason):
+        with self._lock:
+            if self._closed or worker not in self._workers:
+                return
+            print(f"OCR 工作进程 {worker.process.pid} {reason}，正在重启")
+            self._workers.remove(worker)
+            if not worker.draining:
+                # 平滑替换中的进程已经有替代进程
+                self._workers.append(self._start_worker())
+            failed = list(worker.in_flight)
+        if worker.process.is_alive():
+            worker.process.kill()
+        for task_id in failed:
+            self._finish(task_id, False, f"OCR 工作进程{reason}")
+
+    def _drain(self, worker, reason):
+        # 不再分配新任务，已分配的任务处理完后进程自行退出
+        with self._lock:
+            if self._closed or worker.draining:
+                return
+            print(f"OCR 工作进程 {worker.process.pid} {reason}，处理完当前任务后替换")
+            worker.draining = True
+            self._workers.append(self._start_worker())
+            worker.tasks.put(None)
+
+    def _supervise(self):
+        while True:
+            time.sleep(CHECK_INTERVAL)
+            # 进程退出由各自的结果读取线程处理，这里只检查内存和任务数
+            for worker in list(self._workers):
+                if worker.process.is_alive() and not worker.draining:
+                    if self._max_rss_mb and _rss_mb(worker.process.pid) > self._max_rss_mb:
+                        self._drain(worker, f"内存超过 {self._max_rss_mb}MB")
+                    elif self._max_tasks and worker.completed >= self._max_tasks:
+                        self._drain(worker, f"已处理 {worker.completed} 个任务")
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def _shutdown_pool():
+    if _pool is not None and _pool_pid == os.getpid():
+        _pool.shutdown()
+
+
+atexit.register(_shutdown_pool)
+
+
+def get_worker_pool():
+    """
+        每个 Web 进程在第一次使用时创建自己的工作进程池（不能在 gunicorn preload 阶段创建）
+    """
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool, _pool_pid = OCRWorkerPool(), os.getpid()
+        return _pool
@@ -0,0 +1,135 @@
+import math
+import queue
+import threading
+
+import numpy as np
+
+from src.config import config_data
+
+pdf_config = config_data.get('pdf') or {}
+
+DEFAULT_DPI = pdf_config.get('dpi', 200)
+# 单页渲染的最大像素数，超过时自动降低该页的 DPI，避免超大扫描页占满内存
+DEFAULT_MAX_PIXELS = pdf_config.get('max_pixels', 25000000)
+# 后台预先渲染的页数
+DEFAULT_PREFETCH = pdf_config.get('prefetch', 1)
+
+# fitz 不支持多线程并发使用，所有渲染操作串行执行
+render_lock = threading.Lock()
+
+
+def page_scale(page, dpi, max_pixels):
+    scale = dpi / 72
+    width, height = page.rect.width * scale, page.rect.height * scale
+    if max_pixels and width * height > max_pixels:
+        scale *= math.sqrt(max_pixels / (width * height))
+    return scale
+
+
+def render_page(pdf_path, page_index, dpi=DEFAULT_DPI, max_pixels=DEFAULT_MAX_PIXELS):
+    """
+        渲染单页为 BGR ndarray（新分配内存）
+    """
+    import cv2
+    import fitz
+    with render_lock:
+        with fitz.open(pdf_path) as pdf:
+            page = pdf[page_index]
+            scale = page_scale(page, dpi, max_pixels)
+            pixmap = page.get_pixmap(matrix=fitz.Matrix(scale, scale), colorspace=fitz.csRGB, alpha=False)
+            rgb = np.frombuffer(pixmap.samples_mv, dtype=np.uint8).reshape(pixmap.height, pixmap.width, 3)
+            return cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+
+
+def page_count(pdf_path):
+    import fitz
+    with render_lock:
+        with fitz.open(pdf_path) as pdf:
+            return pdf.page_count
+
+
+class PdfRasterizer:
+    """
+        按需逐页渲染 PDF：后台线程最多提前渲染 prefetch 页，渲染结果写入复用的缓冲区，
+        使用方在处理第 1 页时后面的页还在渲染，内存占用与总页数无关。
+
+            for page_index, img in PdfRasterizer(pdf_path).pages():
+                ...
+
+        yield 出来的 img 是缓冲区的视图，只在处理下一页之前有效，需要保留时请自行 copy()
+    """
+
+    def __init__(self, pdf_path, dpi=None, max_pixels=None, prefetch=None):
+        self.pdf_path = pdf_path
+        self.dpi = dpi or DEFAULT_DPI
+        self.max_pixels = max_pixels or DEFAULT_MAX_PIXELS
+        self.prefetch = max(1, prefetch or DEFAULT_PREFETCH)
+        # 队列中的页 + 使用方正在处理的页 + 正在渲染的页
+        self._buffers = [None] * (self.prefetch + 2)
+
+    def _buffer(self, slot, height, width):
+        size = height * width * 3
+        buffer = self._buffers[slot]
+        if buffer is None or buffer.size < size:
+            buffer = np.empty(size, dtype=np.uint8)
+            self._buffers[slot] = buffer
+        return buffer[:size].reshape(height, width, 3)
+
+    def _render(self, pdf, page_index, slot):
+        import cv2
+        import fitz
+        page = pdf[page_index]
+        scale = page_scale(page, self.dpi, self.max_pixels)
+        pixmap = page.get_pixmap(matrix=fitz.Matrix(scale, scale), colorspace=fitz.csRGB, alpha=False)
+        rgb = np.frombuffer(pixmap.samples_mv, dtype=np.uint8).reshape(pixmap.height, pixmap.width, 3)
+        target = self._buffer(slot, pixmap.height, pixmap.width)
+        # RGB -> BGR 直接写入复用的缓冲区
+        cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR, dst=target)
+        return target
+
+    def pages(self):
+        import fitz
+        pages = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+
+        def put(item):
+            # 使用方提前结束迭代时不再阻塞
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
+
+        def producer():
+            try:
+                with render_lock:
+                    pdf = fitz.open(self.pdf_path)
+                try:
+                    for page_index in range(pdf.page_count):
+                        if stop.is_set():
+                            return
+                        slot = page_index % len(self._buffers)
+                        with render_lock:
+                            img = self._render(pdf, page_index, slot)
+                        put((page_index, img, None))
+                finally:
+                    with render_lock:
+                        pdf.close()
+                put((None, None, None))
+            except Exception as e:
+                put((None, None, e))
+
+        thread = threading.Thread(target=producer, name="pdf-rasterizer", daemon=True)
+        thread.start()
+        try:
+            while True:
+                page_index, img, error = pages.get()
+                if error is not None:
+                    raise Exception(f"PDF 渲染失败: {error}")
+                if page_index is None:
+                    return
+                yield page_index, img
+        finally:
+            stop.set()
+            thread.join()
@@ -0,0 +1,53 @@
+import json
+
+
+def iter_records(lines, document_type):
+    """
+        从文本行中逐条读取记录：jsonl 每行一条，txt 每行一条（保留换行符），json 整个文档为一条
+    """
+    if document_type == "json":
+        yield json.loads("".join(lines))
+    elif document_type == "jsonl":
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    elif document_type == "txt":
+        for line in lines:
+            yield line
+
+
+class RecordWriter:
+    """
+        逐条写入合并结果，不在内存中保留全部记录
+    """
+
+    def __init__(self, file, document_type):
+        self.file = file
+        self.document_type = document_type
+        self.count = 0
+
+    def __enter__(self):
+        if self.document_type == "json":
+            self.file.write("[")
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.document_type == "json":
+            self.file.write("]")
+
+    def write(self, record):
+        if self.document_type == "json":
+            if self.count:
+                self.file.write(", ")
+            self.file.write(json.dumps(record))
+        elif self.document_type == "jsonl":
+            self.file.write(json.dumps(record))
+            self.file.write("\n")
+        elif self.document_type == "txt":
+            self.file.write(record)
+        self.count += 1
+
+    def end_document(self):
+        # txt 文档之间用换行分隔
+        if self.document_type == "txt":
+            self.file.write("\n")
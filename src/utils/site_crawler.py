@@ -0,0 +1,275 @@
+import gzip
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urljoin, urlparse, urlunparse
+from urllib.robotparser import RobotFileParser
+
+from src.config import config_data
+from .compression import GZIP_MAGIC
+from .dedup import digest128
+from .url_extract import USER_AGENT, REQUEST_TIMEOUT, fetch_html, extract_content
+
+crawl_config = config_data.get('crawl') or {}
+
+# 单次抓取的并发数，以及同一域名同时进行的请求数
+CONCURRENCY = crawl_config.get('concurrency', 8)
+PER_HOST_CONCURRENCY = crawl_config.get('per_host_concurrency', 2)
+# 单次抓取的页面数上限，以及待抓取队列的长度上限
+MAX_PAGES = crawl_config.get('max_pages', 1000)
+MAX_FRONTIER = crawl_config.get('max_frontier', 10000)
+# sitemap 索引最多展开的 sitemap 文件数
+MAX_SITEMAPS = crawl_config.get('max_sitemaps', 50)
+
+SKIPPED_EXTENSIONS = re.compile(
+    r"\.(png|jpe?g|gif|webp|svg|ico|bmp|css|js|json|xml|pdf|zip|gz|tgz|rar|7z|exe|dmg|mp4|mp3|webm|woff2?|ttf)$",
+    re.IGNORECASE)
+
+
+def normalize_url(url):
+    """
+        去掉 fragment、统一小写的 scheme 和域名，用于 URL 去重
+    """
+    parsed = urlparse(url)
+    path = parsed.path or "/"
+    return urlunparse((parsed.scheme.lower(), parsed.netloc.lower(), path, "", parsed.query, ""))
+
+
+def _site_domain(host):
+    parts = host.split(".")
+    return ".".join(parts[-2:]) if len(parts) > 2 else host
+
+
+def _compile_patterns(patterns):
+    if isinstance(patterns, str):
+        patterns = patterns.splitlines()
+    try:
+        return [re.compile(pattern.strip()) for pattern in patterns or [] if pattern and pattern.strip()]
+    except re.error as e:
+        raise Exception(f"URL 匹配规则不是合法的正则表达式: {e}")
+
+
+class SiteCrawler:
+    """
+        从种子 URL / sitemap 开始按层级（广度优先）抓取站点页面，提取正文后逐页回调输出。
+
+        - 待抓取队列有长度上限，抓取页面数有上限
+        - URL 规范化后去重，正文完全相同的页面（镜像、带参数的重复页面）只输出一次
+        - 遵守 robots.txt（包括 Crawl-delay），同一域名的并发请求数受限
+    """
+
+    def __init__(self, max_depth=2, max_pages=MAX_PAGES, include=None, exclude=None, same_site=True,
+                 respect_robots=True, concurrency=CONCURRENCY, per_host_concurrency=PER_HOST_CONCURRENCY,
+                 max_frontier=MAX_FRONTIER):
+        self.max_depth = max_depth
+        self.max_pages = min(max_pages, MAX_PAGES)
+        self.include = _compile_patterns(include)
+        self.exclude = _compile_patterns(exclude)
+        self.same_site = same_site
+        self.respect_robots = respect_robots
+        self.concurrency = max(1, concurrency)
+        self.per_host_concurrency = max(1, per_host_concurrency)
+        self.max_frontier = max_frontier
+        self.sites = set()
+        self.seen = set()
+        self.frontier = deque()
+        # 页面数有上限，正文哈希直接用集合保存
+        self.content_digests = set()
+        self._robots = {}
+        self._robots_lock = threading.Lock()
+        self._local = threading.local()
+        self.stats = {
+            "pages": 0,
+            "failed": 0,
+            "duplicates": 0,
+            "empty": 0,
+            "disallowed": 0,
+            "filtered": 0,
+            "dropped": 0,
+        }
+
+    def _session(self):
+        # requests.Session 不保证线程安全，每个抓取线程使用自己的 Session
+        session = getattr(self._local, "session", None)
+        if session is None:
+            import requests
+            session = self._local.session = requests.Session()
+            session.headers["User-Agent"] = USER_AGENT
+        return session
+
+    def _fetch_robots(self, origin):
+        robots = RobotFileParser()
+        try:
+            response = self._session().get(f"{origin}/robots.txt", timeout=REQUEST_TIMEOUT)
+            if response.status_code in (401, 403):
+                robots.disallow_all = True
+            elif response.status_code == 200:
+                robots.parse(response.text.splitlines())
+            else:
+                robots.allow_all = True
+        except Exception as e:
+            print(f"获取 {origin}/robots.txt 失败，按允许抓取处理: {e}")
+            robots.allow_all = True
+        return robots
+
+    def _robots_future(self, url, executor):
+        """
+            每个 origin 只获取一次 robots.txt：锁内只登记 Future，请求在线程池中执行，
+            获取期间调度循环继续处理其他域名的 URL
+        """
+        parsed = urlparse(url)
+        origin = f"{parsed.scheme}://{parsed.netloc}"
+        with self._robots_lock:
+            future = self._robots.get(origin)
+            if future is None:
+                future = self._robots[origin] = executor.submit(self._fetch_robots, origin)
+            return future
+
+    def _in_scope(self, url):
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https") or SKIPPED_EXTENSIONS.search(parsed.path):
+            return False
+        if self.same_site and _site_domain(parsed.hostname or "") not in self.sites:
+            return False
+        if self.include and not any(pattern.search(url) for pattern in self.include):
+            return False
+        if any(pattern.search(url) for pattern in self.exclude):
+            return False
+        return True
+
+    def add(self, url, depth):
+        """
+            加入待抓取队列，已见过、不在范围内或队列已满时忽略
+        """
+        url = normalize_url(url)
+        if url in self.seen:
+            return
+        self.seen.add(url)
+        if not self._in_scope(url):
+            self.stats["filtered"] += 1
+            return
+        if len(self.frontier) >= self.max_frontier:
+            self.stats["dropped"] += 1
+            return
+        self.frontier.append((url, depth))
+
+    def sitemap_urls(self, sitemap_url):
+        """
+            读取 sitemap（支持 sitemap 索引和 .gz 压缩），返回其中的页面 URL
+        """
+        from lxml import etree
+
+        urls, pending, visited = [], [sitemap_url], 0
+        while pending and visited < MAX_SITEMAPS:
+            current = pending.pop(0)
+            visited += 1
+            response = self._session().get(current, timeout=REQUEST_TIMEOUT)
+            if response.status_code != 200:
+                raise Exception(f"获取 sitemap {current} 失败，状态码 {response.status_code}")
+            content = response.content
+            if content[:2] == GZIP_MAGIC:
+                content = gzip.decompress(content)
+            root = etree.fromstring(content, parser=etree.XMLParser(resolve_entities=False, no_network=True))
+            locations = [urljoin(current, (loc.text or "").strip()) for loc in root.iter("{*}loc")]
+            if etree.QName(root).localname == "sitemapindex":
+                pending.extend(locations)
+            else:
+                urls.extend(locations)
+        return urls
+
+    def _fetch(self, url):
+        html, final_url = fetch_html(url, session=self._session())
+        return final_url, extract_content(html, final_url)
+
+    def _next_task(self, active, next_allowed, executor):
+        # 按队列顺序选出第一个所在域名未达到并发上限、不在 Crawl-delay 等待期内、robots.txt 已获取的 URL
+        now = time.monotonic()
+        for _ in range(len(self.frontier)):
+            url, depth = self.frontier.popleft()
+            host = urlparse(url).netloc
+            if active.get(host, 0) < self.per_host_concurrency and next_allowed.get(host, 0) <= now:
+                if not self.respect_robots:
+                    return url, depth, host, None
+                robots = self._robots_future(url, executor)
+                if robots.done():
+                    return url, depth, host, robots.result()
+            self.frontier.append((url, depth))
+        return None
+
+    def crawl(self, seeds, on_page, sitemap_url=None):
+        """
+            抓取站点，每抓取到一个页面调用 on_page(record)，返回统计信息
+        """
+        for seed in list(seeds) + ([sitemap_url] if sitemap_url else []):
+            self.sites.add(_site_domain(urlparse(seed).hostname or ""))
+        if sitemap_url:
+            for url in self.sitemap_urls(sitemap_url):
+                self.add(url, 0)
+        for seed in seeds:
+            self.add(seed, 0)
+
+        active, next_allowed, running = {}, {}, {}
+        scheduled = 0
+        with ThreadPoolExecutor(self.concurrency) as executor:
+            while self.frontier or running:
+                while len(running) < self.concurrency and scheduled < self.max_pages and self.frontier:
+                    task = self._next_task(active, next_allowed, executor)
+                    if task is None:
+                        break
+                    url, depth, host, robots = task
+                    if robots is not None and not robots.can_fetch(USER_AGENT, url):
+                        self.stats["disallowed"] += 1
+                        continue
+                    delay = robots.crawl_delay(USER_AGENT) if robots is not None else None
+                    if delay:
+                        next_allowed[host] = time.monotonic() + float(delay)
+                    active[host] = active.get(host, 0) + 1
+                    running[executor.submit(self._fetch, url)] = (url, depth, host)
+                    scheduled += 1
+                if not running:
+                    if scheduled >= self.max_pages or not self.frontier:
+                        break
+                    # 剩余 URL 都在等待 Crawl-delay 或 robots.txt
+                    time.sleep(0.05)
+                    continue
+                with self._robots_lock:
+                    loading = [future for future in self._robots.values() if not future.done()]
+                done, _ = wait(list(running) + loading, timeout=0.5, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future not in running:
+                        # robots.txt 获取完成，回到调度
+                        continue
+                    url, depth, host = running.pop(future)
+                    active[host] -= 1
+                    try:
+                        final_url, content = future.result()
+                    except Exception as e:
+                        print(f"抓取 {url} 失败: {e}")
+                        self.stats["failed"] += 1
+                        continue
+                    # 重定向后的地址也视为已抓取
+                    self.seen.add(normalize_url(final_url))
+                    if depth < self.max_depth:
+                        for link in content["links"]:
+                            self.add(link, depth + 1)
+                    if not content["text"]:
+                        self.stats["empty"] += 1
+                        continue
+                    digest = digest128(content["text"].encode("utf-8"))
+                    if digest in self.content_digests:
+                        self.stats["duplicates"] += 1
+                        continue
+                    self.content_digests.add(digest)
+                    self.stats["pages"] += 1
+                    on_page({
+                        "url": final_url,
+                        "depth": depth,
+                        "title": content["title"],
+                        "description": content["description"],
+                        "language": content["language"],
+                        "content": content["text"],
+                    })
+        self.stats["remaining"] = len(self.frontier)
+        return self.stats
@@ -0,0 +1,149 @@
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from multiprocessing import get_context
+
+from src.config import config_data
+from .compression import open_text
+from .content_chunking import content_defined_chunks
+from .markdown_splitter import MarkdownChunker
+
+SPLIT_TYPES = ["splitByCharacter", "splitCode", "markdown", "markdownBySize", "recursivelySplitByCharacter",
+               "splitByToken", "contentDefined"]
+
+segment_config = config_data.get('segment') or {}
+# 多文档分段的进程数，留空使用 CPU 核数
+SPLIT_WORKERS = segment_config.get('workers') or os.cpu_count() or 1
+
+
+def build_splitter(split_type, chunk_size, chunk_overlap, separator=None, language=None, header_depth=3):
+    """
+        根据 splitType 构造切割器，contentDefined 不需要切割器，返回 None
+    """
+    if split_type == "contentDefined":
+        # 内容定义切分不使用 langchain 的切割器，分段之间没有重叠
+        return None
+    if split_type == "markdownBySize":
+        return MarkdownChunker(chunk_size, chunk_overlap, header_depth)
+    from langchain.text_splitter import MarkdownHeaderTextSplitter, RecursiveCharacterTextSplitter, \
+        CharacterTextSplitter
+    if split_type == "splitByCharacter":
+        return CharacterTextSplitter(
+            separator=separator,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+        )
+    elif split_type == "splitCode":
+        return RecursiveCharacterTextSplitter.from_language(
+            language=language,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+        )
+    elif split_type == "markdown":
+        headers_to_split_on = [
+            ("#", "Header 1"),
+            ("##", "Header 2"),
+            ("###", "Header 3"),
+        ]
+        return MarkdownHeaderTextSplitter(headers_to_split_on=headers_to_split_on)
+    elif split_type == "recursivelySplitByCharacter":
+        return RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    elif split_type == "splitByToken":
+        return CharacterTextSplitter.from_tiktoken_encoder(
+            chunk_size=chunk_size, chunk_overlap=chunk_overlap
+        )
+    raise Exception(f"split_type 参数错误")
+
+
+def split_text(splitter, split_type, text, chunk_size):
+    if split_type == "contentDefined":
+        return [text[start:end] for start, end in content_defined_chunks(text, chunk_size)]
+    return splitter.split_text(text)
+
+
+def segment_text(segment):
+    # MarkdownHeaderTextSplitter 返回的分段带有元数据
+    if isinstance(segment, str):
+        return segment
+    if isinstance(segment, dict):
+        return segment.get("content") or segment.get("page_content") or ""
+    return getattr(segment, "page_content", str(segment))
+
+
+def segment_metadata(segment):
+    if isinstance(segment, dict):
+        return segment.get("metadata") or {}
+    return getattr(segment, "metadata", None) or {}
+
+
+def serialize_segment(segment):
+    """
+        转换为可以 JSON 序列化的分段：字符串原样返回，langchain 的 Document 转换为
+        {"content", "metadata"}，与 markdownBySize 的输出格式一致
+    """
+    if isinstance(segment, (str, dict)):
+        return segment
+    return {"content": segment_text(segment), "metadata": segment_metadata(segment)}
+
+
+def read_text(file_path):
+    try:
+        with open_text(file_path) as f:
+            return f.read()
+    except Exception:
+        raise Exception("读取文件失败，请传入合法的 utf-8 格式的 txt 文件")
+
+
+@lru_cache(maxsize=16)
+def _cached_splitter(options):
+    # 工作进程内按参数缓存切割器，相同参数的请求只构造一次
+    return build_splitter(**dict(options))
+
+
+def split_file(options, source, file_path):
+    """
+        在工作进程中读取并切分一个文件，返回 (source, [(text, metadata), ...], 字符数)
+    """
+    splitter = _cached_splitter(tuple(sorted(options.items())))
+    text = read_text(file_path)
+    segments = split_text(splitter, options["split_type"], text, options["chunk_size"])
+    return source, [(segment_text(segment), segment_metadata(segment)) for segment in segments], len(text)
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def _shutdown_pool():
+    if _pool is not None and _pool_pid == os.getpid():
+        _pool.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(_shutdown_pool)
+
+
+def get_split_pool():
+    """
+        多文档分段的进程池：每个 Web 进程在第一次使用时创建，之后的请求共用，进程退出时关闭。
+        使用 spawn 方式启动进程，避免在多线程的服务进程中 fork
+    """
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(max_workers=SPLIT_WORKERS, mp_context=get_context("spawn"))
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def discard_split_pool(pool):
+    """
+        工作进程异常退出后进程池不可再用，丢弃后下一个请求重新创建
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
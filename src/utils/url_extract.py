@@ -0,0 +1,236 @@
+import re
+from urllib.parse import urlparse
+
+from src.config import config_data
+
+url_config = config_data.get('url') or {}
+browser_config = url_config.get('browser') or {}
+
+EXTRACT_MODES = ["auto", "http", "browser"]
+
+REQUEST_TIMEOUT = url_config.get('timeout', 15)
+USER_AGENT = url_config.get('user_agent',
+                            "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) "
+                            "Chrome/120.0 Safari/537.36")
+# 正文少于该字符数且页面像是由 JS 渲染时，auto 模式改用浏览器
+MIN_TEXT_CHARS = url_config.get('min_text_chars', 200)
+
+# 浏览器模式下等待正文出现的选择器和最长等待时间
+WAIT_SELECTOR = browser_config.get('wait_selector', "article, main, [role=main], #content, .content, body")
+WAIT_TIMEOUT = browser_config.get('wait_timeout', 15)
+# 是否屏蔽第三方域名（广告、统计、CDN 字体等），allowed_hosts 中的域名不受限制
+BLOCK_THIRD_PARTY = browser_config.get('block_third_party', True)
+ALLOWED_HOSTS = browser_config.get('allowed_hosts') or []
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp", "*.avif",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3", "*.ogg", "*.wav", "*.m3u8",
+]
+
+# 不属于正文的标签
+NOISE_TAGS = ["script", "style", "noscript", "template", "svg", "canvas", "iframe", "form", "button",
+              "nav", "header", "footer", "aside", "select", "input", "textarea"]
+NOISE_PATTERN = re.compile(r"comment|footer|header|menu|nav|sidebar|share|social|banner|advert|\bads?\b|"
+                           r"related|breadcrumb|cookie|popup|modal|subscribe", re.IGNORECASE)
+BLOCK_TAGS = {"p", "h1", "h2", "h3", "h4", "h5", "h6", "li", "pre", "blockquote", "td", "th", "dt", "dd",
+              "figcaption"}
+# 单页应用的挂载点，页面正文为空时说明内容需要 JS 渲染
+SPA_ROOT_PATTERN = re.compile(r"<div[^>]+id=[\"'](root|app|__next|__nuxt|svelte)[\"'][^>]*>\s*</div>",
+                              re.IGNORECASE)
+NEEDS_JS_PATTERN = re.compile(r"enable javascript|javascript is (disabled|required)|需要.{0,6}javascript",
+                              re.IGNORECASE)
+
+
+def fetch_html(url, session=None, timeout=REQUEST_TIMEOUT):
+    """
+        普通 HTTP 请求获取页面，返回 (html, 最终 URL)
+    """
+    import requests
+    getter = session or requests
+    response = getter.get(url, timeout=timeout, headers={"User-Agent": USER_AGENT})
+    if response.status_code != 200:
+        raise Exception(f"请求 {url} 失败，状态码 {response.status_code}")
+    content_type = response.headers.get("Content-Type", "")
+    if content_type and "html" not in content_type and "xml" not in content_type:
+        raise Exception(f"{url} 不是 HTML 页面（{content_type}）")
+    # requests 对未声明编码的 text/html 默认使用 ISO-8859-1，改用根据内容推测的编码
+    if response.encoding is None or response.encoding.lower() == "iso-8859-1":
+        response.encoding = response.apparent_encoding
+    return response.text, response.url
+
+
+def _text(element):
+    return " ".join("".join(element.itertext()).split())
+
+
+def _is_noise(element):
+    attributes = f"{element.get('class', '')} {element.get('id', '')} {element.get('role', '')}"
+    return bool(NOISE_PATTERN.search(attributes)) and element.tag not in ("body", "article", "main")
+
+
+def _score(element):
+    # 按段落文本长度打分，链接文字占比高（导航、列表页）的区块降权
+    text_length = len(_text(element))
+    if not text_length:
+        return 0
+    link_length = sum(len(_text(link)) for link in element.iter("a"))
+    paragraphs = sum(1 for _ in element.iter("p"))
+    return (text_length + 50 * paragraphs) * (1 - link_length / text_length)
+
+
+def _blocks(element):
+    # 按块级元素分段输出文本
+    lines = []
+    for child in element.iter():
+        if child.tag in BLOCK_TAGS and not any(parent.tag in BLOCK_TAGS for parent in child.iterancestors()):
+            text = _text(child)
+            if text:
+                lines.append(f"# {text}" if child.tag in ("h1", "h2") else text)
+    return lines or [_text(element)]
+
+
+def extract_content(html, url):
+    """
+        使用 lxml 提取页面标题、描述、语言、正文和链接，正文取得分最高的区块
+    """
+    from lxml import html as lxml_html
+    from lxml.etree import ParserError
+
+    try:
+        tree = lxml_html.document_fromstring(html)
+    except (ParserError, ValueError):
+        return {"title": "", "description": "", "language": "", "text": "", "links": []}
+    tree.make_links_absolute(url, resolve_base_href=True)
+
+    title = " ".join(tree.findtext(".//title", default="").split())
+    description = ""
+    for meta in tree.iter("meta"):
+        if (meta.get("name") or meta.get("property") or "").lower() in ("description", "og:description"):
+            description = meta.get("content", "").strip()
+            break
+    links = [link.get("href") for link in tree.iter("a") if link.get("href", "").startswith(("http://", "https://"))]
+
+    for element in list(tree.iter(*NOISE_TAGS)):
+        element.drop_tree()
+    for element in [element for element in tree.iter("div", "section", "ul", "ol", "table") if _is_noise(element)]:
+        if element.getparent() is not None:
+            element.drop_tree()
+
+    body = tree.find("body")
+    candidates = list(tree.iter("article", "main")) or list(tree.iter("div", "section")) or [body]
+    candidates = [element for element in candidates if element is not None]
+    best = max(candidates, key=_score) if candidates else None
+    # 最佳区块文本过少时退回整个 body
+    if best is not None and body is not None and len(_text(best)) < 0.3 * len(_text(body)):
+        best = body
+    text = "\n\n".join(_blocks(best)) if best is not None else ""
+    return {
+        "title": title,
+        "description": description,
+        "language": tree.get("lang", ""),
+        "text": text,
+        "links": links,
+    }
+
+
+def looks_js_rendered(html, content):
+    """
+        正文过少，且页面是单页应用的空挂载点、要求启用 JavaScript 或者几乎只有脚本时，认为需要浏览器渲染
+    """
+    if len(content["text"]) >= MIN_TEXT_CHARS:
+        return False
+    scripts = html.lower().count("<script")
+    return bool(SPA_ROOT_PATTERN.search(html) or NEEDS_JS_PATTERN.search(html) or scripts >= 5)
+
+
+def _site_domain(host):
+    # 取主域名，例如 www.example.com -> example.com，用于放行同站的子域名
+    parts = host.split(".")
+    return ".".join(parts[-2:]) if len(parts) > 2 else host
+
+
+def render_html(url, wait_selector=None, wait_timeout=WAIT_TIMEOUT):
+    """
+        使用 headless Chrome 渲染页面：屏蔽图片、媒体、字体和第三方域名，
+        页面 DOM 就绪后等待正文选择器中出现足够的文本，而不是等待整个页面 load
+    """
+    from selenium import webdriver
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--mute-audio")
+    options.add_argument(f"--user-agent={USER_AGENT}")
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.media_stream": 2,
+        "profile.managed_default_content_settings.plugins": 2,
+    })
+    if BLOCK_THIRD_PARTY:
+        domain = _site_domain(urlparse(url).hostname or "")
+        excluded = [domain, f"*.{domain}"] + list(ALLOWED_HOSTS)
+        # 除本站和白名单以外的域名全部解析失败
+        rules = ", ".join(["MAP * ~NOTFOUND"] + [f"EXCLUDE {host}" for host in excluded])
+        options.add_argument(f"--host-resolver-rules={rules}")
+    options.page_load_strategy = "eager"
+
+    selector = wait_selector or WAIT_SELECTOR
+    driver = webdriver.Chrome(options=options)
+    try:
+        driver.set_page_load_timeout(wait_timeout)
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+        try:
+            driver.get(url)
+        except TimeoutException:
+            pass
+        script = "return Array.from(document.querySelectorAll(arguments[0]))" \
+                 ".reduce((n, e) => Math.max(n, (e.innerText || '').trim().length), 0);"
+        try:
+            WebDriverWait(driver, wait_timeout, poll_frequency=0.2).until(
+                lambda d: d.execute_script(script, selector) >= MIN_TEXT_CHARS)
+        except TimeoutException:
+            # 超时后使用当前已渲染的内容
+            pass
+        return driver.page_source, driver.current_url
+    finally:
+        driver.quit()
+
+
+def extract_url(url, mode="auto", wait_selector=None):
+    """
+        提取 URL 的正文，返回 {"metadata", "page_content"}
+        auto: 先普通 HTTP 请求，页面像是 JS 渲染时再使用浏览器；http: 只用 HTTP；browser: 只用浏览器
+    """
+    if mode not in EXTRACT_MODES:
+        raise Exception(f"不支持的提取模式 {mode}，可选 {', '.join(EXTRACT_MODES)}")
+    html = final_url = content = None
+    used = mode
+    if mode in ("auto", "http"):
+        try:
+            html, final_url = fetch_html(url)
+            content = extract_content(html, final_url)
+            used = "http"
+        except Exception as e:
+            if mode == "http":
+                raise
+            # 被反爬拦截（403 等）或返回的不是 HTML 页面时，auto 模式改用浏览器
+            print(f"普通请求 {url} 失败，改用浏览器: {e}")
+    if mode == "browser" or (mode == "auto" and (content is None or looks_js_rendered(html, content))):
+        html, final_url = render_html(url, wait_selector)
+        content = extract_content(html, final_url)
+        used = "browser"
+    return {
+        "metadata": {
+            "source": final_url,
+            "title": content["title"],
+            "description": content["description"],
+            "language": content["language"],
+            "mode": used,
+        },
+        "page_content": content["text"],
+    }
@@ -0,0 +1,13 @@
+import os
+import shutil
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# src.config 在导入时读取当前目录下的 config.yaml，测试统一使用 config.yaml.example 中的默认配置
+_workdir = tempfile.mkdtemp(prefix="monkey-tools-test-")
+shutil.copy(os.path.join(ROOT, "config.yaml.example"), os.path.join(_workdir, "config.yaml"))
+os.chdir(_workdir)
@@ -0,0 +1,90 @@
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+from src.server import coalescing
+
+
+def _app(handler):
+    app = Flask(__name__)
+
+    @app.before_request
+    def before_request():
+        return coalescing.join_in_flight()
+
+    @app.after_request
+    def after_request(response):
+        return coalescing.publish_response(response)
+
+    @app.teardown_request
+    def teardown_request(exception=None):
+        coalescing.abandon_in_flight(exception)
+
+    app.add_url_rule("/text/ocr", "ocr", handler, methods=["POST"])
+    return app
+
+
+def _post_concurrently(app, count, started, release, delay):
+    responses = [None] * count
+
+    def post(index):
+        responses[index] = app.test_client().post("/text/ocr", json={"url": "https://example.com/a.png"})
+
+    threads = [threading.Thread(target=post, args=(index,)) for index in range(count)]
+    threads[0].start()
+    # 等执行方开始处理后再发出相同的请求，等待方都进入等待后再让执行方返回
+    assert started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    time.sleep(delay)
+    release.set()
+    for thread in threads:
+        thread.join(10)
+    return responses
+
+
+@pytest.fixture
+def controlled_handler():
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def make(statuses):
+        def handler():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            status = statuses[min(len(calls), len(statuses)) - 1]
+            return {"result": len(calls)}, status
+
+        return handler
+
+    return make, started, release, calls
+
+
+def test_identical_requests_share_result(controlled_handler):
+    make, started, release, calls = controlled_handler
+    responses = _post_concurrently(_app(make([200])), 3, started, release, 0.2)
+    assert len(calls) == 1
+    assert [response.status_code for response in responses] == [200, 200, 200]
+    assert [response.get_json()["result"] for response in responses] == [1, 1, 1]
+    assert [response.headers.get("x-monkeys-coalesced") for response in responses[1:]] == ["1", "1"]
+
+
+def test_overloaded_response_is_not_shared(controlled_handler):
+    make, started, release, calls = controlled_handler
+    responses = _post_concurrently(_app(make([503, 200])), 2, started, release, 0.2)
+    # 执行方被拒绝后，等待方自己执行
+    assert len(calls) == 2
+    assert [response.status_code for response in responses] == [503, 200]
+    assert responses[1].headers.get("x-monkeys-coalesced") is None
+
+
+def test_wait_timeout_executes_independently(controlled_handler, monkeypatch):
+    monkeypatch.setattr(coalescing, "WAIT_TIMEOUT", 0.05)
+    make, started, release, calls = controlled_handler
+    responses = _post_concurrently(_app(make([200])), 2, started, release, 0.5)
+    assert len(calls) == 2
+    assert [response.status_code for response in responses] == [200, 200]
+    assert not coalescing._in_flight
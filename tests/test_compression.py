@@ -0,0 +1,44 @@
+import pytest
+
+from src.utils.compression import (detect_compression, open_text, open_text_writer, output_suffix,
+                                   strip_compression_ext)
+
+LINES = [f'{{"id": {i}, "text": "第 {i} 行"}}\n' for i in range(1000)]
+
+
+@pytest.mark.parametrize("compression", [None, "gzip", "zstd"])
+def test_round_trip(tmp_path, compression):
+    path = str(tmp_path / f"data.jsonl{output_suffix(compression)}")
+    with open_text_writer(path, compression) as f:
+        f.writelines(LINES)
+    assert detect_compression(path) == compression
+    with open_text(path) as f:
+        assert list(f) == LINES
+
+
+def test_strip_compression_ext():
+    assert strip_compression_ext("a.jsonl.gz") == "a.jsonl"
+    assert strip_compression_ext("a.JSONL.ZST") == "a.JSONL"
+    assert strip_compression_ext("a.jsonl.zstd") == "a.jsonl"
+    assert strip_compression_ext("a.jsonl") == "a.jsonl"
+
+
+def test_output_suffix():
+    assert output_suffix("none") == ""
+    assert output_suffix(None) == ""
+    assert output_suffix("gzip") == ".gz"
+    assert output_suffix("zstd") == ".zst"
+    with pytest.raises(Exception, match="不支持的压缩格式"):
+        output_suffix("bz2")
+
+
+def test_zstd_multiple_frames(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    path = str(tmp_path / "data.jsonl.zst")
+    compressor = zstandard.ZstdCompressor()
+    # 分两次追加写入，文件中有两个 frame
+    with open(path, "wb") as f:
+        f.write(compressor.compress("".join(LINES[:500]).encode("utf-8")))
+        f.write(compressor.compress("".join(LINES[500:]).encode("utf-8")))
+    with open_text(path) as f:
+        assert list(f) == LINES
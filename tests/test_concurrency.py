@@ -0,0 +1,134 @@
+import threading
+import time
+
+import pytest
+
+from src.server.concurrency import FairShareLimiter, ServerOverloadedException
+
+
+def _queue(limiter, tenant, order, label):
+    # 在后台线程中排队，放行后记录顺序并保持占用，直到测试调用 release
+    def run():
+        limiter.acquire(tenant)
+        order.append(label)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def _wait_waiting(limiter, count):
+    deadline = time.monotonic() + 2
+    while limiter.waiting != count and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert limiter.waiting == count
+
+
+def _release_and_wait(limiter, tenant, order, count):
+    limiter.release(tenant)
+    deadline = time.monotonic() + 2
+    while len(order) < count and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert len(order) == count
+
+
+def test_grants_within_capacity():
+    limiter = FairShareLimiter("test", max_concurrency=2, max_queue=0, queue_timeout=1)
+    limiter.acquire("a")
+    limiter.acquire("b")
+    assert limiter.running == 2
+    with pytest.raises(ServerOverloadedException) as error:
+        limiter.acquire("c")
+    assert error.value.reason == "queue_full"
+    limiter.release("a")
+    limiter.acquire("c")
+    assert limiter.running == 2
+
+
+def test_tenants_take_turns():
+    limiter = FairShareLimiter("test", max_concurrency=1, max_queue=10, queue_timeout=5)
+    limiter.acquire("a")
+    order = []
+    # a 先排了三个请求，b 后到的请求不需要等 a 的全部请求执行完
+    for index in range(3):
+        _queue(limiter, "a", order, f"a{index}")
+        _wait_waiting(limiter, index + 1)
+    _queue(limiter, "b", order, "b0")
+    _wait_waiting(limiter, 4)
+
+    _release_and_wait(limiter, "a", order, 1)
+    tenants = [order[-1][0]]
+    for count in range(2, 5):
+        _release_and_wait(limiter, tenants[-1], order, count)
+        tenants.append(order[-1][0])
+    assert order.index("b0") <= 1
+    assert [label for label in order if label[0] == "a"] == ["a0", "a1", "a2"]
+    limiter.release(tenants[-1])
+    assert limiter.running == 0 and limiter.waiting == 0
+
+
+def test_weights():
+    limiter = FairShareLimiter("test", max_concurrency=1, max_queue=20, queue_timeout=5, weights={"a": 3})
+    limiter.acquire("x")
+    order = []
+    for index in range(4):
+        _queue(limiter, "a", order, f"a{index}")
+        _wait_waiting(limiter, 2 * index + 1)
+        _queue(limiter, "b", order, f"b{index}")
+        _wait_waiting(limiter, 2 * index + 2)
+
+    tenant = "x"
+    for count in range(1, 6):
+        _release_and_wait(limiter, tenant, order, count)
+        tenant = order[-1][0]
+    # 权重为 3 的租户前 5 个槽位中至少分到 3 个
+    assert sum(1 for label in order[:5] if label[0] == "a") >= 3
+    # 放行剩余的请求，避免后台线程在之后的测试中排队超时
+    for count in range(6, 9):
+        _release_and_wait(limiter, tenant, order, count)
+        tenant = order[-1][0]
+    limiter.release(tenant)
+    assert limiter.running == 0 and limiter.waiting == 0
+
+
+def test_team_queue_limit():
+    limiter = FairShareLimiter("test", max_concurrency=1, max_queue=10, queue_timeout=5, team_max_queue=1)
+    limiter.acquire("a")
+    order = []
+    _queue(limiter, "a", order, "a0")
+    _wait_waiting(limiter, 1)
+    with pytest.raises(ServerOverloadedException) as error:
+        limiter.acquire("a")
+    assert error.value.reason == "team_queue_full"
+    # 其他团队不受影响
+    _queue(limiter, "b", order, "b0")
+    _wait_waiting(limiter, 2)
+    _release_and_wait(limiter, "a", order, 1)
+    _release_and_wait(limiter, order[-1][0], order, 2)
+    limiter.release(order[-1][0])
+
+
+def test_team_concurrency_limit():
+    limiter = FairShareLimiter("test", max_concurrency=2, max_queue=10, queue_timeout=5, team_max_concurrency=1)
+    limiter.acquire("a")
+    order = []
+    _queue(limiter, "a", order, "a0")
+    _wait_waiting(limiter, 1)
+    # 全局还有空闲槽位，但 a 已达到单租户并发上限，b 直接放行
+    limiter.acquire("b")
+    assert limiter.running == 2 and limiter.waiting == 1
+    _release_and_wait(limiter, "a", order, 1)
+    assert order == ["a0"]
+    limiter.release("a")
+    limiter.release("b")
+
+
+def test_queue_timeout():
+    limiter = FairShareLimiter("test", max_concurrency=1, max_queue=10, queue_timeout=0.05)
+    limiter.acquire("a")
+    with pytest.raises(ServerOverloadedException) as error:
+        limiter.acquire("b")
+    assert error.value.reason == "timeout"
+    assert limiter.waiting == 0
+    limiter.release("a")
+    limiter.acquire("b")
@@ -0,0 +1,67 @@
+import pytest
+
+from src.utils.content_chunking import chunk_hash, content_defined_chunks, diff_manifest, parse_manifest
+
+
+def _text(paragraphs=200, seed=""):
+    return "\n".join(
+        f"第 {i} 段{seed}：The quick brown fox {i} jumps over the lazy dog. 内容定义切分测试文本。"
+        for i in range(paragraphs)
+    )
+
+
+def _chunks(text, chunk_size):
+    return [
+        {"index": index, "hash": chunk_hash(text[start:end]), "text": text[start:end]}
+        for index, (start, end) in enumerate(content_defined_chunks(text, chunk_size))
+    ]
+
+
+def test_spans_cover_text_within_size():
+    text = _text()
+    spans = content_defined_chunks(text, 1000)
+    assert spans[0][0] == 0 and spans[-1][1] == len(text)
+    for (_, end), (start, _) in zip(spans, spans[1:]):
+        assert end == start
+    assert all(end - start <= 1000 for start, end in spans)
+    # 除最后一段外不小于 chunk_size / 4
+    assert all(end - start >= 250 for start, end in spans[:-1])
+
+
+def test_short_and_empty_text():
+    assert content_defined_chunks("", 100) == []
+    assert content_defined_chunks("短文本", 100) == [(0, 3)]
+
+
+def test_local_edit_only_changes_nearby_chunks():
+    text = _text()
+    chunk_size = 800
+    before = _chunks(text, chunk_size)
+    middle = len(text) // 2
+    edited = text[:middle] + "插入的一句新内容。" + text[middle:]
+    after = _chunks(edited, chunk_size)
+
+    diff = diff_manifest([chunk["hash"] for chunk in before], after)
+    touched = len(diff["added"]) + len(diff["changed"])
+    assert 1 <= touched <= 3
+    assert diff["unchanged"] >= len(before) - 3
+    # 修改位置之前和之后的分段保持不变
+    assert before[0]["hash"] == after[0]["hash"]
+    assert before[-1]["hash"] == after[-1]["hash"]
+
+
+def test_diff_manifest_reports_removed_chunks():
+    text = _text()
+    before = _chunks(text, 800)
+    after = [dict(chunk, index=index) for index, chunk in enumerate(before[:-2])]
+    diff = diff_manifest([chunk["hash"] for chunk in before], after)
+    assert diff["removed"] == [chunk["hash"] for chunk in before[-2:]]
+    assert diff["added"] == [] and diff["changed"] == []
+
+
+def test_parse_manifest_formats():
+    assert parse_manifest(["a", "b"]) == ["a", "b"]
+    assert parse_manifest('[{"hash": "a"}, {"hash": "b"}]') == ["a", "b"]
+    assert parse_manifest({"chunks": [{"hash": "a", "text": "x"}]}) == ["a"]
+    with pytest.raises(Exception, match="previousManifest"):
+        parse_manifest("not json")
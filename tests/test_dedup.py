@@ -0,0 +1,81 @@
+import numpy as np
+
+from src.utils.dedup import BloomFilter, Deduplicator, MinHashLSH, ScalableBloomFilter, digest128
+
+
+def test_bloom_filter_add():
+    bloom = BloomFilter(1000, 1e-6)
+    assert bloom.add(digest128(b"a")) is False
+    assert bloom.add(digest128(b"a")) is True
+    assert bloom.add(digest128(b"b")) is False
+
+
+def test_bloom_filter_add_many_false_positive_rate():
+    bloom = BloomFilter(10000, 1e-3)
+    inserted = np.asarray([digest128(str(i).encode()) for i in range(10000)], dtype=np.uint64)
+    assert not bloom.add_many(inserted).any()
+    assert bloom.add_many(inserted).all()
+    others = np.asarray([digest128(f"x{i}".encode()) for i in range(10000)], dtype=np.uint64)
+    assert bloom.add_many(others).sum() < 50
+
+
+def test_exact_dedup_by_key():
+    dedup = Deduplicator(mode="exact", key="text")
+    records = [{"id": 1, "text": "a"}, {"id": 2, "text": "b"}, {"id": 3, "text": "a"}, {"id": 4, "text": "c"}]
+    kept = [record["id"] for record in records if not dedup.is_duplicate(record)]
+    assert kept == [1, 2, 4]
+    assert dedup.stats() == {"total": 4, "kept": 3, "droppedExact": 1, "droppedNear": 0}
+
+
+def test_exact_dedup_whole_record():
+    dedup = Deduplicator(mode="exact")
+    assert not dedup.is_duplicate({"a": 1, "b": 2})
+    # 键顺序不同的相同记录视为重复
+    assert dedup.is_duplicate({"b": 2, "a": 1})
+    assert not dedup.is_duplicate({"a": 1, "b": 3})
+
+
+def test_near_dedup():
+    base = "MinHash LSH finds documents that share most of their character shingles with an earlier one. " * 3
+    dedup = Deduplicator(mode="near")
+    assert not dedup.is_duplicate(base)
+    assert dedup.is_duplicate(base.replace("earlier", "previous", 1))
+    assert not dedup.is_duplicate("A completely different sentence about image preprocessing and deskew.")
+    assert dedup.stats()["droppedNear"] == 1
+
+
+def test_minhash_signature_similarity():
+    lsh = MinHashLSH(threshold=0.8)
+    a = lsh.signature("the quick brown fox jumps over the lazy dog " * 4)
+    b = lsh.signature("the quick brown fox jumped over the lazy dog " * 4)
+    c = lsh.signature("lorem ipsum dolor sit amet consectetur adipiscing " * 4)
+    assert (a == b).mean() > 0.5
+    assert (a == c).mean() < 0.1
+
+
+def test_scalable_bloom_filter_grows_with_input():
+    bloom = ScalableBloomFilter(1000, 1e-6)
+    initial_bytes = bloom.nbytes
+    digests = np.asarray([digest128(str(i).encode()) for i in range(20000)], dtype=np.uint64)
+    for start in range(0, len(digests), 500):
+        assert not bloom.add_many(digests[start:start + 500]).any()
+    assert len(bloom.filters) > 1
+    assert bloom.nbytes > initial_bytes
+    # 扩容后之前加入的元素仍然能查到
+    assert bloom.add_many(digests).all()
+    others = np.asarray([digest128(f"x{i}".encode()) for i in range(20000)], dtype=np.uint64)
+    assert bloom.add_many(others).sum() <= 2
+
+
+def test_scalable_bloom_filter_max_capacity():
+    bloom = ScalableBloomFilter(100, 1e-3, max_capacity=300)
+    for i in range(2000):
+        bloom.add(digest128(str(i).encode()))
+    # 100 + 200 达到总容量上限后不再扩容
+    assert len(bloom.filters) == 2
+    assert bloom.total_capacity == 300
+
+
+def test_small_inputs_use_little_memory():
+    assert Deduplicator(mode="exact").exact.nbytes < 2 * 1024 * 1024
+    assert Deduplicator(mode="near").near.filter.nbytes < 2 * 1024 * 1024
@@ -0,0 +1,100 @@
+import docx
+
+from src.utils.docx_markdown import docx_to_markdown
+
+
+def _convert(tmp_path, document):
+    docx_path = str(tmp_path / "input.docx")
+    md_path = str(tmp_path / "output.md")
+    document.save(docx_path)
+    docx_to_markdown(docx_path, md_path)
+    with open(md_path, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_headings_and_inline_styles(tmp_path):
+    document = docx.Document()
+    document.add_heading("标题一", 1)
+    document.add_heading("标题二", 2)
+    paragraph = document.add_paragraph("普通 ")
+    paragraph.add_run("粗体").bold = True
+    paragraph.add_run(" 和 ")
+    paragraph.add_run("斜体").italic = True
+    document.add_paragraph("")
+    assert _convert(tmp_path, document) == "# 标题一\n\n## 标题二\n\n普通 **粗体** 和 *斜体*\n\n"
+
+
+def test_lists(tmp_path):
+    document = docx.Document()
+    document.add_paragraph("a", style="List Bullet")
+    document.add_paragraph("b", style="List Bullet")
+    document.add_paragraph("one", style="List Number")
+    document.add_paragraph("two", style="List Number")
+    document.add_paragraph("after")
+    assert _convert(tmp_path, document) == "- a\n- b\n1. one\n2. two\n\nafter\n\n"
+
+
+def test_tables(tmp_path):
+    document = docx.Document()
+    table = document.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = "名称"
+    table.cell(0, 1).text = "a|b"
+    table.cell(1, 0).text = "x"
+    cell = table.cell(1, 1)
+    cell.text = "第一行"
+    cell.add_paragraph("第二行")
+    document.add_paragraph("表格之后")
+    assert _convert(tmp_path, document) == \
+        "| 名称 | a\\|b |\n|---|---|\n| x | 第一行<br>第二行 |\n\n表格之后\n\n"
+
+
+TEXT_BOX_DOCUMENT = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+            xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"
+            xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape"
+            xmlns:v="urn:schemas-microsoft-com:vml">
+  <w:body>
+    <w:p>
+      <w:r><w:t>正文段落</w:t></w:r>
+      <w:r>
+        <mc:AlternateContent>
+          <mc:Choice Requires="wps">
+            <wps:txbx><w:txbxContent>
+              <w:p><w:r><w:t>文本框内容</w:t></w:r></w:p>
+              <w:tbl><w:tr><w:tc><w:p><w:r><w:t>文本框表格</w:t></w:r></w:p></w:tc></w:tr></w:tbl>
+            </w:txbxContent></wps:txbx>
+          </mc:Choice>
+          <mc:Fallback>
+            <v:textbox><w:txbxContent><w:p><w:r><w:t>文本框内容</w:t></w:r></w:p></w:txbxContent></v:textbox>
+          </mc:Fallback>
+        </mc:AlternateContent>
+      </w:r>
+    </w:p>
+    <w:tbl>
+      <w:tr>
+        <w:tc>
+          <w:p>
+            <w:r><w:t>单元格</w:t></w:r>
+            <w:r><mc:AlternateContent><mc:Choice Requires="wps"><wps:txbx><w:txbxContent>
+              <w:p><w:r><w:t>单元格文本框</w:t></w:r></w:p>
+            </w:txbxContent></wps:txbx></mc:Choice></mc:AlternateContent></w:r>
+          </w:p>
+        </w:tc>
+      </w:tr>
+    </w:tbl>
+    <w:p><w:r><w:t>结尾</w:t></w:r></w:p>
+  </w:body>
+</w:document>
+"""
+
+
+def test_text_box_paragraphs_are_not_output(tmp_path):
+    import zipfile
+
+    docx_path = str(tmp_path / "text_box.docx")
+    md_path = str(tmp_path / "text_box.md")
+    with zipfile.ZipFile(docx_path, "w") as archive:
+        archive.writestr("word/document.xml", TEXT_BOX_DOCUMENT)
+    docx_to_markdown(docx_path, md_path)
+    with open(md_path, encoding="utf-8") as f:
+        assert f.read() == "正文段落\n\n| 单元格 |\n|---|\n\n结尾\n\n"
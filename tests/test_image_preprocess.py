@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from src.utils.image_preprocess import estimate_skew, map_boxes_back, preprocess_image, resolve_options
+
+
+def _page():
+    # 白底上的若干行"文字"
+    img = np.full((600, 800, 3), 255, dtype=np.uint8)
+    for index in range(8):
+        cv2.rectangle(img, (100, 80 + index * 55), (700, 100 + index * 55), (0, 0, 0), -1)
+    return img
+
+
+def _rotate(img, angle):
+    height, width = img.shape[:2]
+    rotation = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    return cv2.warpAffine(img, rotation, (width, height), borderValue=(255, 255, 255))
+
+
+def _gray(img):
+    return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+
+@pytest.mark.parametrize("angle", [-10, -5, -2, 0, 2, 5, 10])
+def test_estimate_skew_both_directions(angle):
+    # 逆时针旋转 angle 度后，需要旋转 -angle 度校正
+    assert estimate_skew(_gray(_rotate(_page(), angle))) == pytest.approx(-angle, abs=0.3)
+
+
+@pytest.mark.parametrize("angle", [-6, 6])
+def test_deskew_levels_image(angle):
+    img, matrix = preprocess_image(_rotate(_page(), angle), deskew=True)
+    assert abs(estimate_skew(_gray(img))) < 0.3
+    # 坐标可以映射回原图
+    point = np.array([[[400, 300]]], dtype=np.float32)
+    assert map_boxes_back(point, matrix)[0][0] == pytest.approx([400, 300], abs=1)
+
+
+def test_no_downscale_by_default():
+    img = np.full((3000, 4000, 3), 255, dtype=np.uint8)
+    processed, matrix = preprocess_image(img, **resolve_options({}))
+    assert processed.shape == img.shape
+    assert np.allclose(matrix, [[1, 0, 0], [0, 1, 0]])
+    processed, _ = preprocess_image(img, max_side=2000)
+    assert processed.shape[:2] == (1500, 2000)
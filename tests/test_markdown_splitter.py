@@ -0,0 +1,46 @@
+from src.utils.markdown_splitter import MarkdownChunker
+
+
+def test_headers_become_metadata():
+    text = "# A\n\nintro\n\n## B\n\nsection b\n\n## C\n\nsection c\n\n# D\n\nlast"
+    chunks = MarkdownChunker(chunk_size=1000).split_text(text)
+    assert chunks == [
+        {"content": "intro", "metadata": {"Header 1": "A"}},
+        {"content": "section b", "metadata": {"Header 1": "A", "Header 2": "B"}},
+        {"content": "section c", "metadata": {"Header 1": "A", "Header 2": "C"}},
+        {"content": "last", "metadata": {"Header 1": "D"}},
+    ]
+
+
+def test_headers_deeper_than_depth_stay_in_text():
+    chunks = MarkdownChunker(chunk_size=1000, header_depth=2).split_text("# A\n\n### Deep\n\nbody")
+    assert chunks == [{"content": "### Deep\n\nbody", "metadata": {"Header 1": "A"}}]
+
+
+def test_code_blocks_and_tables_are_not_split():
+    code = "```python\n" + "\n".join(f"print({i})" for i in range(30)) + "\n\n# not a header\n```"
+    table = "| a | b |\n|---|---|\n" + "\n".join(f"| {i} | {i * 2} |" for i in range(20))
+    chunks = MarkdownChunker(chunk_size=50).split_text(f"# T\n\n{code}\n\n{table}\n\ntail")
+    contents = [chunk["content"] for chunk in chunks]
+    assert code in contents
+    assert table in contents
+    assert contents[-1] == "tail"
+    assert all(chunk["metadata"] == {"Header 1": "T"} for chunk in chunks)
+
+
+def test_long_paragraph_split_within_size():
+    sentence = "This is a sentence about chunking. "
+    text = sentence * 40
+    chunks = MarkdownChunker(chunk_size=200, chunk_overlap=20).split_text(text)
+    assert len(chunks) > 1
+    assert all(len(chunk["content"]) <= 200 for chunk in chunks)
+    # 每段都从句子或单词边界开始
+    assert all(not chunk["content"][0].isspace() for chunk in chunks)
+    joined = " ".join(chunk["content"] for chunk in chunks)
+    assert joined.count("chunking") >= 40
+
+
+def test_small_blocks_are_combined():
+    text = "\n\n".join(f"p{i}" for i in range(10))
+    chunks = MarkdownChunker(chunk_size=1000).split_text(text)
+    assert chunks == [{"content": text, "metadata": {}}]
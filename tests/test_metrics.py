@@ -0,0 +1,11 @@
+from src.server.metrics import OTHER_LABEL, _BoundedLabel
+
+
+def test_bounded_label_keeps_first_values():
+    label = _BoundedLabel(None, 2)
+    assert [label(value) for value in ["a", "b", "c", "a", ""]] == ["a", "b", OTHER_LABEL, "a", ""]
+
+
+def test_bounded_label_allowlist():
+    label = _BoundedLabel(["team-a"], 2)
+    assert [label(value) for value in ["team-a", "team-b", "team-c"]] == ["team-a", OTHER_LABEL, OTHER_LABEL]
@@ -0,0 +1,28 @@
+import threading
+
+from src.utils.ocr_batcher import BatchedRecognizer, RecognitionBatcher
+
+
+def test_batched_recognizer_merges_concurrent_requests():
+    batches = []
+
+    def recognize(crops):
+        batches.append(list(crops))
+        return [(f"text-{crop}", 0.9) for crop in crops]
+
+    recognizer = BatchedRecognizer(RecognitionBatcher(recognize, max_batch_size=8, max_wait_ms=200))
+    results = {}
+
+    def request(name, crops):
+        # 与 TextRecognizer 相同的调用方式和返回值
+        results[name], _ = recognizer(crops)
+
+    threads = [threading.Thread(target=request, args=(name, [f"{name}{i}" for i in range(3)])) for name in "ab"]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert results == {name: [(f"text-{name}{i}", 0.9) for i in range(3)] for name in "ab"}
+    assert len(batches) == 1 and len(batches[0]) == 6
+    assert recognizer([])[0] == []
@@ -0,0 +1,21 @@
+import pytest
+
+from src.utils.ocr_helper import OCRHelper, resolve_language
+
+
+def test_resolve_language():
+    assert resolve_language(None) == "ch"
+    assert resolve_language("en") == "en"
+    for language in ["xx", "ch --output /tmp", "../en"]:
+        with pytest.raises(Exception, match="不支持的语言"):
+            resolve_language(language)
+    with pytest.raises(Exception, match="不支持的语言"):
+        OCRHelper("xx")
+
+
+def test_extract_tables_from_empty_pdf(tmp_path):
+    # 没有页面的合法 PDF，不需要加载表格模型
+    pdf = tmp_path / "empty.pdf"
+    pdf.write_bytes(b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n"
+                    b"2 0 obj<</Type/Pages/Kids[]/Count 0>>endobj\ntrailer<</Root 1 0 R>>\n%%EOF\n")
+    assert OCRHelper("ch").extract_tables(str(pdf), str(tmp_path / "tables")) == []
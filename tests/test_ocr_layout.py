@@ -0,0 +1,69 @@
+from src.utils.ocr_layout import parse_ocr_result, reconstruct_layout
+
+
+def _line(x0, y0, x1, y1, text, score=0.95):
+    # PaddleOCR 的单行结果：[四个顶点, (文本, 置信度)]
+    return [[[x0, y0], [x1, y0], [x1, y1], [x0, y1]], (text, score)]
+
+
+def _layout(page, min_confidence=0.0):
+    return reconstruct_layout(*parse_ocr_result([page], min_confidence))
+
+
+def test_two_columns():
+    # 跨栏标题 + 左右两栏，识别结果中右栏排在前面
+    page = [
+        _line(220, 40, 400, 60, "right 1"),
+        _line(220, 70, 400, 90, "right 2"),
+        _line(0, 0, 400, 20, "Title"),
+        _line(0, 40, 180, 60, "left 1"),
+        _line(220, 100, 400, 120, "right 3"),
+        _line(0, 70, 180, 90, "left 2"),
+        _line(0, 100, 180, 120, "left 3"),
+    ]
+    lines, paragraphs = _layout(page)
+    assert [line["text"] for line in lines] == ["Title", "left 1", "left 2", "left 3", "right 1", "right 2", "right 3"]
+    assert [line["column"] for line in lines] == [-1, 0, 0, 0, 1, 1, 1]
+    assert [paragraph["text"] for paragraph in paragraphs] == ["Title", "left 1 left 2 left 3",
+                                                               "right 1 right 2 right 3"]
+    assert paragraphs[1]["box"] == [0, 40, 180, 120]
+
+
+def test_single_column_of_short_lines():
+    # 长短不一的短行（列表）不应被当成多栏，同一行的多个文本框合并为一行
+    page = [
+        _line(0, 0, 40, 20, "苹果"),
+        _line(0, 30, 160, 50, "香蕉"),
+        _line(0, 60, 20, 80, "橙"),
+        _line(0, 90, 50, 110, "Hello"),
+        _line(60, 91, 110, 109, "world"),
+        # 行间距明显变大，另起一段
+        _line(0, 160, 60, 180, "葡萄"),
+    ]
+    lines, paragraphs = _layout(page)
+    assert [line["text"] for line in lines] == ["苹果", "香蕉", "橙", "Hello world", "葡萄"]
+    assert {line["column"] for line in lines} == {0}
+    assert [block["text"] for block in lines[3]["blocks"]] == ["Hello", "world"]
+    assert [paragraph["text"] for paragraph in paragraphs] == ["苹果香蕉橙Hello world", "葡萄"]
+    assert [line["paragraph"] for line in lines] == [0, 0, 0, 0, 1]
+
+
+def test_low_confidence_filtering():
+    page = [
+        _line(0, 0, 100, 20, "keep", 0.9),
+        _line(0, 30, 100, 50, "noise", 0.3),
+        _line(0, 60, 100, 80, "also keep", 0.6),
+    ]
+    boxes, scores, texts = parse_ocr_result([page, None], min_confidence=0.5)
+    assert texts == ["keep", "also keep"]
+    assert boxes.shape == (2, 4, 2) and scores.shape == (2,)
+
+    lines, paragraphs = _layout(page, min_confidence=0.5)
+    assert [line["text"] for line in lines] == ["keep", "also keep"]
+    assert abs(lines[1]["confidence"] - 0.6) < 1e-6
+    # 过滤后两行间距变大，分为两段
+    assert [paragraph["text"] for paragraph in paragraphs] == ["keep", "also keep"]
+
+    lines, paragraphs = _layout(page, min_confidence=0.95)
+    assert lines == [] and paragraphs == []
+    assert reconstruct_layout(*parse_ocr_result([None])) == ([], [])
@@ -0,0 +1,73 @@
+import threading
+
+import pytest
+
+from src.utils.ocr_registry import ModelRegistry
+
+
+def _registry(max_resident, loads=None):
+    loads = [] if loads is None else loads
+
+    def factory(kind):
+        def create(language):
+            loads.append((kind, language))
+            return f"{kind}-{language}"
+
+        return create
+
+    return ModelRegistry({kind: factory(kind) for kind in ["ocr", "recognizer", "table"]}, max_resident=max_resident)
+
+
+def test_models_of_one_language_count_once():
+    registry = _registry(2)
+    for kind in ["ocr", "recognizer", "table"]:
+        registry.get(kind, "ch")
+    registry.get("ocr", "en")
+    assert sorted(registry.resident()) == sorted([("ocr", "ch"), ("recognizer", "ch"), ("table", "ch"), ("ocr", "en")])
+
+
+def test_least_recently_used_language_evicted_together():
+    loads = []
+    registry = _registry(2, loads)
+    registry.get("ocr", "ch")
+    registry.get("table", "ch")
+    registry.get("ocr", "en")
+    # ch 最近用过，超出上限时淘汰 en
+    registry.get("ocr", "ch")
+    registry.get("ocr", "japan")
+    assert sorted(registry.resident()) == [("ocr", "ch"), ("ocr", "japan"), ("table", "ch")]
+    registry.get("recognizer", "en")
+    # 再次使用 en 会淘汰 ch 的全部模型
+    assert sorted(registry.resident()) == [("ocr", "japan"), ("recognizer", "en")]
+    assert loads.count(("ocr", "ch")) == 1
+
+
+def test_language_in_use_is_not_evicted():
+    registry = _registry(1)
+    with registry.acquire("ocr", "ch") as model:
+        assert model == "ocr-ch"
+        registry.get("ocr", "en")
+        assert ("ocr", "ch") in registry.resident()
+    registry.get("ocr", "japan")
+    assert registry.resident() == [("ocr", "japan")]
+
+
+def test_concurrent_first_use_loads_once():
+    loads = []
+    registry = _registry(3, loads)
+    threads = [threading.Thread(target=registry.get, args=("ocr", "ch")) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert loads == [("ocr", "ch")]
+
+
+def test_load_failure_is_reported():
+    def fail(language):
+        raise RuntimeError("missing model")
+
+    registry = ModelRegistry({"ocr": fail})
+    with pytest.raises(Exception, match="missing model"):
+        registry.get("ocr", "ch")
+    assert registry.resident() == []
@@ -0,0 +1,73 @@
+import time
+
+import numpy as np
+import pytest
+
+from src.utils.ocr_workers import OCRWorkerPool
+
+
+class EchoHelper:
+    """
+        在工作进程中代替 OCRHelper，不加载模型：返回图片的形状和像素和，delay 用于模拟卡住的任务
+    """
+
+    def __init__(self, language):
+        self.language = language
+
+    def run_ocr(self, img, delay=0):
+        time.sleep(delay)
+        return {"language": self.language, "shape": list(img.shape), "sum": int(img.sum())}
+
+
+def _wait_for(condition, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+
+@pytest.fixture
+def pool():
+    pool = OCRWorkerPool(processes=1, threads=1, helper=EchoHelper)
+    yield pool
+    pool.shutdown()
+
+
+def _run_ocr(pool, **kwargs):
+    img = np.full((4, 5, 3), 2, dtype=np.uint8)
+    assert pool.call("run_ocr", "en", img, timeout=60, **kwargs) == {"language": "en", "shape": [4, 5, 3], "sum": 120}
+    assert pool._tasks == {}
+
+
+def test_timeout_fails_task_and_restarts_worker(pool):
+    _run_ocr(pool)
+    worker = pool._workers[0]
+    with pytest.raises(Exception, match="处理超时"):
+        pool.call("run_ocr", "en", np.zeros((4, 5, 3), dtype=np.uint8), timeout=0.5, delay=30)
+    assert pool._tasks == {}
+    assert worker not in pool._workers and len(pool._workers) == 1
+    _run_ocr(pool)
+
+
+def test_killed_worker_is_replaced(pool):
+    _run_ocr(pool)
+    worker = pool._workers[0]
+    worker.process.kill()
+    _wait_for(lambda: worker not in pool._workers and len(pool._workers) == 1)
+    _run_ocr(pool)
+
+
+def test_drained_worker_finishes_its_tasks(pool):
+    from concurrent.futures import ThreadPoolExecutor
+
+    _run_ocr(pool)
+    worker = pool._workers[0]
+    with ThreadPoolExecutor(1) as executor:
+        # 排空前已分配的任务照常完成
+        future = executor.submit(_run_ocr, pool, delay=0.5)
+        _wait_for(lambda: worker.in_flight)
+        pool._drain(worker, "测试")
+        future.result(timeout=60)
+    _wait_for(lambda: worker not in pool._workers)
+    assert len(pool._workers) == 1 and not pool._workers[0].draining
+    _run_ocr(pool)
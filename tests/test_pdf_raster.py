@@ -0,0 +1,59 @@
+import numpy as np
+
+from src.utils.pdf_raster import PdfRasterizer, render_page
+
+# (宽, 高) pt 和填充色 RGB；4 页、3 个缓冲区，第 4 页复用第 1 页的缓冲区且尺寸更小
+PAGES = [
+    ((200, 100), (1, 0, 0)),
+    ((100, 50), (0, 1, 0)),
+    ((50, 200), (0, 0, 1)),
+    ((100, 100), (1, 1, 0)),
+]
+
+
+def _make_pdf(path):
+    import fitz
+    pdf = fitz.open()
+    for (width, height), color in PAGES:
+        page = pdf.new_page(width=width, height=height)
+        page.draw_rect(page.rect, color=color, fill=color)
+    pdf.save(str(path))
+    pdf.close()
+
+
+def _render_all(rasterizer):
+    rendered = []
+    for page_index, img in rasterizer.pages():
+        slot = page_index % len(rasterizer._buffers)
+        # img 是缓冲区的视图
+        assert np.shares_memory(img, rasterizer._buffers[slot])
+        center = img[img.shape[0] // 2, img.shape[1] // 2]
+        rendered.append((page_index, img.shape, tuple(int(value) for value in center)))
+    return rendered
+
+
+def test_rasterizer_reuses_buffers(tmp_path):
+    pdf_path = tmp_path / "pages.pdf"
+    _make_pdf(pdf_path)
+    # 72 DPI 下 1pt 对应 1 像素
+    rasterizer = PdfRasterizer(str(pdf_path), dpi=72, prefetch=1)
+    assert len(rasterizer._buffers) == 3
+
+    expected = [
+        (index, (height, width, 3), (255 * b, 255 * g, 255 * r))
+        for index, ((width, height), (r, g, b)) in enumerate(PAGES)
+    ]
+    assert _render_all(rasterizer) == expected
+    buffers = list(rasterizer._buffers)
+    # 第 1 页的缓冲区足够放下第 4 页，不重新分配
+    assert buffers[0].size == 200 * 100 * 3
+
+    assert _render_all(rasterizer) == expected
+    assert all(before is after for before, after in zip(buffers, rasterizer._buffers))
+
+
+def test_rasterizer_matches_render_page(tmp_path):
+    pdf_path = tmp_path / "pages.pdf"
+    _make_pdf(pdf_path)
+    for page_index, img in PdfRasterizer(str(pdf_path), dpi=72).pages():
+        assert np.array_equal(img, render_page(str(pdf_path), page_index, dpi=72))
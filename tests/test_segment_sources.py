@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from src.server import apis
+
+
+@pytest.fixture
+def manifest(tmp_path, monkeypatch):
+    def write(items, name="manifest.jsonl"):
+        path = tmp_path / name
+        path.write_text("\n".join(json.dumps(item) for item in items), encoding="utf-8")
+        monkeypatch.setattr(apis, "download_file", lambda url, folder: str(path))
+        return {"manifestUrl": "https://example.com/" + name}
+
+    return write
+
+
+def test_manifest_sources(manifest):
+    input_data = manifest([{"id": "a", "url": "https://example.com/a.txt"}, "https://example.com/b.txt"])
+    input_data["txtUrls"] = ["https://example.com/c.txt"]
+    assert apis.TextSegmentResource.load_sources(input_data, "/tmp") == [
+        ("https://example.com/c.txt", "https://example.com/c.txt"),
+        ("a", "https://example.com/a.txt"),
+        ("https://example.com/b.txt", "https://example.com/b.txt"),
+    ]
+
+
+@pytest.mark.parametrize("item", [{"id": "a"}, {"id": "a", "url": ""}, 1])
+def test_manifest_item_without_url(manifest, item):
+    with pytest.raises(Exception, match="第 2 项"):
+        apis.TextSegmentResource.load_sources(manifest([{"url": "https://example.com/a.txt"}, item]), "/tmp")
+
+
+def _sample(name, **labels):
+    from prometheus_client import REGISTRY
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_multiple_documents_keep_request_state(tmp_path, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from benchmarks.local_oss import LocalFileServer, LocalOSSClient
+    from src.server.app import app
+    from src.server.concurrency import get_limiter
+
+    for name in ["a", "b", "c"]:
+        (tmp_path / f"{name}.txt").write_text(f"# {name}\n\n" + "段落内容。" * 100, encoding="utf-8")
+    server = LocalFileServer(str(tmp_path)).start()
+    monkeypatch.setattr(apis, "oss_client", LocalOSSClient(server))
+    monkeypatch.setattr(apis, "upload_file", lambda file_path, key: file_path)
+
+    # 切分在线程池中执行，提交时记录执行槽位是否仍被当前请求占用
+    limiter = get_limiter("/text/text-segment")
+    running = []
+
+    class _Pool(ThreadPoolExecutor):
+        def submit(self, *args, **kwargs):
+            running.append(limiter.running)
+            return super().submit(*args, **kwargs)
+
+    pool = _Pool(2)
+    monkeypatch.setattr(apis, "get_split_pool", lambda: pool)
+    endpoint = "/text/text-segment"
+    labels = {"endpoint": endpoint, "method": "POST", "app_id": "", "team_id": ""}
+    completed = _sample("monkeys_tools_text_requests_total", status="200", **labels)
+    failed = _sample("monkeys_tools_text_requests_total", status="500", **labels)
+    try:
+        response = app.test_client().post(endpoint, json={
+            "documentMode": "multiple",
+            "txtUrls": [f"{server.base_url}/{name}.txt" for name in ["a", "b", "c"]],
+            "splitType": "markdownBySize",
+            "chunkSize": 200,
+            "chunkOverlap": 10,
+        })
+    finally:
+        server.stop()
+        pool.shutdown()
+
+    assert response.status_code == 200
+    stats = response.get_json()["stats"]
+    assert stats["documents"] == 3 and stats["failed"] == []
+    assert running == [1, 1, 1] and limiter.running == 0
+    assert _sample("monkeys_tools_text_requests_total", status="200", **labels) == completed + 1
+    assert _sample("monkeys_tools_text_requests_total", status="500", **labels) == failed
@@ -0,0 +1,73 @@
+import functools
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.utils.site_crawler import SiteCrawler
+
+
+class _Handler(SimpleHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/robots.txt":
+            self.server.robots_requests += 1
+            time.sleep(self.server.robots_delay)
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def serve(tmp_path):
+    servers = []
+
+    def serve(name, pages, robots="", robots_delay=0):
+        root = tmp_path / name
+        (root / "private").mkdir(parents=True)
+        (root / "robots.txt").write_text(robots)
+        (root / "private" / "secret.html").write_text("<html><body><p>secret</p></body></html>")
+        links = "".join(f"<a href='page_{i}.html'>{i}</a>" for i in range(pages))
+        (root / "index.html").write_text(
+            f"<html><body><article><h1>{name}</h1><p>{name} home</p></article>{links}"
+            "<a href='private/secret.html'>secret</a><a href='copy.html'>copy</a></body></html>")
+        for i in range(pages):
+            (root / f"page_{i}.html").write_text(
+                f"<html><head><title>{name} {i}</title></head><body><article><p>{name} page {i} content</p>"
+                "</article><a href='index.html'>home</a></body></html>")
+        (root / "copy.html").write_text((root / "page_0.html").read_text())
+        server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(_Handler, directory=str(root)))
+        server.robots_requests, server.robots_delay = 0, robots_delay
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield serve
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_crawl_local_site(serve):
+    server, base = serve("site", 3, robots="User-agent: *\nDisallow: /private/\n")
+    pages = []
+    stats = SiteCrawler(max_depth=2).crawl([f"{base}/index.html"], pages.append)
+    assert sorted(page["url"] for page in pages) == [f"{base}/{name}.html" for name in
+                                                     ["index", "page_0", "page_1", "page_2"]]
+    assert stats["pages"] == 4 and stats["duplicates"] == 1 and stats["disallowed"] == 1
+    assert server.robots_requests == 1
+
+
+def test_slow_robots_does_not_block_other_origins(serve):
+    slow_server, slow = serve("slow", 1, robots_delay=1)
+    fast_server, fast = serve("fast", 3)
+    pages = []
+    crawler = SiteCrawler(max_depth=1, same_site=False, include=[r"127\.0\.0\.1"])
+    crawler.crawl([f"{slow}/index.html", f"{fast}/index.html"], pages.append)
+    urls = [page["url"] for page in pages]
+    first_slow = next(index for index, url in enumerate(urls) if url.startswith(slow))
+    # 慢站点的 robots.txt 获取期间，另一个站点的页面已经抓取完成
+    assert all(url.startswith(fast) for url in urls[:first_slow])
+    assert len([url for url in urls if url.startswith(fast)]) == 5
+    assert slow_server.robots_requests == 1 and fast_server.robots_requests == 1
@@ -0,0 +1,83 @@
+import json
+import threading
+
+from flask import Flask, jsonify, request
+
+from src.server import task_worker
+from src.server.task_worker import MemoryTaskSource, TaskWorker
+
+
+def _app():
+    app = Flask(__name__)
+
+    @app.post("/echo")
+    def echo():
+        data = request.get_json()
+        if data.get("fail"):
+            return jsonify({"message": "处理失败"}), 400
+        return jsonify({
+            "input": data,
+            "team": request.headers.get("x-monkeys-teamid"),
+            "app": request.headers.get("x-monkeys-appid"),
+            "workflow": request.headers.get("x-monkeys-workflow-instanceid"),
+        })
+
+    return app
+
+
+def _start(source):
+    worker = TaskWorker(_app(), source, {"echo": "/echo"}, concurrency=2, poll_interval_ms=10,
+                        report_interval_ms=10)
+    thread = threading.Thread(target=worker.run, daemon=True)
+    thread.start()
+    return worker, thread
+
+
+def test_tasks_run_end_to_end():
+    source = MemoryTaskSource()
+    worker, thread = _start(source)
+    try:
+        from_context = source.submit("echo", {"text": "a", "__context": {"teamId": "team-1", "APP_ID": "app-1"}},
+                                     workflow_instance_id="workflow-1")
+        from_task = source.submit("echo", {"text": "b"}, teamId="team-2", appId="app-2")
+        failed = source.submit("echo", {"fail": True})
+        results = source.wait([from_context, from_task, failed], timeout=30)
+    finally:
+        worker.stop()
+        thread.join(timeout=30)
+
+    assert results[from_context]["status"] == "COMPLETED"
+    assert results[from_context]["outputData"] == {"input": {"text": "a"}, "team": "team-1", "app": "app-1",
+                                                   "workflow": "workflow-1"}
+    assert results[from_task]["outputData"]["team"] == "team-2"
+    assert results[from_task]["outputData"]["app"] == "app-2"
+    assert results[failed]["status"] == "FAILED"
+    assert results[failed]["reasonForIncompletion"] == "处理失败"
+    assert not thread.is_alive()
+
+
+def test_external_payloads(tmp_path, monkeypatch):
+    from benchmarks.local_oss import LocalFileServer, LocalOSSClient
+
+    server = LocalFileServer(str(tmp_path))
+    storage = LocalOSSClient(server)
+    monkeypatch.setattr(task_worker, "oss_client", storage)
+    # 所有输出都超过阈值，上传到存储后只上报路径
+    monkeypatch.setattr(task_worker, "OUTPUT_PAYLOAD_THRESHOLD_KB", 0)
+    storage.upload_bytes("task/input/large.json", json.dumps({"text": "大输入"}).encode("utf-8"))
+
+    source = MemoryTaskSource()
+    worker, thread = _start(source)
+    try:
+        task_id = source.submit("echo", {}, externalInputPayloadStoragePath="task/input/large.json")
+        result = source.wait([task_id], timeout=30)[task_id]
+    finally:
+        worker.stop()
+        thread.join(timeout=30)
+        server.server.server_close()
+
+    assert result["status"] == "COMPLETED" and result["outputData"] == {}
+    key = result["externalOutputPayloadStoragePath"]
+    assert key == f"task/output/{task_id}.json"
+    output = json.loads((tmp_path / "artifact" / key).read_text(encoding="utf-8"))
+    assert output["input"] == {"text": "大输入"}
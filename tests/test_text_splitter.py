@@ -0,0 +1,38 @@
+import json
+from types import SimpleNamespace
+
+from src.utils.text_splitter import build_splitter, serialize_segment, split_text
+
+
+def test_serialize_document_segments():
+    # 与 langchain Document 相同的属性
+    document = SimpleNamespace(page_content="正文", metadata={"Header 1": "标题"})
+    segments = [serialize_segment(segment) for segment in ["a", {"content": "b", "metadata": {}}, document]]
+    assert segments == ["a", {"content": "b", "metadata": {}}, {"content": "正文", "metadata": {"Header 1": "标题"}}]
+    json.dumps(segments)
+
+
+def test_split_without_langchain():
+    text = "# 标题\n\n" + "段落内容。" * 100
+    assert build_splitter("contentDefined", 100, 0) is None
+    pieces = split_text(None, "contentDefined", text, 100)
+    assert "".join(pieces) == text
+    splitter = build_splitter("markdownBySize", 100, 0)
+    chunks = split_text(splitter, "markdownBySize", text, 100)
+    assert all(chunk["metadata"] == {"Header 1": "标题"} for chunk in chunks)
+
+
+def test_split_pool_is_shared_and_caches_splitters(tmp_path):
+    from src.utils.text_splitter import get_split_pool, split_file
+
+    path = tmp_path / "doc.txt"
+    path.write_text("# 标题\n\n" + "段落内容。" * 200, encoding="utf-8")
+    pool = get_split_pool()
+    assert get_split_pool() is pool
+    options = {"split_type": "markdownBySize", "chunk_size": 200, "chunk_overlap": 0, "separator": None,
+               "language": None, "header_depth": 3}
+    futures = [pool.submit(split_file, dict(options, chunk_size=size), f"doc-{size}", str(path)) for size in [200, 500]]
+    results = [future.result(timeout=60) for future in futures]
+    assert [source for source, _, _ in results] == ["doc-200", "doc-500"]
+    assert len(results[0][1]) > len(results[1][1])
+    assert all(metadata == {"Header 1": "标题"} for _, metadata in results[0][1])
@@ -0,0 +1,58 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.utils import url_extract
+
+ARTICLE = "<html><head><title>标题</title></head><body><article>" + "<p>浏览器渲染后的正文内容。</p>" * 20 + \
+          "</article></body></html>"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/blocked":
+            self.send_response(403)
+            self.end_headers()
+            self.wfile.write(b"Forbidden")
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.end_headers()
+        self.wfile.write(ARTICLE.encode("utf-8"))
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def base_url(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    rendered = []
+
+    def render_html(url, wait_selector=None):
+        rendered.append(url)
+        return ARTICLE, url
+
+    monkeypatch.setattr(url_extract, "render_html", render_html)
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_auto_mode_uses_http_for_plain_pages(base_url):
+    result = url_extract.extract_url(f"{base_url}/article")
+    assert result["metadata"]["mode"] == "http"
+    assert "浏览器渲染后的正文内容" in result["page_content"]
+
+
+def test_auto_mode_falls_back_to_browser_when_blocked(base_url):
+    result = url_extract.extract_url(f"{base_url}/blocked")
+    assert result["metadata"]["mode"] == "browser"
+    assert result["metadata"]["title"] == "标题"
+
+
+def test_http_mode_reports_blocked_pages(base_url):
+    with pytest.raises(Exception, match="状态码 403"):
+        url_extract.extract_url(f"{base_url}/blocked", mode="http")
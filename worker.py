@@ -0,0 +1,8 @@
+from src.server import app
+from src.server.task_worker import run_worker
+from src.server.tool_groups import preload_tools
+
+if __name__ == '__main__':
+    # 拉取模式：直接从 conductor 领取任务执行，不对外提供 HTTP 服务
+    preload_tools()
+    run_worker(app)